@@ -0,0 +1,104 @@
+"""
+Measures the overhead of the executor backed async database layer and the event loop lag it saves.
+
+Times find_one called directly on pymongo and through :class:`modules.database.AsyncCollection`,
+then handles a simulated flood of messages, each doing a find_one and an update_one like the leveling system does,
+once with blocking pymongo calls inside the coroutines and once through the async layer, while measuring loop lag.
+
+Needs a MongoDB server at config.MONGODB_URL, a scratch database is used and dropped afterwards.
+
+Run from the src directory:
+    python -m benchmarks.async_database [--users 1000] [--messages 2000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import LoopLagProbe, report, report_lag, scratch_database
+from modules.database import EXECUTOR_MAX_WORKERS, AsyncCollection
+
+
+async def time_async_calls(collection: AsyncCollection, users: int) -> float:
+    start = time.perf_counter()
+    for user_id in range(users):
+        await collection.find_one({"user_id": user_id})
+    return time.perf_counter() - start
+
+
+async def blocking_flood(collection, messages: int, users: int):
+    async def handle(user_id: int):
+        collection.find_one({"user_id": user_id})
+        collection.update_one({"user_id": user_id}, {"$inc": {"pp": 1}})
+
+    await asyncio.gather(*[handle(i % users) for i in range(messages)])
+
+
+async def async_flood(collection: AsyncCollection, messages: int, users: int):
+    async def handle(user_id: int):
+        await collection.find_one({"user_id": user_id})
+        await collection.update_one({"user_id": user_id}, {"$inc": {"pp": 1}})
+
+    await asyncio.gather(*[handle(i % users) for i in range(messages)])
+
+
+async def run_flood(name: str, flood, messages: int):
+    async with LoopLagProbe() as probe:
+        start = time.perf_counter()
+        await flood
+        elapsed = time.perf_counter() - start
+
+    report(name, messages, [elapsed], unit="messages")
+    report_lag(name, probe.lags)
+
+
+async def run(args, collection, async_collection: AsyncCollection):
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for user_id in range(args.users):
+            collection.find_one({"user_id": user_id})
+        timings.append(time.perf_counter() - start)
+    report("pymongo find_one", args.users, timings)
+
+    timings = [
+        await time_async_calls(async_collection, args.users) for _ in range(args.repeat)
+    ]
+    report("AsyncCollection find_one", args.users, timings)
+
+    await run_flood(
+        "blocking flood",
+        blocking_flood(collection, args.messages, args.users),
+        args.messages,
+    )
+    await run_flood(
+        "async flood",
+        async_flood(async_collection, args.messages, args.users),
+        args.messages,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async database layer benchmark.")
+    parser.add_argument("--users", type=int, default=1000, help="number of documents")
+    parser.add_argument(
+        "--messages", type=int, default=2000, help="messages in the flood"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    args = parser.parse_args()
+
+    with scratch_database() as db:
+        collection = db["leveling_users"]
+        collection.insert_many([{"user_id": i, "pp": 0} for i in range(args.users)])
+        collection.create_index("user_id")
+
+        executor = ThreadPoolExecutor(max_workers=EXECUTOR_MAX_WORKERS)
+        async_collection = AsyncCollection(collection, executor)
+        try:
+            asyncio.run(run(args, collection, async_collection))
+        finally:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
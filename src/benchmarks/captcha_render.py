@@ -0,0 +1,89 @@
+"""
+Measures captcha render throughput and the event loop lag of rendering captchas during a join flood.
+
+Renders --joins captchas with :func:`modules.captcha_renderer.render_captcha_image` on the event loop, like
+captchas were rendered before the worker pool, and in a spawned process pool with config.CAPTCHA_WORKERS workers,
+like :class:`modules.captcha_verification.CaptchaModule` does. The workers are started before timing,
+as they are while the bot runs. Loop lag is measured during both.
+
+Run from the src directory:
+    python -m benchmarks.captcha_render [--joins 200]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import string
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import config
+from benchmarks.common import LoopLagProbe, report, report_lag
+from modules.captcha_renderer import render_captcha_image
+
+
+def random_text() -> str:
+    return "".join(random.choice(string.ascii_lowercase) for _ in range(6))
+
+
+async def inline_flood(joins: int):
+    async def join():
+        render_captcha_image(random_text())
+        # a member joining does other awaits too, which lets the loop switch tasks
+        await asyncio.sleep(0)
+
+    await asyncio.gather(*[join() for _ in range(joins)])
+
+
+async def pool_flood(executor: ProcessPoolExecutor, joins: int):
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *[
+            loop.run_in_executor(executor, render_captcha_image, random_text())
+            for _ in range(joins)
+        ]
+    )
+
+
+async def run_flood(name: str, flood, joins: int):
+    async with LoopLagProbe() as probe:
+        start = time.perf_counter()
+        await flood
+        elapsed = time.perf_counter() - start
+
+    report(name, joins, [elapsed], unit="captchas")
+    report_lag(name, probe.lags)
+
+
+async def run(args):
+    await run_flood("on the event loop", inline_flood(args.joins), args.joins)
+
+    executor = ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    try:
+        # start the workers and load captcha in them before timing
+        await pool_flood(executor, args.workers)
+        await run_flood(
+            f"process pool ({args.workers} workers)",
+            pool_flood(executor, args.joins),
+            args.joins,
+        )
+    finally:
+        executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Captcha render benchmark.")
+    parser.add_argument(
+        "--joins", type=int, default=200, help="members joining at once"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=config.CAPTCHA_WORKERS, help="worker processes"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
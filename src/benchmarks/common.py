@@ -0,0 +1,81 @@
+"""
+Helpers shared by the benchmarks.
+
+Benchmarks are run from the src directory as modules, e.g. `python -m benchmarks.async_database`.
+Benchmarks that need MongoDB use a scratch database on `config.MONGODB_URL`, which is dropped when they finish.
+"""
+import asyncio
+import statistics
+import time
+from contextlib import contextmanager
+
+import config
+import pymongo
+
+SCRATCH_DATABASE = "TLDR_benchmark"
+
+
+def report(name: str, count: int, timings: list[float], unit: str = "calls"):
+    """Print the throughput of the best of timings, each timing being the seconds it took to do count things."""
+    best = min(timings)
+    print(
+        f"{name}: {count / best:,.0f} {unit}/s "
+        f"({best / count * 1e6:.1f} µs each, best of {len(timings)})"
+    )
+
+
+def report_lag(name: str, lags: list[float]):
+    """Print how late the event loop woke up a sleeping task, see :class:`LoopLagProbe`."""
+    if not lags:
+        print(f"{name}: no samples")
+        return
+
+    print(
+        f"{name}: loop lag avg {statistics.mean(lags) * 1000:.2f} ms, "
+        f"max {max(lags) * 1000:.2f} ms over {len(lags)} samples"
+    )
+
+
+class LoopLagProbe:
+    """
+    Measures event loop lag, the time a task that sleeps for :attr:`interval` seconds wakes up late.
+    A loop blocked by synchronous work wakes the probe up late by as long as it was blocked.
+
+    Usage::
+
+        async with LoopLagProbe() as probe:
+            await work()
+        report_lag("work", probe.lags)
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.lags = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - start - self.interval, 0))
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        # give the probe a chance to start sleeping before the work begins
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+
+
+@contextmanager
+def scratch_database():
+    """Yields a scratch :class:`pymongo.database.Database` that is dropped afterwards."""
+    client = pymongo.MongoClient(config.MONGODB_URL, serverSelectionTimeoutMS=5000)
+    client.drop_database(SCRATCH_DATABASE)
+    try:
+        yield client[SCRATCH_DATABASE]
+    finally:
+        client.drop_database(SCRATCH_DATABASE)
+        client.close()
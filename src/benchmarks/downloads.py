@@ -0,0 +1,99 @@
+"""
+Measures download throughput of :func:`modules.utils.async_file_downloader` against a local HTTP server.
+
+The server stands in for Discord and Slack file hosts, it answers every request after --latency seconds
+and counts how many requests it's serving at once. Files are downloaded one at a time with
+:func:`modules.utils.download_file` and all at once with async_file_downloader, which is limited to
+config.DOWNLOAD_CONCURRENCY downloads at a time. Loop lag is measured during the concurrent downloads.
+
+Run from the src directory:
+    python -m benchmarks.downloads [--files 50] [--size 262144] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+import config
+from benchmarks.common import LoopLagProbe, report, report_lag
+from modules.utils import async_file_downloader, close_download_session, download_file
+
+
+class FileServer:
+    """Local HTTP server serving a file of `size` bytes on every path."""
+
+    def __init__(self, size: int, latency: float):
+        self.body = b"x" * size
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self.runner = None
+        self.port = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            return web.Response(body=self.body)
+        finally:
+            self.active -= 1
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{name}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self.runner.addresses[0][1]
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def run(args):
+    server = FileServer(args.size, args.latency)
+    await server.start()
+    urls = [f"http://127.0.0.1:{server.port}/{i}" for i in range(args.files)]
+
+    try:
+        start = time.perf_counter()
+        for url in urls:
+            await download_file(url)
+        report("sequential", len(urls), [time.perf_counter() - start], unit="files")
+
+        server.peak = 0
+        async with LoopLagProbe() as probe:
+            start = time.perf_counter()
+            files = await async_file_downloader(urls)
+            elapsed = time.perf_counter() - start
+
+        assert all(file is not None for file in files)
+        report("async_file_downloader", len(urls), [elapsed], unit="files")
+        report_lag("async_file_downloader", probe.lags)
+        print(
+            f"peak concurrent requests: {server.peak} "
+            f"(DOWNLOAD_CONCURRENCY={config.DOWNLOAD_CONCURRENCY})"
+        )
+    finally:
+        await close_download_session()
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="File download benchmark.")
+    parser.add_argument("--files", type=int, default=50, help="number of files")
+    parser.add_argument(
+        "--size", type=int, default=256 * 1024, help="file size in bytes"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds before the server answers"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measures level lookups in the precomputed points table against the cubic evaluated in a loop, which it replaced.
+
+Checks that :func:`modules.leveling.level_from_points` gives the same results as the loop, including on the exact
+point thresholds of every level, then times both for levels gained on a message and for recalculating
+the levels of every user in a guild.
+
+Run from the src directory:
+    python -m benchmarks.level_table [--users 100000] [--repeat 5]
+"""
+import argparse
+import random
+import timeit
+
+from benchmarks.common import report
+from modules.leveling import level_from_points, level_points
+
+
+def loop_levels_up(user_level: int, user_points: int) -> int:
+    """How LevelingMember.calculate_levels_up calculated the levels gained before the table."""
+    total_points = 0
+    total_levels_up = 0
+    while total_points <= user_points:
+        next_level = user_level + total_levels_up + 1
+        total_points = round(
+            5 / 6 * next_level * (2 * next_level * next_level + 27 * next_level + 91)
+        )
+        total_levels_up += 1
+
+    return total_levels_up - 1
+
+
+def table_levels_up(user_level: int, user_points: int) -> int:
+    """How LevelingMember.calculate_levels_up calculates the levels gained."""
+    return max(level_from_points(user_points) - user_level, 0)
+
+
+def check(users: list[tuple[int, int]]):
+    thresholds = [
+        (0, level_points(level) + offset)
+        for level in range(1, 1200)
+        for offset in (-1, 0, 1)
+    ]
+    for user_level, user_points in users + thresholds:
+        expected = loop_levels_up(user_level, user_points)
+        actual = table_levels_up(user_level, user_points)
+        assert expected == actual, (user_level, user_points, expected, actual)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Level table benchmark.")
+    parser.add_argument("--users", type=int, default=100_000, help="number of users")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    args = parser.parse_args()
+
+    random.seed(0)
+    users = []
+    for _ in range(args.users):
+        points = random.randint(0, 2_000_000)
+        # stored level is a few levels behind on the message that levels the user up
+        level = max(level_from_points(points) - random.randint(0, 2), 0)
+        users.append((level, points))
+
+    check(users)
+    print(f"level_from_points matches the loop for {len(users)} users and every threshold")
+
+    timings = timeit.repeat(
+        lambda: [loop_levels_up(level, points) for level, points in users],
+        number=1,
+        repeat=args.repeat,
+    )
+    report("loop levels up", len(users), timings, unit="users")
+
+    timings = timeit.repeat(
+        lambda: [table_levels_up(level, points) for level, points in users],
+        number=1,
+        repeat=args.repeat,
+    )
+    report("table levels up", len(users), timings, unit="users")
+
+    # recalculating every user from level 0, where the loop has to walk through every level
+    timings = timeit.repeat(
+        lambda: [loop_levels_up(0, points) for _, points in users],
+        number=1,
+        repeat=args.repeat,
+    )
+    report("loop recalculate all", len(users), timings, unit="users")
+
+    timings = timeit.repeat(
+        lambda: [level_from_points(points) for _, points in users],
+        number=1,
+        repeat=args.repeat,
+    )
+    report("table recalculate all", len(users), timings, unit="users")
+
+
+if __name__ == "__main__":
+    main()
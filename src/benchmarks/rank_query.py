@@ -0,0 +1,96 @@
+"""
+Measures how fast ranks are answered for a guild of 100k leveling users.
+
+Times :func:`modules.leveling.LevelingLeaderboard.rank`, which serves the rank command, and with --mongo
+the indexed count_documents query on leveling_users, the same query the leaderboard replaced,
+on a scratch database with the indexes from :func:`modules.database.Connection.create_indexes`.
+
+Run from the src directory:
+    python -m benchmarks.rank_query [--users 100000] [--queries 10000] [--mongo]
+"""
+import argparse
+import random
+import timeit
+from types import SimpleNamespace
+
+from benchmarks.common import report, scratch_database
+from modules.database import Connection
+from modules.leveling import LevelingLeaderboard
+
+GUILD_ID = 1
+
+
+def generate_users(count: int) -> list[dict]:
+    return [
+        {
+            "guild_id": GUILD_ID,
+            "user_id": user_id,
+            "pp": random.randint(0, 200_000),
+            "hp": random.randint(0, 50_000),
+            "rp": random.randint(0, 100),
+            "p_role": "",
+            "h_role": "",
+        }
+        for user_id in range(count)
+    ]
+
+
+def count_rank(collection, key: str, points: int) -> int:
+    return collection.count_documents({"guild_id": GUILD_ID, key: {"$gt": points}}) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank query benchmark.")
+    parser.add_argument("--users", type=int, default=100_000, help="users in the guild")
+    parser.add_argument("--queries", type=int, default=10_000, help="ranks per run")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs")
+    parser.add_argument(
+        "--mongo", action="store_true", help="also time count_documents on MongoDB"
+    )
+    args = parser.parse_args()
+
+    random.seed(0)
+    users = generate_users(args.users)
+    queries = [
+        (key, random.choice(users)[key])
+        for key in random.choices(LevelingLeaderboard.KEYS, k=args.queries)
+    ]
+
+    leaderboard = LevelingLeaderboard(GUILD_ID)
+    leaderboard.build(users)
+    timings = timeit.repeat(
+        lambda: [leaderboard.rank(key, points) for key, points in queries],
+        number=1,
+        repeat=args.repeat,
+    )
+    report("LevelingLeaderboard.rank", len(queries), timings, unit="ranks")
+
+    if not args.mongo:
+        return
+
+    with scratch_database() as db:
+        collection = db["leveling_users"]
+        collection.insert_many(users)
+        Connection.create_indexes(
+            SimpleNamespace(
+                leveling_users=collection,
+                timers=db["timers"],
+                captcha_channels=db["captcha_channels"],
+            )
+        )
+
+        # a database round trip per rank, so fewer queries are timed
+        mongo_queries = queries[: max(len(queries) // 10, 1)]
+        for key, points in mongo_queries[:100]:
+            assert count_rank(collection, key, points) == leaderboard.rank(key, points)
+
+        timings = timeit.repeat(
+            lambda: [count_rank(collection, key, p) for key, p in mongo_queries],
+            number=1,
+            repeat=args.repeat,
+        )
+        report("count_documents rank", len(mongo_queries), timings, unit="ranks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Measures the throughput of the Slack bridge text translation.
+
+Times DiscordMessage.normalize_text (discord -> slack) and SlackMessage.replace_valid_mentions (slack -> discord)
+on a set of realistic messages against a team of a few thousand members.
+The bridge objects are built without their __init__ so no Slack, Discord or database connection is made.
+
+Run from the src directory:
+    python -m benchmarks.slack_bridge_translation [--members 2000] [--repeat 5]
+"""
+import argparse
+import random
+import string
+import timeit
+
+from modules.slack_bridge import Slack, SlackTeam, SlackChannel, SlackMember, SlackMessage, DiscordMessage
+
+DISCORD_CHANNEL_ID = 1
+
+DISCORD_MESSAGES = [
+    'hey @{name} did you see the new bill?',
+    '**Reminder:** the debate starts at *8pm* today, details [here](https://example.com/debate)',
+    '@{name} @{other} can you two sort out the roles? <@5> already asked in <#9>',
+    'I think ***this*** is the most important part of the amendment, <@&3> please have a look',
+    'no formatting or mentions at all, just a plain message that is somewhat long for a chat message',
+    '> quoted text\n@{name} replying to the quote with **bold** text\nand a second line with *italic* text',
+]
+
+SLACK_MESSAGES = [
+    'hey <@{id}> did you see the new bill?',
+    '<@{id}> <@{other_id}> can you two sort out the roles in <#C0123|general>?',
+    'no mentions at all, just a plain message that is somewhat long for a chat message',
+    'an unknown member <@U0000000> and a channel without a name <#C0456>',
+]
+
+
+class Guild:
+    """Minimal stand in for discord.Guild, only what the translation looks up."""
+
+    class Object:
+        def __init__(self, object_id: int, name: str):
+            self.id = object_id
+            self.name = name
+
+    def get_member(self, member_id: int):
+        return self.Object(member_id, 'discord member')
+
+    def get_role(self, role_id: int):
+        return self.Object(role_id, 'moderators')
+
+    def get_channel(self, channel_id: int):
+        return self.Object(channel_id, 'general')
+
+
+def random_name() -> str:
+    words = random.randint(1, 3)
+    return ' '.join(
+        ''.join(random.choices(string.ascii_lowercase, k=random.randint(3, 9))) for _ in range(words)
+    )
+
+
+def build_bridge(member_count: int) -> tuple[Slack, list[SlackMember]]:
+    slack = Slack.__new__(Slack)
+    slack.teams = []
+    slack.discord_channels = {}
+
+    team = SlackTeam.__new__(SlackTeam)
+    team.__dict__.update({
+        'slack': slack,
+        'team_id': 'T0123',
+        'channels': {},
+        'members': {},
+        'discord_channels': {},
+        'discord_members': {},
+        '_member_names': None,
+    })
+    slack.teams.append(team)
+
+    channel = SlackChannel.__new__(SlackChannel)
+    channel.__dict__.update({'id': 'C0123', 'team': team, 'discord_channel': None})
+    team.channels[channel.id] = channel
+    team.discord_channels[DISCORD_CHANNEL_ID] = channel
+    slack.discord_channels[DISCORD_CHANNEL_ID] = channel
+
+    members = []
+    for i in range(member_count):
+        member = SlackMember.__new__(SlackMember)
+        member.__dict__.update({
+            'id': f'U{i:07}', 'team': team, 'held_by': team, 'name': random_name(), 'discord_member': None
+        })
+        team.members[member.id] = member
+        members.append(member)
+
+    return slack, members
+
+
+def build_messages(slack: Slack, members: list[SlackMember]) -> tuple[DiscordMessage, SlackMessage, list, list]:
+    discord_message = DiscordMessage.__new__(DiscordMessage)
+    discord_message.__dict__.update({'slack': slack, 'channel_id': DISCORD_CHANNEL_ID, 'guild': Guild()})
+
+    slack_message = SlackMessage.__new__(SlackMessage)
+    slack_message.__dict__.update({'slack': slack})
+
+    discord_texts = []
+    slack_texts = []
+    for _ in range(50):
+        member, other = random.sample(members, 2)
+        discord_texts += [text.format(name=member.name, other=other.name) for text in DISCORD_MESSAGES]
+        slack_texts += [text.format(id=member.id, other_id=other.id) for text in SLACK_MESSAGES]
+
+    return discord_message, slack_message, discord_texts, slack_texts
+
+
+def report(name: str, count: int, timings: list[float]):
+    best = min(timings)
+    print(f'{name}: {count / best:,.0f} messages/s ({best / count * 1e6:.1f} µs per message, best of {len(timings)})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Slack bridge text translation benchmark.')
+    parser.add_argument('--members', type=int, default=2000, help='number of members in the slack team')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs')
+    args = parser.parse_args()
+
+    random.seed(0)
+    slack, members = build_bridge(args.members)
+    discord_message, slack_message, discord_texts, slack_texts = build_messages(slack, members)
+
+    timings = timeit.repeat(
+        lambda: [discord_message.normalize_text(text) for text in discord_texts], number=1, repeat=args.repeat
+    )
+    report('DiscordMessage.normalize_text', len(discord_texts), timings)
+
+    timings = timeit.repeat(
+        lambda: [slack_message.replace_valid_mentions(text) for text in slack_texts], number=1, repeat=args.repeat
+    )
+    report('SlackMessage.replace_valid_mentions', len(slack_texts), timings)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import asyncio
 import copy
 import os
+import time
 import traceback
 from datetime import datetime
 
@@ -49,6 +50,8 @@ class TLDR(Bot):
         self.settings_handler = modules.utils.SettingsHandler()
         self.left_check = asyncio.Event()
         self.logger = modules.utils.get_logger()
+        db.create_indexes()
+        self.countdowns = modules.timers.Countdowns(self)
         self.command_system = modules.commands.CommandSystem(self)
 
         # Load Cogs
@@ -60,8 +63,12 @@ class TLDR(Bot):
                 ):
                     continue
 
+                start = time.perf_counter()
                 self.load_extension(f"cogs.{filename[:-3]}")
-                self.logger.info(f"Cog {filename[:-3]} is now loaded.")
+                load_time = (time.perf_counter() - start) * 1000
+                self.logger.info(
+                    f"Cog {filename[:-3]} is now loaded. Took {load_time:.2f}ms"
+                )
 
         self.google_drive = (
             modules.google_drive.Drive()
@@ -152,6 +159,24 @@ class TLDR(Bot):
         self.command_system.initialize_cog(cog)
         super().add_cog(cog)
 
+    async def close(self):
+        """Overwrites the original close method to flush buffered leveling and watchlist writes before shutting down."""
+        if self.leveling_system:
+            await self.leveling_system.flush()
+            self.logger.info(
+                f"Leveling write buffer saved {self.leveling_system.write_buffer.writes_saved} database writes."
+            )
+
+        if self.watchlist:
+            await self.watchlist.flush_matches()
+
+        if self.captcha:
+            self.captcha.close_captcha_executor()
+
+        self.countdowns.close()
+        await modules.utils.close_download_session()
+        await super().close()
+
     async def critical_error(self, error: str):
         """
         For errors which would cause the bot not to function.
@@ -259,7 +284,7 @@ class TLDR(Bot):
             return await self.process_command(message)
 
     async def check_custom_command(self, message: discord.Message):
-        custom_command = self.custom_commands.match_message(message)
+        custom_command = await self.custom_commands.match_message(message)
         if custom_command:
             # get ctx
             ctx = await self.get_context(message)
@@ -57,12 +57,12 @@ class Admin(Cog):
         for team in self.bot.slack_bridge.teams:
             unbridged_channels = " | ".join(
                 f"`{channel.id}`"
-                for channel in team.channels
+                for channel in team.channels.values()
                 if not channel.discord_channel
             )
             bridged_channels = "\n".join(
                 f"`{channel.id}` - [<#{channel.discord_channel.id}>]"
-                for channel in team.channels
+                for channel in team.channels.values()
                 if channel.discord_channel
             )
             unbridge_value += (
@@ -208,12 +208,12 @@ class Admin(Cog):
         for team in self.bot.slack_bridge.teams:
             unaliased_members = " | ".join(
                 f"`{member.id}`"
-                for member in team.members
+                for member in team.members.values()
                 if not member.discord_member and not member.discord_name
             )
             aliased_members = "\n".join(
                 f"`{member.id}` - [{alias(member)}]"
-                for member in team.members
+                for member in team.members.values()
                 if member.discord_member or member.discord_name
             )
             unaliased_value += (
@@ -991,6 +991,8 @@ class Admin(Cog):
         args["guild_id"] = ctx.guild.id
         # insert into database
         db.custom_commands.insert(args)
+        if self.bot.custom_commands:
+            self.bot.custom_commands.invalidate(ctx.guild.id)
 
         # convert args into string that can be presented to user who created the command
         attributes_str = self.custom_command_args_to_string(args)
@@ -1081,6 +1083,8 @@ class Admin(Cog):
         db.custom_commands.update_one(
             {"guild_id": ctx.guild.id, "name": old_command_name}, {"$set": args}
         )
+        if self.bot.custom_commands:
+            self.bot.custom_commands.invalidate(ctx.guild.id)
 
         # convert args into string that can be presented to user who created the command
         attributes_str = self.custom_command_args_to_string(args, old=existing)
@@ -1116,6 +1120,8 @@ class Admin(Cog):
         db.custom_commands.delete_one(
             {"guild_id": ctx.guild.id, "name": command["name"]}
         )
+        if self.bot.custom_commands:
+            self.bot.custom_commands.invalidate(ctx.guild.id)
 
         return await embed_maker.message(
             ctx,
@@ -46,10 +46,10 @@ class Captcha(Cog):
         ):
             mid = entry["mid"]
             member_cache_entry = (
-                self.bot.captcha.get_data_manager().get_blacklisted_member(mid)
+                await self.bot.captcha.get_data_manager().get_blacklisted_member(mid)
             )
-            blacklist_entry = (
-                self.bot.captcha.get_data_manager().get_blacklisted_member_info(mid)
+            blacklist_entry = await self.bot.captcha.get_data_manager().get_blacklisted_member_info(
+                mid
             )
             if member_cache_entry is None:
                 self.bot.logger.info(f"Failed to find associated name for {mid}.")
@@ -184,7 +184,7 @@ class Captcha(Cog):
         r_invites = list(
             map(
                 lambda e: e["code"],
-                self.bot.captcha.get_data_manager().get_all_registered_invites(2),
+                await self.bot.captcha.get_data_manager().get_all_registered_invites(2),
             )
         )
 
@@ -223,7 +223,7 @@ class Captcha(Cog):
 
         try:
             invite: Union[Invite, None] = await self.bot.fetch_invite(invite_url)
-            if data_manager.is_registered_invitation(invite.id):
+            if await data_manager.is_registered_invitation(invite.id):
                 return await embed_maker.message(
                     ctx,
                     description=f"Already registered invitation supplied.",
@@ -231,7 +231,7 @@ class Captcha(Cog):
                     send=True,
                 )
             else:
-                data_manager.add_registered_invitation(invite.id, 2)
+                await data_manager.add_registered_invitation(invite.id, 2)
                 return await embed_maker.message(
                     ctx,
                     description=f"Added invitation to the registered invitations collection.",
@@ -254,7 +254,9 @@ class Captcha(Cog):
         cls=Command,
     )
     async def report_mod_cmd(self, ctx: Context):
-        return await ctx.send(embed=self.bot.captcha.construct_scheduled_report_embed())
+        return await ctx.send(
+            embed=await self.bot.captcha.construct_scheduled_report_embed()
+        )
 
     @captcha_cmd.group(
         help="A set of commands used to configure the configurable elements of this feature.",
@@ -337,7 +339,7 @@ class Captcha(Cog):
         cls=Command,
     )
     async def blacklist_list_mod_cmd(self, ctx: Context):
-        blacklist = self.bot.captcha.get_data_manager().get_blacklist()
+        blacklist = await self.bot.captcha.get_data_manager().get_blacklist()
         max_page_size = 6
         max_page_num = math.ceil(len(blacklist) / max_page_size)
         page_constructor = functools.partial(
@@ -400,7 +402,9 @@ class Captcha(Cog):
 
         name_string = args["name"] if args["name"] is not None else split_pre[0]
 
-        blacklisted_members = data_manager.get_blacklisted_members(username=name_string)
+        blacklisted_members = await data_manager.get_blacklisted_members(
+            username=name_string
+        )
 
         if len(blacklisted_members) > 0:
             return await embed_maker.message(
@@ -429,8 +433,8 @@ class Captcha(Cog):
             if bit.endswith("s"):
                 duration_in_seconds = duration_in_seconds + int(bit.strip("s"))
 
-        data_manager.add_blacklisted_member(member)
-        data_manager.add_member_to_blacklist(member.id, duration_in_seconds)
+        await data_manager.add_blacklisted_member(member)
+        await data_manager.add_member_to_blacklist(member.id, duration_in_seconds)
         await embed_maker.message(
             ctx,
             description=f"Blacklisted member {member.display_name} for {' '.join(amount_string_bits)}.",
@@ -451,13 +455,13 @@ class Captcha(Cog):
 
         data_manager = self.bot.captcha.get_data_manager()
         blacklisted_members = list(
-            data_manager.get_blacklisted_members(username=argument)
+            await data_manager.get_blacklisted_members(username=argument)
             if argument.isnumeric() is False
-            else data_manager.get_blacklisted_members(member_id=int(argument))
+            else await data_manager.get_blacklisted_members(member_id=int(argument))
         )
 
         is_blacklisted = (
-            data_manager.is_blacklisted(member_id=int(argument))
+            await data_manager.is_blacklisted(member_id=int(argument))
             if argument.isnumeric()
             else True
         )
@@ -491,9 +495,9 @@ class Captcha(Cog):
             member_entry["mid"] if len(blacklisted_members) > 0 else int(argument)
         )
         await self.bot.captcha.unban(member_id=member_id)
-        data_manager.reset_captcha_counter(member_id=member_id)
-        data_manager.remove_blacklisted_member(member_id)
-        data_manager.remove_member_from_blacklist(member_id)
+        await data_manager.reset_captcha_counter(member_id=member_id)
+        await data_manager.remove_blacklisted_member(member_id)
+        await data_manager.remove_member_from_blacklist(member_id)
 
         await embed_maker.message(
             ctx,
@@ -569,12 +573,14 @@ class Captcha(Cog):
         blacklisted_members = list(
             (
                 (
-                    data_manager.get_blacklisted_members(username=argument)
+                    await data_manager.get_blacklisted_members(username=argument)
                     if argument.isnumeric() is False
-                    else data_manager.get_blacklisted_members(member_id=int(argument))
+                    else await data_manager.get_blacklisted_members(
+                        member_id=int(argument)
+                    )
                 )
                 if argument != ""
-                else data_manager.get_blacklisted_members()
+                else await data_manager.get_blacklisted_members()
             )
         )
 
@@ -629,7 +635,7 @@ class Captcha(Cog):
 
         data_manager = self.bot.captcha.get_data_manager()
         blacklisted_members = list(
-            data_manager.get_blacklisted_members(member_id=member.id)
+            await data_manager.get_blacklisted_members(member_id=member.id)
         )
 
         if len(blacklisted_members) > 0:
@@ -640,7 +646,7 @@ class Captcha(Cog):
                 title="Member already in Blacklist.",
             )
 
-        data_manager.add_blacklisted_member(member)
+        await data_manager.add_blacklisted_member(member)
         await embed_maker.message(
             ctx,
             description=f"Added member {member.display_name}/{member.id} to blacklist cache. The member will be removed manually or automatically if the member has a temporary ban that has elasped.",
@@ -661,12 +667,12 @@ class Captcha(Cog):
         data_manager = self.bot.captcha.get_data_manager()
         print(f"Is {argument} numeric: {argument.isnumeric()}")
         blacklisted_members = list(
-            data_manager.get_blacklisted_members(username=argument)
+            await data_manager.get_blacklisted_members(username=argument)
             if argument.isnumeric() is False
-            else data_manager.get_blacklisted_members(member_id=int(argument))
+            else await data_manager.get_blacklisted_members(member_id=int(argument))
         )
 
-        is_blacklisted = data_manager.is_blacklisted(int(argument))
+        is_blacklisted = await data_manager.is_blacklisted(int(argument))
 
         if len(blacklisted_members) == 0 and is_blacklisted is False:
             return await embed_maker.message(
@@ -684,12 +690,12 @@ class Captcha(Cog):
                 send=True,
             )
 
-        data_manager.reset_captcha_counter(
+        await data_manager.reset_captcha_counter(
             member_id=blacklisted_members[0]["mid"]
             if len(blacklisted_members) > 0
             else int(argument)
         )
-        data_manager.remove_blacklisted_member(
+        await data_manager.remove_blacklisted_member(
             member_id=blacklisted_members[0]["mid"]
             if len(blacklisted_members)
             else int(argument)
@@ -962,7 +968,7 @@ class Captcha(Cog):
         cls=Command,
     )
     async def dev_create_captcha_image(self, ctx: Context):
-        captcha_image, captcha_text = self.bot.captcha.create_captcha_image()
+        captcha_image, captcha_text = await self.bot.captcha.create_captcha_image()
         embed: Embed = await embed_maker.message(
             ctx, title="Captcha Image.", description=f"Text: {captcha_text}"
         )
@@ -149,6 +149,29 @@ class Dev(Cog):
 
         await ctx.send(result)
 
+    @command(
+        help="Show hit rate and resident size of the leveling member cache",
+        usage="leveling_cache_stats",
+        examples=["leveling_cache_stats"],
+        cls=commands.Command,
+    )
+    async def leveling_cache_stats(self, ctx: Context):
+        if self.bot.leveling_system is None:
+            return await embed_maker.error(ctx, "Leveling system is disabled")
+
+        leveling_guild = self.bot.leveling_system.get_guild(ctx.guild.id)
+        if leveling_guild is None:
+            return await embed_maker.error(ctx, "Leveling guild hasn't been loaded")
+
+        stats = leveling_guild.members.stats()
+        description = (
+            f"**Hit rate:** {stats['hit_rate'] * 100:.2f}%\n"
+            f"**Hits:** {stats['hits']} | **Misses:** {stats['misses']}\n"
+            f"**Resident members:** {stats['size']}/{stats['maxsize']}\n"
+            f"**Idle TTL:** {stats['ttl']}s"
+        )
+        return await embed_maker.message(ctx, description=description, send=True)
+
     @command(
         help="Disable a command",
         usage="disable_command",
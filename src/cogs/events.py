@@ -14,6 +14,7 @@ from discord.ext.commands import Cog, Context
 from modules import database, embed_maker, format_time
 from modules.captcha_verification import CaptchaChannel
 from modules.custom_commands import Guild, Message
+from modules.utils import member_indexes
 
 db = database.get_connection()
 
@@ -97,7 +98,7 @@ class Events(Cog):
             return await channel.send(msg)
         else:
             # start final timer which sends daily debate topic
-            self.bot.timers.create(
+            await self.bot.timers.create(
                 expires=dd_time,
                 guild_id=guild.id,
                 event="daily_debate_final",
@@ -195,7 +196,7 @@ class Events(Cog):
 
                 # start 20h to send results to users
                 expires = round(time.time() + (3600 * 20))
-                self.bot.timers.create(
+                await self.bot.timers.create(
                     guild_id=guild_id,
                     expires=expires,
                     event="dd_results",
@@ -452,7 +453,7 @@ class Events(Cog):
                 )
 
             expires = int(time.time()) + (60 * 10)  # 10 minutes
-            self.bot.timers.create(
+            await self.bot.timers.create(
                 guild_id=0,
                 expires=expires,
                 event="delete_temp_poll",
@@ -492,6 +493,9 @@ class Events(Cog):
                             },
                             {"$set": {f"{branch.name[0]}_role": after.name}},
                         )
+                        leveling_guild.leaderboard.rename_role(
+                            branch.name[0], before.name, after.name
+                        )
 
     @Cog.listener()
     async def on_guild_remove(self, guild: Guild):
@@ -513,6 +517,9 @@ class Events(Cog):
         guild_id = member.guild.id
         user_id = member.id
 
+        if guild_id in member_indexes:
+            member_indexes[guild_id].add(member)
+
         if self.bot.captcha:
             await self.bot.captcha.on_member_join(member)
 
@@ -528,6 +535,10 @@ class Events(Cog):
             )
             del left_user["_id"]
             db.leveling_users.insert_one(left_user)
+            if self.bot.leveling_system:
+                leveling_guild = self.bot.leveling_system.get_guild(guild_id)
+                if leveling_guild:
+                    leveling_guild.leaderboard.add_user(left_user)
 
             # delete timer
             db.timers.delete_one(
@@ -560,9 +571,18 @@ class Events(Cog):
 
     @Cog.listener()
     async def on_member_remove(self, member: discord.Member):
+        if member.guild.id in member_indexes:
+            member_indexes[member.guild.id].remove(member.id)
+
         if self.bot.captcha:
             await self.bot.captcha.on_member_leave(member)
 
+        if self.bot.leveling_system:
+            # make sure the data that gets transferred is up to date
+            await self.bot.leveling_system.write_buffer.flush(
+                member.guild.id, member.id
+            )
+
         leveling_user = db.leveling_users.find_one(
             {"guild_id": member.guild.id, "user_id": member.id}
         )
@@ -570,7 +590,25 @@ class Events(Cog):
         if not leveling_user:
             return
 
-        self.bot.leveling_system.transfer_leveling_data(leveling_user)
+        await self.bot.leveling_system.transfer_leveling_data(leveling_user)
+
+    @Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.guild.id not in member_indexes:
+            return
+
+        if before.display_name != after.display_name:
+            member_indexes[after.guild.id].add(after)
+
+    @Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        if str(before) == str(after):
+            return
+
+        for member_index in member_indexes.values():
+            member = member_index.guild.get_member(after.id)
+            if member:
+                member_index.add(member)
 
     @Cog.listener()
     async def on_leveling_data_expires_timer_over(self, timer: dict):
@@ -627,6 +665,10 @@ class Events(Cog):
         db.leveling_users.delete_one(
             {"guild_id": member.guild.id, "user_id": member.id}
         )
+        if self.bot.leveling_system:
+            leveling_guild = self.bot.leveling_system.get_guild(member.guild.id)
+            if leveling_guild:
+                leveling_guild.leaderboard.remove(member.id)
 
 
 def setup(bot):
@@ -1,10 +1,11 @@
+import asyncio
 import datetime
 import functools
 import math
 import re
 import time
 from random import randint
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 import discord
 from bot import TLDR
@@ -141,7 +142,7 @@ class Leveling(Cog):
 
         # start rep timer if giving leveling_member has rep@ enabled
         if giving_leveling_member.settings.rep_at:
-            self.bot.timers.create(
+            await self.bot.timers.create(
                 guild_id=ctx.guild.id,
                 expires=round(time.time()) + 86400,  # 24 hours
                 event="rep_at",
@@ -188,12 +189,8 @@ class Leveling(Cog):
 
             # Looks up how many people have a role
             count = {
-                role.name: db.leveling_users.count(
-                    {
-                        "guild_id": ctx.guild.id,
-                        f"{branch.name[0]}_role": role.name,
-                        f"{branch.name[0]}p": {"$gt": 0},
-                    }
+                role.name: leveling_guild.leaderboard.role_count(
+                    branch.name[0], role.name
                 )
                 for role in branch.roles
             }
@@ -611,18 +608,7 @@ class Leveling(Cog):
         points = leveling_member.parliamentary.points
         if not level:
             # points needed until level_up
-            pp_till_next_level = (
-                round(
-                    (5 / 6)
-                    * (user_level + 1)
-                    * (
-                        2 * (user_level + 1) * (user_level + 1)
-                        + 27 * (user_level + 1)
-                        + 91
-                    )
-                )
-                - points
-            )
+            pp_till_next_level = leveling.level_points(user_level + 1) - points
             avg_msg_needed = math.ceil(pp_till_next_level / 20)
 
             # points needed to rank up
@@ -630,14 +616,7 @@ class Leveling(Cog):
             missing_levels = 6 - user_rank
 
             rank_up_level = user_level + missing_levels
-            pp_needed_rank_up = (
-                round(
-                    (5 / 6)
-                    * rank_up_level
-                    * (2 * rank_up_level * rank_up_level + 27 * rank_up_level + 91)
-                )
-                - points
-            )
+            pp_needed_rank_up = leveling.level_points(rank_up_level) - points
             avg_msg_rank_up = math.ceil(pp_needed_rank_up / 20)
             description = (
                 f"Messages needed to:\n"
@@ -645,9 +624,7 @@ class Leveling(Cog):
                 f"Rank up: **{avg_msg_rank_up}**"
             )
         else:
-            pp_needed = (
-                round((5 / 6) * level * (2 * level * level + 27 * level + 91)) - points
-            )
+            pp_needed = leveling.level_points(level) - points
             avg_msg_needed = math.ceil(pp_needed / 20)
             description = (
                 f"Messages needed to reach level `{level}`: **{avg_msg_needed}**"
@@ -661,15 +638,15 @@ class Leveling(Cog):
         self,
         ctx: Context,
         branch: leveling.LevelingRoute,
-        sorted_users: list,
+        user_ids: list,
         index: int,
         your_pos: bool = False,
     ):
         lb_str = ""
-        for i, leveling_user in enumerate(sorted_users):
+        for i, user_id in enumerate(user_ids):
 
             leveling_member = await self.bot.leveling_system.get_member(
-                ctx.guild.id, leveling_user["user_id"]
+                ctx.guild.id, user_id
             )
             addition = 0 if your_pos else 1
 
@@ -710,17 +687,19 @@ class Leveling(Cog):
         ctx: Context,
         branch: leveling.LevelingRoute,
         user_index: int,
-        sorted_users: list,
         page_size_limit: int,
         max_page_num: int,
         *,
         page: int,
     ):
-        sorted_users_page = sorted_users[
-            page_size_limit * (page - 1) : page_size_limit * page
-        ]
+        key = f"{branch.name[0]}p"
+        leaderboard = self.bot.leveling_system.get_guild(ctx.guild.id).leaderboard
+
+        page_user_ids = leaderboard.page(
+            key, page_size_limit * (page - 1), page_size_limit * page
+        )
         leaderboard_str = await self.construct_lb_str(
-            ctx, branch, sorted_users_page, index=page_size_limit * (page - 1)
+            ctx, branch, page_user_ids, index=page_size_limit * (page - 1)
         )
         description = (
             "Damn, this place is empty" if not leaderboard_str else leaderboard_str
@@ -734,12 +713,12 @@ class Leveling(Cog):
         )
 
         # Displays user position under leaderboard and users above and below them if user is below position 10
-        if user_index < len(sorted_users) and not (
+        if user_index < leaderboard.count(key) and not (
             user_index + 1 <= page * page_size_limit
         ):
-            sorted_users_segment = sorted_users[user_index - 1 : user_index + 2]
+            your_pos_user_ids = leaderboard.page(key, user_index - 1, user_index + 2)
             your_pos_str = await self.construct_lb_str(
-                ctx, branch, sorted_users_segment, user_index, your_pos=True
+                ctx, branch, your_pos_user_ids, user_index, your_pos=True
             )
             leaderboard_embed.add_field(name="Your Position", value=your_pos_str)
 
@@ -771,30 +750,21 @@ class Leveling(Cog):
             branch = branch_switch.get(branch[0], leveling_routes.parliamentary)
 
         key = f"{branch.name[0]}p"
-        # get list of users sorted by points who have more than 0 points
-        sorted_users = [
-            u
-            for u in db.leveling_users.find(
-                {"guild_id": ctx.guild.id, key: {"$gt": 0}}
-            ).sort(key, -1)
-        ]
+        leaderboard = leveling_guild.leaderboard
 
         page_size_limit = 10
 
         # calculate max page number
-        max_page_num = math.ceil(len(sorted_users) / page_size_limit)
+        max_page_num = math.ceil(leaderboard.count(key) / page_size_limit)
         if max_page_num == 0:
             max_page_num = 1
 
         if page > max_page_num:
             return await embed_maker.error(ctx, "Exceeded maximum page number")
 
-        leveling_user = db.get_leveling_user(ctx.guild.id, ctx.author.id)
-        user_index = (
-            sorted_users.index(leveling_user)
-            if leveling_user in sorted_users
-            else len(sorted_users)
-        )
+        user_index = leaderboard.position(key, ctx.author.id)
+        if user_index is None:
+            user_index = leaderboard.count(key)
 
         # create function with all the needed values except page, so the function can be called with only the page kwarg
         page_constructor = functools.partial(
@@ -802,7 +772,6 @@ class Leveling(Cog):
             ctx,
             branch,
             user_index,
-            sorted_users,
             page_size_limit,
             max_page_num,
         )
@@ -831,7 +800,7 @@ class Leveling(Cog):
     ):
         role_level = leveling_member.user_role_level(user_branch)
 
-        # calculate user rank by counting users who have more points than user
+        # calculate user rank from the guild's leaderboard
         rank = leveling_member.rank(user_branch)
 
         leveling_role = leveling_member.guild.get_leveling_role(user_branch.role)
@@ -843,16 +812,7 @@ class Leveling(Cog):
         progress = leveling_member.percent_till_next_level(user_branch)
 
         if verbose:
-            points_till_next_level = round(
-                5
-                / 6
-                * (user_branch.level + 1)
-                * (
-                    2 * (user_branch.level + 1) * (user_branch.level + 1)
-                    + 27 * (user_branch.level + 1)
-                    + 91
-                )
-            )
+            points_till_next_level = leveling.level_points(user_branch.level + 1)
             cooldown_object = self.pp_cooldown
 
             cooldown = f"{cooldown_object.user_cooldown(leveling_member.guild.id, leveling_member.id)} seconds"
@@ -1038,41 +998,78 @@ class Leveling(Cog):
                     ctx, description=msg, colour=colour, send=True
                 )
 
-    async def process_message(self, message: discord.Message):
-        author = message.author
-        guild = message.guild
-
-        leveling_member = await self.bot.leveling_system.get_member(guild.id, author.id)
-
-        # level parliamentary route
-        if not self.pp_cooldown.user_cooldown(guild.id, author.id):
-            pp_add = randint(15, 25)
-            await leveling_member.add_points("parliamentary", pp_add)
+    async def process_messages(self, messages: List[discord.Message]):
+        """
+        Gives points for a window of messages collected by :class:`modules.leveling.LevelingSystem`.
+        Points are added up per member, so every member gets one points update and one level up check per branch.
+        """
+        # (guild_id, member_id) -> message that earned points last, parliamentary points, honours points
+        earned_points = {}
+        for message in messages:
+            guild = message.guild
+            author = message.author
+
+            leveling_guild = self.bot.leveling_system.get_guild(guild.id)
+            if leveling_guild is None:
+                continue
+
+            pp_add = 0
+            hp_add = 0
+            # level parliamentary route
+            if not self.pp_cooldown.user_cooldown(guild.id, author.id):
+                pp_add = randint(15, 25)
+
+            # level honours route
+            if (
+                message.channel.id in leveling_guild.honours_channels
+                and not self.hp_cooldown.user_cooldown(guild.id, author.id)
+            ):
+                hp_add = randint(7, 12)
+
+            if not pp_add and not hp_add:
+                continue
+
+            _, pp, hp = earned_points.get((guild.id, author.id), (None, 0, 0))
+            earned_points[(guild.id, author.id)] = (message, pp + pp_add, hp + hp_add)
+
+        results = await asyncio.gather(
+            *[
+                self.add_message_points(message, pp_add, hp_add)
+                for message, pp_add, hp_add in earned_points.values()
+            ],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                await self.bot.on_event_error(result, "process_messages")
 
-            branch = leveling_member.guild.get_leveling_route("parliamentary")
-            current_role, levels_up, roles_up = await leveling_member.level_up(branch)
+    async def add_message_points(
+        self, message: discord.Message, pp_add: int, hp_add: int
+    ):
+        leveling_member = await self.bot.leveling_system.get_member(
+            message.guild.id, message.author.id
+        )
+        if leveling_member is None:
+            return
 
-            if levels_up:
-                current_role = await current_role.get_guild_role()
-                await leveling_member.level_up_message(
-                    message, leveling_member.parliamentary, current_role, roles_up
-                )
+        for branch_name, points in (("parliamentary", pp_add), ("honours", hp_add)):
+            if not points:
+                continue
 
-        # level honours route
-        if (
-            message.channel.id in leveling_member.guild.honours_channels
-            and not self.hp_cooldown.user_cooldown(guild.id, author.id)
-        ):
-            hp_add = randint(7, 12)
-            await leveling_member.add_points("honours", hp_add)
+            await leveling_member.add_points(branch_name, points)
 
-            branch = leveling_member.guild.get_leveling_route("honours")
+            branch = leveling_member.guild.get_leveling_route(branch_name)
             current_role, levels_up, roles_up = await leveling_member.level_up(branch)
 
             if levels_up:
+                user_branch = (
+                    leveling_member.parliamentary
+                    if branch_name == "parliamentary"
+                    else leveling_member.honours
+                )
                 current_role = await current_role.get_guild_role()
                 await leveling_member.level_up_message(
-                    message, leveling_member.honours, current_role, roles_up
+                    message, user_branch, current_role, roles_up
                 )
 
 
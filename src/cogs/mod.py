@@ -98,7 +98,7 @@ class Mod(Cog):
     async def cases_menu(
         self, ctx: Context, member: discord.Member, case_type: str, page: int = 1
     ):
-        member_cases = self.bot.moderation.cases.get_cases(
+        member_cases = await self.bot.moderation.cases.get_cases(
             ctx.guild.id, member_id=member.id, type=case_type
         )
 
@@ -244,7 +244,7 @@ class Mod(Cog):
 
         # confirm that user has been warned
         thirty_days_ago = time.time() - (30 * 24 * 60)
-        user_warns = self.bot.moderation.cases.get_cases(
+        user_warns = await self.bot.moderation.cases.get_cases(
             ctx.guild.id, member_id=member.id, type="warn", after=thirty_days_ago
         )
         await embed_maker.message(
@@ -256,7 +256,7 @@ class Mod(Cog):
         )
 
         # add case to the database
-        self.bot.moderation.cases.add_case(
+        await self.bot.moderation.cases.add_case(
             ctx.guild.id, "warn", reason, member, ctx.author
         )
 
@@ -406,7 +406,7 @@ class Mod(Cog):
 
         # confirm that user has been warned
         thirty_days_ago = time.time() - (30 * 24 * 60)
-        user_warns = self.bot.moderation.cases.get_cases(
+        user_warns = await self.bot.moderation.cases.get_cases(
             ctx.guild.id, member_id=member.id, type="warn", after=thirty_days_ago
         )
         await embed_maker.message(
@@ -419,7 +419,7 @@ class Mod(Cog):
         )
 
         # add case to the database
-        self.bot.moderation.cases.add_case(
+        await self.bot.moderation.cases.add_case(
             ctx.guild.id,
             "mute",
             reason,
@@ -436,7 +436,7 @@ class Mod(Cog):
             await member.add_roles(mute_role)
 
         # start automatic unmute timer
-        self.bot.timers.create(
+        await self.bot.timers.create(
             guild_id=ctx.guild.id,
             expires=round(time.time()) + duration,
             event="automatic_unmute",
@@ -532,7 +532,7 @@ class Mod(Cog):
         )
 
         # add case to the database
-        self.bot.moderation.cases.add_case(
+        await self.bot.moderation.cases.add_case(
             ctx.guild.id, "ban", reason, member, ctx.author
         )
 
@@ -901,6 +901,51 @@ class Mod(Cog):
             send=True,
         )
 
+    @watchlist.command(
+        name="filter_stats",
+        help="See how often the filters of a user on the watchlist are matched. "
+        "Hit rate is the share of messages checked since the bot started that matched the filter. "
+        "If no user is given, stats of the generic filters will be shown.",
+        usage="watchlist filter_stats (user)",
+        examples=["watchlist filter_stats hattyot", "watchlist filter_stats"],
+        cls=commands.Command,
+        module_dependency=["watchlist"],
+    )
+    async def watchlist_filter_stats(self, ctx: Context, user_identifier: str = None):
+        member = await get_member(ctx, user_identifier) if user_identifier else None
+        if type(member) == discord.Message:
+            return
+
+        # looked up directly, get_member would create the generic entry if it doesn't exist
+        user_id = member.id if member else 0
+        guild_watchlist_data = self.bot.watchlist.watchlist_data.get(ctx.guild.id, {})
+        watchlist_user = guild_watchlist_data.get(user_id)
+        if not watchlist_user:
+            if member:
+                return await embed_maker.error(ctx, "User is not on the watchlist")
+            return await embed_maker.error(ctx, "No filters have been set")
+
+        stats = self.bot.watchlist.filter_stats(ctx.guild.id, user_id)
+        if not stats:
+            return await embed_maker.error(ctx, "No filters have been set")
+
+        checked = self.bot.watchlist.checked_messages[(ctx.guild.id, user_id)]
+        description = f"Messages checked since startup: **{checked}**\n\n"
+        description += "\n".join(
+            f"`{s['regex']}` - **{s['matches']}** matches | "
+            f"**{s['session_matches']}** since startup | "
+            f"hit rate: **{s['hit_rate']:.2%}**"
+            for s in sorted(stats, key=lambda s: s["matches"], reverse=True)
+        )
+        return await embed_maker.message(
+            ctx,
+            description=description,
+            author={
+                "name": f"Watchlist filter stats - {member if member else 'Generic'}"
+            },
+            send=True,
+        )
+
     @staticmethod
     async def construct_dd_embed(
         ctx: Context,
@@ -1924,7 +1969,7 @@ class Mod(Cog):
 
         # -1h so mods can be warned when there are no daily debate topics set up
         timer_expires = round(time.time()) + time_diff_seconds - 3600  # one hour
-        self.bot.timers.create(
+        await self.bot.timers.create(
             guild_id=guild_id, expires=timer_expires, event="daily_debate", extras={}
         )
 
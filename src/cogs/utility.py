@@ -279,7 +279,7 @@ class Utility(Cog):
         # start timer
         # we shall also use the timer to keep track of votes and who voted
         print(f"Question: {question}")
-        self.bot.timers.create(
+        await self.bot.timers.create(
             guild_id=ctx.guild.id,
             expires=expires,
             event="anon_poll",
@@ -389,7 +389,7 @@ class Utility(Cog):
         # run poll timer again if needed
         elif update_interval:
             expires = round(time.time()) + round(update_interval)
-            return self.bot.timers.create(
+            return await self.bot.timers.create(
                 guild_id=timer["guild_id"],
                 expires=expires,
                 event="anon_poll",
@@ -571,7 +571,7 @@ class Utility(Cog):
             return await embed_maker.error(ctx, "You cannot have an empty reminder")
 
         expires = round(time.time()) + remind_time
-        self.bot.timers.create(
+        await self.bot.timers.create(
             expires=expires,
             guild_id=ctx.guild.id,
             event="reminder",
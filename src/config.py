@@ -23,6 +23,15 @@ SLACK_CLIENT_ID = config.get("SLACK_CLIENT_ID")
 SLACK_CLIENT_SECRET = config.get("SLACK_CLIENT_SECRET")
 SLACK_REDIRECT_DOMAIN = config.get("SLACK_REDIRECT_DOMAIN")
 EMBED_COLOUR = int(config.get("EMBED_COLOUR"), 16)
+# max number of leveling members kept in memory per guild and the seconds an idle member stays in memory
+LEVELING_MEMBER_CACHE_SIZE = int(config.get("LEVELING_MEMBER_CACHE_SIZE") or 5000)
+LEVELING_MEMBER_CACHE_TTL = int(config.get("LEVELING_MEMBER_CACHE_TTL") or 3600)
+# max number of files downloaded at once and the max size of a downloaded file in bytes
+DOWNLOAD_CONCURRENCY = int(config.get("DOWNLOAD_CONCURRENCY") or 5)
+DOWNLOAD_MAX_SIZE = int(config.get("DOWNLOAD_MAX_SIZE") or 8 * 1024 * 1024)
+# number of processes rendering captcha images and the number of captchas rendered in advance
+CAPTCHA_WORKERS = int(config.get("CAPTCHA_WORKERS") or 2)
+CAPTCHA_BUFFER_SIZE = int(config.get("CAPTCHA_BUFFER_SIZE") or 50)
 
 MODULES = {
     # "clearance": False,
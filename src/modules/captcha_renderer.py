@@ -0,0 +1,36 @@
+"""
+Captcha rendering run in the worker processes of :class:`modules.captcha_verification.CaptchaModule`.
+
+Kept apart from the rest of the bot and only importing captcha, so loading it in a worker process
+doesn't import discord, the database or any of the other modules.
+"""
+import io
+
+from captcha.image import ImageCaptcha
+
+# ImageCaptcha of the process rendering the captchas, created on the first render in every worker process
+_image_captcha = None
+
+
+def render_captcha_image(text: str) -> bytes:
+    """
+    Renders a captcha image.
+
+    Parameters
+    ----------
+    text: :class:`str`
+        The text in the image.
+
+    Returns
+    -------
+    :class:`bytes`
+        The image encoded as PNG.
+    """
+    global _image_captcha
+
+    if _image_captcha is None:
+        _image_captcha = ImageCaptcha(width=360, height=120)
+
+    image_bytes = io.BytesIO()
+    _image_captcha.generate_image(text).save(image_bytes, "PNG")
+    return image_bytes.getvalue()
@@ -1,16 +1,19 @@
 import asyncio
 import io
 import math
+import multiprocessing
 import random
 import re
 import string
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from typing import Optional, Union
 
 import config
 import discord
-from captcha.image import ImageCaptcha
 from discord import Member
 from discord.channel import TextChannel
 from discord.colour import Colour
@@ -21,6 +24,7 @@ from pymongo.cursor import Cursor
 
 import modules.database as database
 import modules.timers as timers
+from modules.captcha_renderer import render_captcha_image
 from modules.utils import SettingsHandler
 
 """
@@ -79,7 +83,7 @@ class DataManager:
 
     def __init__(self, logger):
         self._logger = logger
-        self._db = database.get_connection()
+        self._db = database.get_async_connection()
         self._captcha_guilds = self._db.captcha_guilds
         self._captcha_channels = self._db.captcha_channels
         self._captcha_blacklist = self._db.captcha_blacklist
@@ -87,7 +91,7 @@ class DataManager:
         self._member_cache = self._db.captcha_member_cache
         self._registered_invitations = self._db.captcha_registered_invitations
 
-    def add_captcha_channel(self, channel):
+    async def add_captcha_channel(self, channel):
         """
         Adds a captcha channel to the relevant collection.
 
@@ -96,7 +100,7 @@ class DataManager:
         channel: :class:`CaptchaChannel`
             CaptchaChannel instance to store.
         """
-        self._captcha_channels.insert_one(
+        await self._captcha_channels.insert_one(
             {
                 "guild_id": channel.get_gateway_guild().get_guild().id,
                 "channel_id": channel.get_id(),
@@ -104,12 +108,13 @@ class DataManager:
                 "tries": channel.get_tries(),
                 "active": channel.is_active(),
                 "ttl": channel.get_ttl(),
+                "expires": channel.get_expires(),
                 "stats": {"completed": False, "failed": False},
                 "created_at": time.time(),
             }
         )
 
-    def update_captcha_counter(self, member_id: int, counter: int):
+    async def update_captcha_counter(self, member_id: int, counter: int):
         """
         Updates a captcha counter. A captcha counter being the integer that counts the amount of times
         a user has left. If this reaches a certain limit they become blacklisted, preventing them from helping
@@ -123,19 +128,19 @@ class DataManager:
             Depending on the pre-existentence of a counter, this value is used to either set or update
             the counter.
         """
-        entry = self._captcha_counter.find_one({"mid": member_id})
+        entry = await self._captcha_counter.find_one({"mid": member_id})
         now = time.time()
         if entry:
-            self._captcha_counter.update_one(
+            await self._captcha_counter.update_one(
                 {"mid": member_id},
                 {"$set": {"counter": entry["counter"] + counter, "updated_at": now}},
             )
         else:
-            self._captcha_counter.insert_one(
+            await self._captcha_counter.insert_one(
                 {"mid": member_id, "counter": counter, "updated_at": now}
             )
 
-    def get_captcha_counter(self, member_id: int):
+    async def get_captcha_counter(self, member_id: int):
         """
         Fetches a captcha counter entry, provided it is there already.
 
@@ -144,9 +149,9 @@ class DataManager:
         member_id: :class:`int`
             The id of the member associated to a counter.
         """
-        return self._captcha_counter.find_one({"mid": member_id})
+        return await self._captcha_counter.find_one({"mid": member_id})
 
-    def reset_captcha_counter(self, member_id: int):
+    async def reset_captcha_counter(self, member_id: int):
         """
         Resets the captcha counter to 0.
 
@@ -155,11 +160,11 @@ class DataManager:
         member_id: :class:`int`
             The id of the member associated to a counter.
         """
-        return self._captcha_counter.update_one(
+        return await self._captcha_counter.update_one(
             {"mid": member_id}, {"$set": {"counter": 0}}
         )
 
-    def get_all_captcha_channels(
+    async def get_all_captcha_channels(
         self, *, from_date: float = -1, before_date: float = -1
     ):
         """
@@ -179,7 +184,7 @@ class DataManager:
             Returns a cursor or None in the event that nothing is in the collection.
         """
         if from_date == -1 and before_date == -1:
-            return self._captcha_channels.find({})
+            return await self._captcha_channels.find({}).to_list()
         else:
             params = {}
 
@@ -189,9 +194,11 @@ class DataManager:
                 params["created_at"] = {"$lte": before_date}
             else:
                 params["created_at"] = {"$gte": from_date, "$lte": before_date}
-            return self._captcha_channels.find(params)
+            return await self._captcha_channels.find(params).to_list()
 
-    def get_captcha_channels(self, guild_id: int, only_active: bool = True) -> list:
+    async def get_captcha_channels(
+        self, guild_id: int, only_active: bool = True
+    ) -> list:
         """
         Returns all the captcha channels in a guild.
 
@@ -208,16 +215,47 @@ class DataManager:
             A list of documents containing key information about captcha channels.
         """
         return (
-            list(
-                self._captcha_channels.find(
-                    {"guild_id": guild_id, "active": only_active}
-                )
-            )
+            await self._captcha_channels.find(
+                {"guild_id": guild_id, "active": only_active}
+            ).to_list()
             if only_active is True
-            else list(self._captcha_channels.find({"guild_id": guild_id}))
+            else await self._captcha_channels.find({"guild_id": guild_id}).to_list()
         )
 
-    def add_blacklisted_member(self, member: Member):
+    async def expire_captcha_channels(self, now: float) -> list:
+        """
+        Marks all the active captcha channels that have expired before now as failed, across all Gateway Guilds.
+
+        Parameters
+        ----------
+        now: :class:`float`
+            Channels with an expiry timestamp before this one are expired.
+
+        Returns
+        -------
+        :class:`list`
+            A list of documents of the expired captcha channels.
+        """
+        expired = await self._captcha_channels.find(
+            {"active": True, "expires": {"$lte": now}}
+        ).to_list()
+
+        if expired:
+            await self._captcha_channels.update_many(
+                {"_id": {"$in": [entry["_id"] for entry in expired]}},
+                {
+                    "$set": {
+                        "active": False,
+                        "stats": {"completed": False, "failed": True},
+                        "ttl": 0,
+                        "last_updated": now,
+                    }
+                },
+            )
+
+        return expired
+
+    async def add_blacklisted_member(self, member: Member):
         """
         Add a blacklisted member to the user cache.
 
@@ -227,9 +265,11 @@ class DataManager:
             The member that was just blacklied.
         """
 
-        self._member_cache.insert_one({"mid": member.id, "name": member.display_name})
+        await self._member_cache.insert_one(
+            {"mid": member.id, "name": member.display_name}
+        )
 
-    def get_blacklisted_member(self, member_id: int) -> Union[Cursor, None]:
+    async def get_blacklisted_member(self, member_id: int) -> Union[Cursor, None]:
         """
         Fetch information on one cached member.
 
@@ -243,9 +283,9 @@ class DataManager:
         :class:`object`
             A document associated with the member id provided or `None`.
         """
-        return self._member_cache.find_one({"mid": member_id})
+        return await self._member_cache.find_one({"mid": member_id})
 
-    def delete_blacklisted_members(self, mids: list[int]) -> None:
+    async def delete_blacklisted_members(self, mids: list[int]) -> None:
         """Deletes more than one member from the cache. Used primarily in the unban_task.
 
         Parameters
@@ -253,9 +293,9 @@ class DataManager:
         :class:`mids`
             A list of member ids.
         """
-        self._member_cache.delete_many({"mid": mids})
+        await self._member_cache.delete_many({"mid": mids})
 
-    def get_blacklisted_members(self, username: str = "", member_id: int = 0):
+    async def get_blacklisted_members(self, username: str = "", member_id: int = 0):
         """
         Fetches a list of blacklisted members. If a username or member id is supplied then it will preform a
         'starts with' filter, and return the list of members whose username starts with the string supplied
@@ -274,23 +314,25 @@ class DataManager:
             A list of documents that starts with the username provided or the id provided.
         """
         if username == "" and member_id == 0:
-            return self._member_cache.find({})
+            return await self._member_cache.find({}).to_list()
 
         return (
-            self._member_cache.find(
+            await self._member_cache.find(
                 {"name": re.compile(f"^{username}.*", re.IGNORECASE)}
-            )
+            ).to_list()
             if username != ""
-            else self._member_cache.find({"mid": "/^{member_id}.*/is"})
+            else await self._member_cache.find(
+                {"mid": "/^{member_id}.*/is"}
+            ).to_list()
         )
 
-    def remove_blacklisted_member(self, member_id: int):
+    async def remove_blacklisted_member(self, member_id: int):
         """
         Removes a blacklisted member from the cache. Used usually after a member has been removed from the blacklist.
         """
-        self._member_cache.remove({"mid": member_id})
+        await self._member_cache.remove({"mid": member_id})
 
-    def get_captcha_counters(self) -> list:
+    async def get_captcha_counters(self) -> list:
         """
         Returns all the captcha counters.
 
@@ -299,9 +341,11 @@ class DataManager:
         :class:`list`
             A list of captcha counter documents.
         """
-        return list(self._captcha_counter.find({}))
+        return await self._captcha_counter.find({}).to_list()
 
-    def update_captcha_channel(self, guild_id: int, channel_id: int, update: dict):
+    async def update_captcha_channel(
+        self, guild_id: int, channel_id: int, update: dict
+    ):
         """
         Updates a captcha channel document with new information from the 'update' parameter.
 
@@ -319,11 +363,11 @@ class DataManager:
         print(
             f"Captcha channel is {'None' if self._captcha_channels is None else 'Not None'}"
         )
-        self._captcha_channels.update_one(
+        await self._captcha_channels.update_one(
             {"guild_id": guild_id, "channel_id": channel_id}, {"$set": update}
         )
 
-    def add_guild(self, guild_id: int, landing_channel_id: int = 0):
+    async def add_guild(self, guild_id: int, landing_channel_id: int = 0):
         """
         Add a Gateway Guild to the relevant collection.
 
@@ -334,7 +378,7 @@ class DataManager:
         landing_channel_id: :class:`int`
             The id of the landing channel, the channel the invites are created from.
         """
-        self._captcha_guilds.insert_one(
+        await self._captcha_guilds.insert_one(
             {
                 "guild_id": guild_id,
                 "landing_channel_id": landing_channel_id,
@@ -342,7 +386,7 @@ class DataManager:
             }
         )
 
-    def remove_guild(self, guild_id: int):
+    async def remove_guild(self, guild_id: int):
         """
         Remove a guild from the Gateway Guild collection.
 
@@ -351,9 +395,9 @@ class DataManager:
         guild_id: :class:`int`
             The id of the guild.
         """
-        self._captcha_guilds.delete_one({"guild_id": guild_id})
+        await self._captcha_guilds.delete_one({"guild_id": guild_id})
 
-    def get_guilds(self, include_stats: bool = False) -> Cursor:
+    async def get_guilds(self, include_stats: bool = False) -> Cursor:
         """
         Returns the Cursor the search for all Gateway Guilds.
 
@@ -369,12 +413,12 @@ class DataManager:
             Returns the cursor of the search for Gateway Guilds.
         """
         return (
-            self._captcha_guilds.find({}, {"stats": 0})
+            await self._captcha_guilds.find({}, {"stats": 0}).to_list()
             if include_stats is False
-            else self._captcha_guilds.find({}, {"stats": 0})
+            else await self._captcha_guilds.find({}, {"stats": 0}).to_list()
         )
 
-    def is_blacklisted(self, member_id: int) -> bool:
+    async def is_blacklisted(self, member_id: int) -> bool:
         """
         Checks if a user is blacklisted.
 
@@ -389,9 +433,9 @@ class DataManager:
             Returns true if blacklisted, else false.
         """
 
-        return self._captcha_blacklist.find_one({"mid": member_id}) is not None
+        return await self._captcha_blacklist.find_one({"mid": member_id}) is not None
 
-    def add_member_to_blacklist(
+    async def add_member_to_blacklist(
         self, member: Member, duration: int = 86400, reason: str = "No reason provided."
     ):
         """
@@ -406,11 +450,13 @@ class DataManager:
             The duration the blacklist should be.
         """
         now = time.time()
-        self._captcha_blacklist.insert_one(
+        await self._captcha_blacklist.insert_one(
             {"mid": member.id, "started": now, "ends": now + duration, "reason": reason}
         )
 
-    def get_blacklisted_member_info(self, member_id: int) -> Union[Cursor, None]:
+    async def get_blacklisted_member_info(
+        self, member_id: int
+    ) -> Union[Cursor, None]:
         """
         Returns the temporal data associated with a member who has been blacklisted. This data is the full date the
         user was blacklisted (banned) as well as the date in which the blacklist will be over.
@@ -425,9 +471,9 @@ class DataManager:
         :class:`Document`
             The document containing the information of the blacklisted member.
         """
-        return self._captcha_blacklist.find_one({"mid": member_id})
+        return await self._captcha_blacklist.find_one({"mid": member_id})
 
-    def remove_member_from_blacklist(self, member_id: int):
+    async def remove_member_from_blacklist(self, member_id: int):
         """
         Remove a member from the blacklist.
 
@@ -436,9 +482,9 @@ class DataManager:
         member_id: :class:`int`
             The id of a member to remove from the blacklist
         """
-        self._captcha_blacklist.delete_one({"mid": member_id})
+        await self._captcha_blacklist.delete_one({"mid": member_id})
 
-    def get_blacklist(self):
+    async def get_blacklist(self):
         """
         Returns all blacklisted member documents.
 
@@ -447,22 +493,27 @@ class DataManager:
         :class:`list`
             A list of documents.
         """
-        return list(self._captcha_blacklist.find({}))
+        return await self._captcha_blacklist.find({}).to_list()
 
-    def is_registered_invitation(self, invite_code: str):
-        return self._registered_invitations.find({"code": invite_code}) is not None
+    async def is_registered_invitation(self, invite_code: str):
+        return (
+            await self._registered_invitations.find_one({"code": invite_code})
+            is not None
+        )
 
-    def add_registered_invitation(self, invite_code: str, i_type: int):
-        self._registered_invitations.insert_one({"code": invite_code, "type": i_type})
+    async def add_registered_invitation(self, invite_code: str, i_type: int):
+        await self._registered_invitations.insert_one(
+            {"code": invite_code, "type": i_type}
+        )
 
-    def remove_registered_invitation(self, invite_code: str):
-        self._registered_invitations.delete_one({"code": invite_code})
+    async def remove_registered_invitation(self, invite_code: str):
+        await self._registered_invitations.delete_one({"code": invite_code})
 
-    def get_registered_invite(self, invite_code: str):
-        return self._registered_invitations.find_one({"code": invite_code})
+    async def get_registered_invite(self, invite_code: str):
+        return await self._registered_invitations.find_one({"code": invite_code})
 
-    def get_all_registered_invites(self, r_type: int):
-        return self._registered_invitations.find({"type": r_type})
+    async def get_all_registered_invites(self, r_type: int):
+        return await self._registered_invitations.find({"type": r_type}).to_list()
 
 
 class TrackerManager:
@@ -496,7 +547,7 @@ class TrackerManager:
         """
         return invite_code in self._temporal_cache.keys()
 
-    def is_user_registered(self, invite_code: str) -> bool:
+    async def is_user_registered(self, invite_code: str) -> bool:
         """
         Checks if an inviation link is registered.
 
@@ -510,23 +561,23 @@ class TrackerManager:
         :class:`bool`
             True if the invite link is registered, else false.
         """
-        registered = self._data_manager.is_registered_invitation(invite_code)
+        registered = await self._data_manager.is_registered_invitation(invite_code)
         if registered is False:
             return False
-        invite_entry = self._data_manager.get_registered_invite(invite_code)
+        invite_entry = await self._data_manager.get_registered_invite(invite_code)
         if invite_entry is None:
             return False
         return invite_entry["type"] == 2
 
-    def is_captcha_registered(self, invite_code: str) -> bool:
+    async def is_captcha_registered(self, invite_code: str) -> bool:
         """
         Checks if an invitation link has been registered by the Captcha module. Invitations registered
         by the captcha module programmatically are links created after a successful captcha.
         """
-        registered = self._data_manager.is_registered_invitation(invite_code)
+        registered = await self._data_manager.is_registered_invitation(invite_code)
         if registered is False:
             return False
-        invite_entry = self._data_manager.get_registered_invite(invite_code)
+        invite_entry = await self._data_manager.get_registered_invite(invite_code)
         if invite_entry is None:
             return False
         return invite_entry["type"] == 1
@@ -691,17 +742,17 @@ class TrackerManager:
             self._logger.info(
                 f"Member {member.display_name} joined from invite {invite_used.id}"
             )
-            if self.is_captcha_registered(invite_used.id):
+            if await self.is_captcha_registered(invite_used.id):
                 self._logger.info(
                     f"Member {member.display_name} joined from captcha registered invite. Deleting invite."
                 )
-                self._data_manager.remove_registered_invitation(invite_used.id)
+                await self._data_manager.remove_registered_invitation(invite_used.id)
                 await invite_used.delete(
                     reason="Captcha invite. Deleting after single use."
                 )
                 return
 
-        if self.is_user_registered(invite_used.id):
+        if await self.is_user_registered(invite_used.id):
             return
 
         if self.has_temporal_entry(invite_used.id) is False:
@@ -772,6 +823,11 @@ class TrackerManager:
 
 
 class CaptchaChannel:
+    # seconds of ttl remaining at which the member is alerted of the time they have left
+    ALERT_THRESHOLDS = [600, 300, 240, 180, 120, 60, 30, 15, 10, 5]
+    # seconds between the time elapsed message and the member being banned
+    GRACE_PERIOD = 10
+
     def __init__(
         self,
         bot,
@@ -794,8 +850,8 @@ class CaptchaChannel:
         self._invite = None
         self._completed = False
         self._ttl = bot.captcha.get_config()["captcha_time_to_live"]
-        self._ttl_message_sent = False
-        self._internal_clock = 0
+        self._expires = time.time() + self._ttl
+        self._countdown: Optional[timers.Countdown] = None
         self._active = False
         self._logger = bot.logger
         bot.add_listener(self.on_message, "on_message")
@@ -804,7 +860,13 @@ class CaptchaChannel:
         """
         Returns the time to live. The amount of time this captcha channel has to live until it gets deleted.
         """
-        return self._ttl
+        return math.ceil(self._expires - time.time())
+
+    def get_expires(self):
+        """
+        Returns the timestamp when the time to live of this captcha channel runs out.
+        """
+        return self._expires
 
     def is_active(self):
         """
@@ -861,10 +923,16 @@ class CaptchaChannel:
         """
         return self._member
 
-    @timers.loop(seconds=1)
-    async def countdown(self):
+    async def countdown(self, remaining: int):
         """
-        The countdown manages the countdown timer. When this time reaches 0, and the user has no completed the captcha, the channel will be deleted and the user will be blacklisted for a time.
+        Called by the countdown of the channel whenever the member needs to be alerted of the time they have left, when the time has elapsed
+        and when the grace period after that has elapsed.
+        When the grace period has elapsed and the user has not completed the captcha, the channel will be deleted and the user will be blacklisted for a time.
+
+        Parameters
+        ----------
+        remaining: :class:`int`
+            Seconds remaining on the countdown, including the grace period.
         """
 
         async def alert():
@@ -881,29 +949,22 @@ class CaptchaChannel:
                     "countdown_alert_message"
                 ]
                 .replace("{time_unit}", time_unit)
-                .replace("{time_value}", time_value),
+                .replace("{time_value}", str(time_value)),
                 title=self._bot.captcha.get_config()["messages"][
                     "countdown_alert_message_title"
                 ],
             )
             await self._channel.send(embed=embed)
 
-        self._ttl -= 1
-        self._internal_clock += 1
-        if self._internal_clock >= 60:
-            self._data_manager.update_captcha_channel(
-                self._guild.id, self._channel.id, {"ttl": self._ttl}
-            )
-            self._internal_clock = 0
+        self._ttl = remaining - self.GRACE_PERIOD
 
-        if self._ttl >= 600:
-            minutes = self._ttl / 60
-            if minutes in [10, 5, 4, 3, 2, 1]:
-                await alert()
-            if self._ttl in [30, 15, 10, 5]:
+        if self._ttl > 0:
+            if self._ttl in self.ALERT_THRESHOLDS:
                 await alert()
 
-        if self._ttl <= 0:
+            return
+
+        if self._ttl == 0:
             default_ttl = self._bot.captcha.get_config()["captcha_time_to_live"]
             minutes = math.floor(default_ttl / 60)
             time_value = minutes if minutes > 0 else default_ttl
@@ -913,48 +974,56 @@ class CaptchaChannel:
                 else ("seconds" if default_ttl > 1 else "second")
             )
 
-            if self._ttl_message_sent is False:
-                time_elapsed_message_title = self._bot.captcha.get_module_settings()[
-                    "messages"
-                ]["time_elapsed_message_title"]
-                time_elapsed_message = self._bot.captcha.get_module_settings()[
-                    "messages"
-                ]["time_elapsed_message"]
-                time_elapsed_message = time_elapsed_message.replace(
-                    "{time_unit}", str(time_unit)
-                ).replace("{time_value}", str(time_value))
-                embed: discord.Embed = discord.Embed(
-                    colour=config.EMBED_COLOUR,
-                    title=time_elapsed_message_title,
-                    description=time_elapsed_message,
-                )
+            time_elapsed_message_title = self._bot.captcha.get_module_settings()[
+                "messages"
+            ]["time_elapsed_message_title"]
+            time_elapsed_message = self._bot.captcha.get_module_settings()["messages"][
+                "time_elapsed_message"
+            ]
+            time_elapsed_message = time_elapsed_message.replace(
+                "{time_unit}", str(time_unit)
+            ).replace("{time_value}", str(time_value))
+            embed: discord.Embed = discord.Embed(
+                colour=config.EMBED_COLOUR,
+                title=time_elapsed_message_title,
+                description=time_elapsed_message,
+            )
 
-                await self._channel.send(embed=embed)
-                self._ttl_message_sent = True
+            await self._channel.send(embed=embed)
+            return
 
-            if self._ttl <= -10:
-                self.countdown.stop()
-                self._data_manager.update_captcha_channel(
-                    self._guild.id,
-                    self._channel.id,
-                    {
-                        "active": False,
-                        "stats": {"completed": False, "failed": True},
-                        "ttl": 0,
-                    },
-                )
-                if self._bot.captcha.is_operator(self._member.id) is False:
-                    if self._data_manager.is_blacklisted(self._member.id):
-                        return
+        await self._data_manager.update_captcha_channel(
+            self._guild.id,
+            self._channel.id,
+            {
+                "active": False,
+                "stats": {"completed": False, "failed": True},
+                "ttl": 0,
+            },
+        )
+        if self._bot.captcha.is_operator(self._member.id) is False:
+            if await self._data_manager.is_blacklisted(self._member.id):
+                return
 
-                    await self._member.ban(
-                        reason="Failed to complete Captcha assessment."
-                    )
-                    self._data_manager.add_member_to_blacklist(
-                        self._member, 900, "Failed to complete Captcha assessment."
-                    )
+            await self._member.ban(reason="Failed to complete Captcha assessment.")
+            await self._data_manager.add_member_to_blacklist(
+                self._member, 900, "Failed to complete Captcha assessment."
+            )
+
+        await self.destory()
 
-                await self.destory()
+    def start_countdown(self):
+        """
+        Starts the countdown of the channel, which ends :attr:`GRACE_PERIOD` seconds after the ttl has elapsed.
+        """
+        if self._countdown is not None:
+            self._countdown.cancel()
+
+        thresholds = [t + self.GRACE_PERIOD for t in self.ALERT_THRESHOLDS]
+        thresholds.append(self.GRACE_PERIOD)
+        self._countdown = self._bot.countdowns.start(
+            self._expires - time.time() + self.GRACE_PERIOD, self.countdown, thresholds
+        )
 
     async def start(self, **kwargs):
         """
@@ -1000,15 +1069,16 @@ class CaptchaChannel:
                 await self._member.kick()
                 return
 
-        if kwargs.get("ttl"):
-            self._ttl = kwargs["ttl"]
+        if kwargs.get("expires"):
+            self._expires = kwargs["expires"]
+            self._ttl = self.get_ttl()
 
         self._started = True
-        self.countdown.start()
+        self.start_countdown()
         self._active = True
 
         if len(kwargs.keys()) == 0:
-            self._data_manager.add_captcha_channel(self)
+            await self._data_manager.add_captcha_channel(self)
         else:
             minutes = math.floor(self._ttl / 60)
             time_value = minutes if minutes > 0 else self._ttl
@@ -1031,7 +1101,7 @@ class CaptchaChannel:
             await self._channel.send(embed=embed)
         await self.send_captcha_message()
 
-    def construct_embed(self):
+    async def construct_embed(self):
         """
         Constructs the embed that'll contain the captcha image.
 
@@ -1040,7 +1110,7 @@ class CaptchaChannel:
         :class:`discord.Embed`
             A Discord Embed that contains a captcha image.
         """
-        image, text = self._bot.captcha.create_captcha_image()
+        image, text = await self._bot.captcha.create_captcha_image()
         image_file = discord.File(fp=image, filename="captcha.png")
         self._answer_text = text
         embed: discord.Embed = discord.Embed(
@@ -1062,7 +1132,7 @@ class CaptchaChannel:
         Sends the captcha message into the channel.
         """
         if self._tries != 0:
-            embed, image_file = self.construct_embed()
+            embed, image_file = await self.construct_embed()
             await self._channel.send(file=image_file, embed=embed)
         else:
             embed: discord.Embed = discord.Embed(
@@ -1101,13 +1171,14 @@ class CaptchaChannel:
         if message.content.lower() != self._answer_text:
             await self._channel.send("Incorrect.")
             self._tries = self._tries - 1 if self._tries > 0 else 0
-            self._data_manager.update_captcha_channel(
+            await self._data_manager.update_captcha_channel(
                 self._guild.id, self._channel.id, {"tries": self._tries}
             )
             await self.send_captcha_message()
             if self._tries == 0:
+                self._countdown.cancel()
                 await asyncio.sleep(10)
-                self._data_manager.update_captcha_channel(
+                await self._data_manager.update_captcha_channel(
                     self._guild.id,
                     self._channel.id,
                     {"active": False, "stats": {"completed": False, "failed": True}},
@@ -1116,10 +1187,10 @@ class CaptchaChannel:
                     if self._bot.captcha.is_blacklisted(self._member.id):
                         return
 
-                    self._data_manager.add_blacklisted_member(self._member)
+                    await self._data_manager.add_blacklisted_member(self._member)
                     reason = "Failed to complete Captcha assessment in time.."
 
-                    self._data_manager.add_member_to_blacklist(
+                    await self._data_manager.add_member_to_blacklist(
                         self._member,
                         self._bot.captcha.get_config()["blacklist_length"],
                         reason,
@@ -1146,8 +1217,9 @@ class CaptchaChannel:
                 ].replace("{invite_url}", url),
             )
             self._completed = True
+            self._countdown.cancel()
             await self._channel.send(embed=embed)
-            self._data_manager.update_captcha_channel(
+            await self._data_manager.update_captcha_channel(
                 self._guild.id,
                 self._channel.id,
                 {
@@ -1178,7 +1250,7 @@ class CaptchaChannel:
             return
 
         invite: Invite = await main_channel.create_invite(max_age=120, max_uses=2)
-        self._data_manager.add_registered_invitation(
+        await self._data_manager.add_registered_invitation(
             invite.id, 1
         )  # Registering captcha invite.
         return invite
@@ -1187,6 +1259,11 @@ class CaptchaChannel:
         """
         Deletes the channel.
         """
+        # members who left mustn't be banned when the countdown of the deleted channel runs out
+        if self._countdown is not None:
+            self._countdown.cancel()
+            self._countdown = None
+
         await self._channel.delete()
 
 
@@ -1331,7 +1408,7 @@ class GatewayGuild:
         """
         Deletes a Gateway Guild.
         """
-        self._data_manager.remove_guild(self._id)
+        await self._data_manager.remove_guild(self._id)
         # Need to write in here a better way to delete a gateway guild. I need to check if this is the only guild within the list, then check if people are in the guild doing captchas before I delete the guild.
         try:
             await self._guild.delete()
@@ -1416,7 +1493,9 @@ class GatewayGuild:
         user_id = member.id
 
         blacklist_entry = (
-            self._bot.captcha.get_data_manager().get_blacklisted_member_info(member.id)
+            await self._bot.captcha.get_data_manager().get_blacklisted_member_info(
+                member.id
+            )
         )
         if blacklist_entry:
             await member.ban(reason="Is a blacklisted member. Banned on join attempt.")
@@ -1446,11 +1525,11 @@ class GatewayGuild:
             await self.delete_captcha_channel(member)
             is_operator = self._bot.captcha.is_operator(member.id)
             if is_operator is False:
-                self._data_manager.update_captcha_counter(member.id, 1)
+                await self._data_manager.update_captcha_counter(member.id, 1)
             settings = self._bot.settings_handler.get_settings(config.MAIN_SERVER)[
                 "modules"
             ]["captcha"]
-            counter_entry = self._data_manager.get_captcha_counter(member.id)
+            counter_entry = await self._data_manager.get_captcha_counter(member.id)
             if (
                 counter_entry is not None
                 and counter_entry["counter"] >= settings["gateway_rejoin"]["limit"]
@@ -1462,8 +1541,8 @@ class GatewayGuild:
                     if ban.user.id == member.id:
                         return
 
-                self._data_manager.add_blacklisted_member(member)
-                self._data_manager.add_member_to_blacklist(
+                await self._data_manager.add_blacklisted_member(member)
+                await self._data_manager.add_member_to_blacklist(
                     member,
                     self._bot.captcha.get_config()["gateway_rejoin"][
                         "blacklist_duration"
@@ -1487,9 +1566,13 @@ class CaptchaModule:
         self._settings_handler: SettingsHandler = bot.settings_handler
         self._bot = bot
         self._logger = bot.logger
-        self._image_captcha = ImageCaptcha(width=360, height=120)
+        # captchas are rendered in worker processes so rendering doesn't block the event loop,
+        # some are rendered in advance so they can be handed out instantly when a lot of members join at once
+        self._captcha_executor = self._create_captcha_executor()
+        self._captcha_buffer = deque(maxlen=config.CAPTCHA_BUFFER_SIZE)
         self._announcement_channel = None
         self.unban_task.start()
+        self.refill_captcha_buffer.start()
         self._tracker_manager = TrackerManager(bot)
         self._default_settings = {
             "operators": [],
@@ -1570,7 +1653,7 @@ class CaptchaModule:
         """
         Loads primarily Gateway Guilds and aids in the creation of pre-existing CaptchaChannels stored in MongoDB.
         """
-        mongo_guild_ids: list = list(self._data_manager.get_guilds(False))
+        mongo_guild_ids: list = list(await self._data_manager.get_guilds(False))
         valid_guild_ids = list(
             filter(
                 lambda m_guild: self._bot.get_guild(m_guild["guild_id"]) is not None,
@@ -1612,6 +1695,11 @@ class CaptchaModule:
                 "Previous Gateway Guilds found. Indexing...",
                 self._bot.get_guild(config.MAIN_SERVER),
             )
+            try:
+                await self.sweep_expired_captcha_channels()
+            except Exception as e:
+                # a failed sweep shouldn't stop the Gateway Guilds from loading
+                self._logger.exception(f"Failed to sweep expired captcha channels: {e}")
 
             for m_guild in list(valid_guild_ids):
                 m_guild_id = m_guild["guild_id"]
@@ -1635,7 +1723,7 @@ class CaptchaModule:
         self.gateway_reset_task.start()
 
     async def _add_gateway_guild(self, g_guild: GatewayGuild):
-        mongo_captcha_channels = self._data_manager.get_captcha_channels(
+        mongo_captcha_channels = await self._data_manager.get_captcha_channels(
             g_guild.get_id(), False
         )
 
@@ -1643,7 +1731,7 @@ class CaptchaModule:
         for entry in mongo_captcha_channels:
             if guild.get_member(entry["member_id"]) is None:
 
-                self._data_manager.update_captcha_channel(
+                await self._data_manager.update_captcha_channel(
                     guild.id,
                     entry["channel_id"],
                     {
@@ -1668,11 +1756,55 @@ class CaptchaModule:
                 tries=entry["tries"],
                 completed=entry["stats"]["completed"],
                 channel_id=entry["channel_id"],
-                ttl=entry["ttl"],
+                # channels created before expiry timestamps were stored only have their last saved ttl
+                expires=entry.get("expires", time.time() + entry["ttl"]),
             )
             g_guild.add_captcha_channel(entry["member_id"], channel)
         self._gateway_guilds.append(g_guild)
 
+    async def sweep_expired_captcha_channels(self):
+        """
+        Fails all the captcha channels that expired while the bot was offline, across all Gateway Guilds, with one query.
+        Members of the expired channels are banned and blacklisted and the channels are deleted.
+        """
+        expired = await self._data_manager.expire_captcha_channels(
+            time.time() - CaptchaChannel.GRACE_PERIOD
+        )
+
+        for entry in expired:
+            guild = self._bot.get_guild(entry["guild_id"])
+            if guild is None:
+                continue
+
+            # the channels are already inactive, an error on one entry is logged and the sweep goes on
+            member = guild.get_member(entry["member_id"])
+            if member is not None and self.is_operator(member.id) is False:
+                try:
+                    if await self._data_manager.is_blacklisted(member.id) is False:
+                        await member.ban(
+                            reason="Failed to complete Captcha assessment."
+                        )
+                        await self._data_manager.add_member_to_blacklist(
+                            member, 900, "Failed to complete Captcha assessment."
+                        )
+                except Exception as e:
+                    self._logger.exception(
+                        f"Failed to ban member {member.id} of expired captcha channel: "
+                        f"{e}"
+                    )
+
+            t_channel = guild.get_channel(entry["channel_id"])
+            if t_channel:
+                try:
+                    await t_channel.delete()
+                except HTTPException as e:
+                    self._logger.exception(
+                        f"Failed to delete expired captcha channel {t_channel.id}: {e}"
+                    )
+
+        if expired:
+            self._logger.info(f"Swept {len(expired)} expired captcha channels.")
+
     def get_config(self):
         """
         Fetches the module settings for this feature.
@@ -1786,21 +1918,77 @@ class CaptchaModule:
                 self._gateway_guilds.remove(g_guild)
                 break
 
-    def create_captcha_image(self):
+    @staticmethod
+    def _create_captcha_executor() -> ProcessPoolExecutor:
+        """
+        Creates the process pool captchas are rendered in.
+        Workers are spawned instead of forked, forking a process that already runs the database threads isn't safe.
+        """
+        return ProcessPoolExecutor(
+            max_workers=config.CAPTCHA_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def close_captcha_executor(self):
+        """
+        Shuts down the process pool captchas are rendered in.
+        """
+        self._captcha_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def render_captcha(self) -> tuple[bytes, str]:
         """
-        Creates a captcha image.
+        Renders a captcha image in a worker process.
 
         Returns
         -------
         :class:`tuple`
-            A tuple with first the image in converted into bytes, and second the answer in text (string).
+            A tuple with first the image encoded as PNG, and second the answer in text (string).
         """
         text = random_chars(6)
-        captcha_image = self._image_captcha.generate_image(text)
-        image_bytes = io.BytesIO()
-        captcha_image.save(image_bytes, "PNG")
-        image_bytes.seek(0)
-        return image_bytes, text
+        loop = asyncio.get_running_loop()
+        executor = self._captcha_executor
+        try:
+            image = await loop.run_in_executor(executor, render_captcha_image, text)
+        except BrokenProcessPool as e:
+            # worker processes can die, fall back to rendering in a thread and replace the pool,
+            # renders running at the same time fail on the same pool, so only the first one replaces it
+            if executor is self._captcha_executor:
+                self._logger.exception(f"Captcha worker pool broke, replacing it: {e}")
+                self._captcha_executor = self._create_captcha_executor()
+                executor.shutdown(wait=False)
+            image = await loop.run_in_executor(None, render_captcha_image, text)
+
+        return image, text
+
+    @timers.loop(seconds=1)
+    async def refill_captcha_buffer(self):
+        """
+        Renders captchas until the captcha buffer is full.
+        """
+        missing = self._captcha_buffer.maxlen - len(self._captcha_buffer)
+        if missing <= 0:
+            return
+
+        captchas = await asyncio.gather(
+            *[self.render_captcha() for _ in range(missing)]
+        )
+        self._captcha_buffer.extend(captchas)
+
+    async def create_captcha_image(self):
+        """
+        Creates a captcha image, taking one from the captcha buffer if there are any rendered in advance.
+
+        Returns
+        -------
+        :class:`tuple`
+            A tuple with first the image in converted into bytes, and second the answer in text (string).
+        """
+        if self._captcha_buffer:
+            image, text = self._captcha_buffer.popleft()
+        else:
+            image, text = await self.render_captcha()
+
+        return io.BytesIO(image), text
 
     async def create_guild(self) -> GatewayGuild:
         """
@@ -1819,7 +2007,7 @@ class CaptchaModule:
             self._bot, self._data_manager, guild=guild, first_load=True
         )
         await g_guild.load()
-        self._data_manager.add_guild(guild.id, g_guild.get_landing_channel().id)
+        await self._data_manager.add_guild(guild.id, g_guild.get_landing_channel().id)
         self._gateway_guilds.append(g_guild)
         self._logger.info(f"Created gateway guild {g_guild.get_name()}")
         return g_guild
@@ -1899,7 +2087,7 @@ class CaptchaModule:
         """
         Unbans members from Gateway Guilds that were on the blacklist if the time has elapsed.
         """
-        blacklist = self._data_manager.get_blacklist()
+        blacklist = await self._data_manager.get_blacklist()
 
         now = time.time()
         cache_members_to_remove = []
@@ -1907,7 +2095,7 @@ class CaptchaModule:
         for entry in blacklist:
             if entry["ends"] <= now:
                 await self.unban(entry["mid"])
-                blacklist_member = self._data_manager.get_blacklisted_member(
+                blacklist_member = await self._data_manager.get_blacklisted_member(
                     entry["mid"]
                 )
 
@@ -1919,10 +2107,10 @@ class CaptchaModule:
                     self._logger.info(
                         f"Removed a member from blacklist. Failed to find username associated with the member in the cache."
                     )
-                self._data_manager.remove_member_from_blacklist(entry["mid"])
+                await self._data_manager.remove_member_from_blacklist(entry["mid"])
                 cache_members_to_remove.append(entry["mid"])
 
-        captcha_counter_entries = self._data_manager.get_captcha_counters()
+        captcha_counter_entries = await self._data_manager.get_captcha_counters()
         captcha_counter_cooldown_seconds = self._settings_handler.get_settings(
             config.MAIN_SERVER
         )["modules"]["captcha"]["gateway_rejoin"]["cooldown"]
@@ -1930,8 +2118,8 @@ class CaptchaModule:
         for entry in captcha_counter_entries:
             if (entry["updated_at"] + captcha_counter_cooldown_seconds) <= time.time():
                 await self.unban(entry["mid"])
-                self._data_manager.remove_member_from_blacklist(entry["mid"])
-                blacklist_member = self._data_manager.get_blacklisted_member(
+                await self._data_manager.remove_member_from_blacklist(entry["mid"])
+                blacklist_member = await self._data_manager.get_blacklisted_member(
                     entry["mid"]
                 )
                 cache_members_to_remove.append(entry["mid"])
@@ -1944,7 +2132,7 @@ class CaptchaModule:
                     self._logger.info(
                         f"Removing member from blacklist and resetting relog counter."
                     )
-        self._data_manager.delete_blacklisted_members(cache_members_to_remove)
+        await self._data_manager.delete_blacklisted_members(cache_members_to_remove)
 
     async def set_setting(self, path: str, value: object):
         settings = self._settings_handler.get_settings(config.MAIN_SERVER)
@@ -2000,7 +2188,7 @@ class CaptchaModule:
                     ).replace("\\n", "\n")
                 )
 
-    def construct_scheduled_report_embed(self, automatic: bool = False):
+    async def construct_scheduled_report_embed(self, automatic: bool = False):
         last_update = self.get_settings()["modules"]["captcha"]["announcements"][
             "scheduled_report"
         ]["last_report"]
@@ -2011,12 +2199,12 @@ class CaptchaModule:
         )
         channels = list(
             (
-                self._data_manager.get_all_captcha_channels(from_date=last_update)
+                await self._data_manager.get_all_captcha_channels(from_date=last_update)
                 if last_update is not None
-                else self._data_manager.get_all_captcha_channels()
+                else await self._data_manager.get_all_captcha_channels()
             )
             if automatic
-            else self._data_manager.get_all_captcha_channels(
+            else await self._data_manager.get_all_captcha_channels(
                 from_date=(
                     time.time()
                     - self.get_settings()["modules"]["captcha"]["announcements"][
@@ -2051,7 +2239,9 @@ class CaptchaModule:
             embed.title = "Captcha Gateway Daily Report"
 
         if automatic:
-            self.set_setting("announcements.scheduled_report.last_report", time.time())
+            await self.set_setting(
+                "announcements.scheduled_report.last_report", time.time()
+            )
         embed.set_author(name="Captcha Gateway")
         return embed
 
@@ -2123,14 +2313,14 @@ class CaptchaModule:
         """
         Resets Captcha Counters after a period of time has elapsed.
         """
-        for counter_entry in self._data_manager.get_captcha_counters():
+        for counter_entry in await self._data_manager.get_captcha_counters():
             now = time.time()
             if (
                 counter_entry["updated_at"]
                 + self._bot.get_config()["gateway_rejoin"]["reset_after_duration"]
                 <= now
             ):
-                self._data_manager.reset_captcha_counter(counter_entry["mid"])
+                await self._data_manager.reset_captcha_counter(counter_entry["mid"])
 
     async def scheduled_report_task(self):
         """
@@ -2142,7 +2332,7 @@ class CaptchaModule:
         announcement_channel_id = announcement_config["announcement_channel_id"]
 
         if (last_report + interval) <= last_report:
-            embed: discord.Embed = self.construct_scheduled_report_embed(True)
+            embed: discord.Embed = await self.construct_scheduled_report_embed(True)
             await self._bot.get_guild(config.MAIN_SERVER).get_channel(
                 announcement_channel_id
             ).send(embed=embed)
@@ -6,12 +6,16 @@ from bson import json_util
 
 import config
 import discord
+from cachetools import LRUCache
 from discord.ext.commands.core import hooked_wrapped_callback
 
 from modules import database, embed_maker
 
 db = database.get_connection()
 
+# how many members' clearances are kept in memory
+MEMBER_CLEARANCE_CACHE_SIZE = 10000
+
 
 class Clearance:
     def __init__(self, bot):
@@ -22,7 +26,16 @@ class Clearance:
         self.roles = {}
         self.command_access = {}
 
+        # every role and group name gets a bit, so clearance checks are a single mask intersection
+        self.bits = {}
+        # member clearances keyed by (guild_id, member_id), cleared for a member when their roles change
+        self.member_clearances = LRUCache(maxsize=MEMBER_CLEARANCE_CACHE_SIZE)
+        # clearances keyed by the set of role ids they were calculated from,
+        # shared by members with the same roles
+        self.role_set_clearances = {}
+
         self.bot.add_listener(self.on_ready, "on_ready")
+        self.bot.add_listener(self.on_member_update, "on_member_update")
 
         self.bot.logger.debug(f"Downloading clearance spreadsheet")
         print("Clerance Spreadsheet ID:")
@@ -48,6 +61,42 @@ class Clearance:
     async def on_ready(self):
         await self.parse_clearance_spreadsheet()
 
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            self.member_clearances.pop((after.guild.id, after.id), None)
+
+    def bit(self, kind: str, name: str) -> int:
+        """
+        Get the bit of a role or group, bits are given out when they're first needed.
+
+        Parameters
+        ----------------
+        kind: :class:`str`
+            "role" or "group".
+        name: :class:`str`
+            The name of the role or group.
+
+        Returns
+        -------
+        :class:`int`
+            The bit.
+        """
+        key = (kind, name)
+        if key not in self.bits:
+            self.bits[key] = 1 << len(self.bits)
+
+        return self.bits[key]
+
+    def clearance_mask(self, roles: list, groups: list) -> int:
+        """Returns the mask of the bits of roles and groups."""
+        mask = 0
+        for role_name in roles:
+            mask |= self.bit("role", role_name)
+        for group_name in groups:
+            mask |= self.bit("group", group_name)
+
+        return mask
+
     @staticmethod
     def split_comma(value: str, *, value_type: Callable = str):
         """Split string of comma separated values into a list."""
@@ -60,6 +109,9 @@ class Clearance:
     async def parse_clearance_spreadsheet(self):
         """Function for parsing the clearance spreadsheet and sorting the values in it."""
         guild: discord.Guild = self.bot.get_guild(config.MAIN_SERVER)
+        # roles and groups might change, so cached clearances need to be calculated again
+        self.member_clearances.clear()
+        self.role_set_clearances.clear()
         # parse roles
         # ignore the first 2 rows cause they are for users viewing/editing the spreadsheet
 
@@ -121,6 +173,7 @@ class Clearance:
                     "groups": groups,
                     "roles": roles,
                     "users": users,
+                    "mask": self.clearance_mask(roles, groups),
                 }
 
         # check if any commands are missing from the clearance spreadsheet
@@ -167,19 +220,38 @@ class Clearance:
         :class:`dict`
             Clearance info about the user.
         """
-        clearance = {"groups": [], "roles": ["User"], "user_id": member.id}
-        member_role_ids = [role.id for role in member.roles]
-
-        # assign roles
-        for role_name, role_id in self.roles.items():
-            if role_id in member_role_ids:
-                clearance["roles"].append(role_name)
-
-                # assign a group in role is in a group
-                for group_name, roles in self.groups.items():
-                    if role_name in roles and group_name not in clearance["groups"]:
-                        clearance["groups"].append(group_name)
-
+        key = (member.guild.id, member.id)
+        clearance = self.member_clearances.get(key)
+        if clearance is not None:
+            return clearance
+
+        member_role_ids = frozenset(role.id for role in member.roles)
+        role_set_clearance = self.role_set_clearances.get(member_role_ids)
+        if role_set_clearance is None:
+            groups = []
+            roles = ["User"]
+
+            # assign roles
+            for role_name, role_id in self.roles.items():
+                if role_id in member_role_ids:
+                    roles.append(role_name)
+
+                    # assign a group in role is in a group
+                    for group_name, group_roles in self.groups.items():
+                        if role_name in group_roles and group_name not in groups:
+                            groups.append(group_name)
+
+            role_set_clearance = (groups, roles, self.clearance_mask(roles, groups))
+            self.role_set_clearances[member_role_ids] = role_set_clearance
+
+        groups, roles, mask = role_set_clearance
+        clearance = {
+            "groups": groups,
+            "roles": roles,
+            "user_id": member.id,
+            "mask": mask,
+        }
+        self.member_clearances[key] = clearance
         return clearance
 
     @staticmethod
@@ -213,6 +285,11 @@ class Clearance:
     @staticmethod
     def member_has_clearance(member_clearance: dict, command_clearance: dict):
         """Function for checking id member clearance and command clearance match"""
+        if "mask" in member_clearance and "mask" in command_clearance:
+            return member_clearance["user_id"] in command_clearance["users"] or bool(
+                member_clearance["mask"] & command_clearance["mask"]
+            )
+
         return (
             member_clearance["user_id"] in command_clearance["users"]
             or set(command_clearance["roles"]) & set(member_clearance["roles"])
@@ -282,8 +359,8 @@ class Command(discord.ext.commands.Command):
             (key for key, value in kwargs.items() if type(value) == Help), None
         )
         self.bot = None
-        self.data = {}
-        self.initialize_command_data()
+        # loaded in bulk by CommandSystem.initialize_cog
+        self.data = {"command_name": self.full_name, "disabled": 0}
 
     def update_command_data(self, guild_id: int):
         """Update command data."""
@@ -295,11 +372,6 @@ class Command(discord.ext.commands.Command):
         """Returns True if command has been disabled, otherwise returns False"""
         return self.data["disabled"]
 
-    def initialize_command_data(self):
-        """Cache all the command_data in self.data"""
-        data = db.get_command_data(self.full_name, insert=True)
-        self.data = data
-
     def access_given(self, member: discord.Member):
         """Return True if member has been given access to command, otherwise return False."""
         if config.MODULES.get("clearance", True) is False:
@@ -399,14 +471,30 @@ class CommandSystem:
     def __init__(self, bot):
         self.bot = bot
         self.commands: dict[str, [Union[Command, Group]]] = {}
+        # data of all the commands, loaded with one query instead of one per command
+        self.command_data = {
+            data["command_name"]: data for data in db.commands.find({})
+        }
         self.bot.logger.info("CommandSystem module has been initiated")
 
     def initialize_cog(self, cog):
-        """Add all the commands of a cog to the dict of commands."""
+        """Add all the commands of a cog to the dict of commands and attach their command data."""
         self.bot.logger.info(f"Adding cog {type(cog).__name__} into the CommandSystem")
+        missing_data = []
         for command in cog.__cog_commands__:
             command.bot = self.bot
             full_name = f"{command.full_parent_name} {command.name}".strip()
             self.commands[full_name] = command
 
+            # command data is stored under the name the command had when it was created
+            data = self.command_data.get(command.data["command_name"])
+            if data is None:
+                data = self.command_data[command.data["command_name"]] = command.data
+                missing_data.append(data)
+
+            command.data = data
+
+        if missing_data:
+            db.commands.insert_many(missing_data)
+
         self.bot.logger.debug(f"Added {len(cog.__cog_commands__)} commands")
@@ -1,6 +1,6 @@
 import copy
 import re
-from typing import Optional
+from typing import List, Optional
 
 import config
 import discord
@@ -8,8 +8,9 @@ from discord.ext.commands import (Context, MemberConverter, RoleConverter,
                                   TextChannelConverter)
 
 from modules import database
+from modules.utils import PatternMatcher
 
-db = database.get_connection()
+async_db = database.get_async_connection()
 
 
 class User:
@@ -164,6 +165,22 @@ class Role:
             raise Exception("Accessing forbidden fruit")
 
 
+class CustomCommandMatcher(PatternMatcher):
+    """
+    Matches message content against a guild's custom commands with precompiled patterns.
+    See :class:`modules.utils.PatternMatcher`.
+
+    Attributes
+    ---------------
+    commands: List[:class:`dict`]
+        The custom commands with valid patterns.
+    """
+
+    def __init__(self, custom_commands: List[dict], logger=None):
+        super().__init__(custom_commands, "name", logger=logger)
+        self.commands = self.items
+
+
 class CustomCommands:
     """
     Handler of custom commands.
@@ -172,14 +189,45 @@ class CustomCommands:
     ---------------
     bot: :class:`bot.TLDR`
         Bot instance.
+    matchers: Dict[:class:`int`, :class:`CustomCommandMatcher`]
+        Matchers of the guilds' custom commands, keyed by guild id.
+        Loaded when the guild's first message is matched and removed by :func:`invalidate` when custom commands are edited.
     """
 
     def __init__(self, bot):
         self.bot = bot
+        self.matchers = {}
         self.bot.logger.info("CustomCommands module has been initiated")
 
-    @staticmethod
-    def match_message(message: discord.Message) -> Optional[dict]:
+    async def get_matcher(self, guild_id: int) -> CustomCommandMatcher:
+        """
+        Get the custom command matcher of a guild, custom commands are loaded from the database if needed.
+
+        Parameters
+        ----------------
+        guild_id: :class:`int`
+            ID of the guild.
+
+        Returns
+        -------
+        :class:`CustomCommandMatcher`
+            The matcher.
+        """
+        matcher = self.matchers.get(guild_id)
+        if matcher is None:
+            custom_commands = await async_db.custom_commands.find(
+                {"guild_id": guild_id}
+            ).to_list()
+            matcher = CustomCommandMatcher(custom_commands, self.bot.logger)
+            self.matchers[guild_id] = matcher
+
+        return matcher
+
+    def invalidate(self, guild_id: int):
+        """Drop the cached custom commands of a guild, needs to be called when they're added, edited or removed."""
+        self.matchers.pop(guild_id, None)
+
+    async def match_message(self, message: discord.Message) -> Optional[dict]:
         """
         Matches discord message against custom commands.
 
@@ -193,11 +241,8 @@ class CustomCommands:
         :class:`dict`
             A custom command if one is found.
         """
-        # using aggregation match custom command "name" value against message content
-        custom_commands = db.custom_commands.find({"guild_id": message.guild.id})
-        for cc in custom_commands:
-            if re.findall(cc["name"], message.content):
-                return cc
+        matcher = await self.get_matcher(message.guild.id)
+        return matcher.match(message.content)
 
     async def can_use(self, ctx: Context, command: dict):
         """
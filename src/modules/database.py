@@ -1,13 +1,23 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union
 
 import config
 import pymongo
 from bson import ObjectId
+from pymongo.collection import Collection
+from pymongo.cursor import Cursor
 
 from ukparliament.bills_tracker import FeedUpdate
 from ukparliament.divisions_tracker import CommonsDivision, LordsDivision
 
 active_connection = None
+active_async_connection = None
+
+# pymongo is thread safe, so blocking calls are handed to a small pool of worker threads
+# instead of being run on the event loop
+EXECUTOR_MAX_WORKERS = 8
 
 
 class Connection:
@@ -363,6 +373,29 @@ class Connection:
         self.threading_threads = self.db["threading_threads"]
         self.reprimands = self.db['reprimands']
 
+    def create_indexes(self):
+        """
+        Create the indexes used by the bot's queries, creating an index that already exists does nothing.
+        Called once when the bot starts, so importing modules doesn't need a reachable database.
+        """
+        # used for ranks and leaderboards, user_id breaks ties in the leaderboard order
+        for key in ("pp", "hp", "rp"):
+            self.leveling_users.create_index(
+                [
+                    ("guild_id", pymongo.ASCENDING),
+                    (key, pymongo.DESCENDING),
+                    ("user_id", pymongo.ASCENDING),
+                ]
+            )
+
+        # used by the timers scheduler to page in the timers that expire next
+        self.timers.create_index("expires")
+
+        # used to sweep captcha channels that expired while the bot was offline
+        self.captcha_channels.create_index(
+            [("active", pymongo.ASCENDING), ("expires", pymongo.ASCENDING)]
+        )
+
     def clear_bills_tracker_collection(self):
         self.bills_tracker.delete_many({})
 
@@ -650,6 +683,150 @@ class Connection:
         self.cases.update_one({"_id": case_id}, {"$set": {"logs_url": logs_url}})
 
 
+class AsyncCursor:
+    """
+    Wraps :class:`pymongo.cursor.Cursor` so that fetching documents happens in a worker thread.
+
+    Methods that only modify the query (sort, skip, limit, projection etc.) are forwarded to the underlying cursor,
+    since pymongo doesn't do any I/O until the cursor is iterated.
+
+    Attributes
+    ---------------
+    cursor: :class:`pymongo.cursor.Cursor`
+        The wrapped pymongo cursor.
+    executor: :class:`concurrent.futures.ThreadPoolExecutor`
+        The executor the cursor is iterated in.
+    """
+
+    def __init__(self, cursor: Cursor, executor: ThreadPoolExecutor):
+        self.cursor = cursor
+        self.executor = executor
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.cursor, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # chainable cursor methods return the cursor itself
+            if isinstance(result, Cursor):
+                return self
+
+            return result
+
+        return wrapper
+
+    async def to_list(self, length: int = None) -> list:
+        """
+        Fetch the documents of the cursor.
+
+        Parameters
+        ----------------
+        length: Optional[:class:`int`]
+            Maximum number of documents to fetch, if not set, all the documents will be fetched.
+
+        Returns
+        -------
+        :class:`list`
+            The fetched documents.
+        """
+        if length is not None:
+            self.cursor.limit(length)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, list, self.cursor)
+
+    async def __aiter__(self):
+        for document in await self.to_list():
+            yield document
+
+
+class AsyncCollection:
+    """
+    Wraps :class:`pymongo.collection.Collection` so that every database call is awaitable and runs in a worker thread.
+
+    Has the same API as the pymongo collection, except :func:`find` which returns :class:`AsyncCursor`.
+
+    Attributes
+    ---------------
+    collection: :class:`pymongo.collection.Collection`
+        The wrapped pymongo collection.
+    executor: :class:`concurrent.futures.ThreadPoolExecutor`
+        The executor the calls are run in.
+    """
+
+    def __init__(self, collection: Collection, executor: ThreadPoolExecutor):
+        self.collection = collection
+        self.executor = executor
+
+    def find(self, *args, **kwargs) -> AsyncCursor:
+        return AsyncCursor(self.collection.find(*args, **kwargs), self.executor)
+
+    async def aggregate(self, *args, **kwargs) -> list:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            lambda: list(self.collection.aggregate(*args, **kwargs)),
+        )
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.collection, name)
+        if not callable(attr):
+            return attr
+
+        async def wrapper(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(attr, *args, **kwargs)
+            )
+
+        return wrapper
+
+
+class AsyncConnection:
+    """
+    Async database handler. Wraps :class:`Connection` so that its collections and helper methods can be awaited
+    without blocking the event loop.
+
+    Collections are returned as :class:`AsyncCollection` and helper methods of :class:`Connection`
+    (get_leveling_user, get_guild_settings etc.) are returned as coroutine functions.
+
+    Attributes
+    ---------------
+    connection: :class:`Connection`
+        The blocking connection that is wrapped.
+    executor: :class:`concurrent.futures.ThreadPoolExecutor`
+        The executor that all the database calls are run in.
+    """
+
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.executor = ThreadPoolExecutor(
+            max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix="mongo"
+        )
+        self._collections = {}
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.connection, name)
+        if isinstance(attr, Collection):
+            if name not in self._collections:
+                self._collections[name] = AsyncCollection(attr, self.executor)
+            return self._collections[name]
+
+        if not callable(attr):
+            return attr
+
+        async def wrapper(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(attr, *args, **kwargs)
+            )
+
+        return wrapper
+
+
 def get_connection():
     """
     Set the global connection variable active_connection to an active connection to the database.
@@ -663,6 +840,20 @@ def get_connection():
     return active_connection
 
 
+def get_async_connection():
+    """
+    Set the global connection variable active_async_connection to an :class:`AsyncConnection` wrapping
+    the connection from :func:`get_connection`.
+    If it's already set, it returns active_async_connection.
+    """
+
+    global active_async_connection
+    if active_async_connection is None:
+        active_async_connection = AsyncConnection(get_connection())
+
+    return active_async_connection
+
+
 schemas = {
     "leveling_user": {
         "pp": 0,  # Participation points or parliamentary points
@@ -1,18 +1,310 @@
 from __future__ import annotations
 
+import bisect
+import copy
 import math
 import time
+from collections import Counter
 from datetime import datetime
 from typing import List, Optional, Tuple, Union
 
 import config
 import discord
+from cachetools import TTLCache
+from pymongo import DeleteMany, UpdateOne
 from pymongo.collection import Collection
 
-from modules import database
+from modules import database, timers
 from modules.utils import get_guild_role, get_member_by_id
 
 db = database.get_connection()
+async_db = database.get_async_connection()
+
+
+def _calculate_level_points(level: Union[int, float]) -> int:
+    return round(5 / 6 * level * (2 * level * level + 27 * level + 91))
+
+
+# total points needed to reach a level, indexed by level.
+# extended by level_from_points if points go past the last level
+LEVEL_POINTS = [_calculate_level_points(level) for level in range(1001)]
+
+
+def level_points(level: Union[int, float]) -> int:
+    """
+    Get the total points needed to reach level.
+
+    Parameters
+    ----------------
+    level: Union[:class:`int`, :class:`float`]
+        The level.
+
+    Returns
+    -------
+    :class:`int`
+        The total points needed to reach level.
+    """
+    if isinstance(level, int) and 0 <= level < len(LEVEL_POINTS):
+        return LEVEL_POINTS[level]
+
+    return _calculate_level_points(level)
+
+
+def level_from_points(points: int) -> int:
+    """
+    Get the level that points are enough for.
+
+    Parameters
+    ----------------
+    points: :class:`int`
+        The total points.
+
+    Returns
+    -------
+    :class:`int`
+        The highest level which total points are smaller than or equal to points.
+    """
+    while LEVEL_POINTS[-1] <= points:
+        LEVEL_POINTS.append(_calculate_level_points(len(LEVEL_POINTS)))
+
+    return bisect.bisect_right(LEVEL_POINTS, points) - 1
+
+
+class LevelingMemberCache:
+    """
+    Bounded cache of :class:`LevelingMember` objects, keyed by member id.
+
+    Members that haven't been accessed for `ttl` seconds expire, and least recently used members are evicted when the
+    cache holds `maxsize` members. Evicted members are loaded again from the database by :meth:`LevelingGuild.get_member`.
+
+    Attributes
+    ---------------
+    hits: :class:`int`
+        Number of lookups that found the member in the cache.
+    misses: :class:`int`
+        Number of lookups where the member had to be loaded again.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        self._cache.expire()
+        return len(self._cache)
+
+    def __contains__(self, member_id: int):
+        return member_id in self._cache
+
+    def __setitem__(self, member_id: int, member: LevelingMember):
+        self._cache[member_id] = member
+
+    def get(self, member_id: int) -> Optional[LevelingMember]:
+        """
+        Get member from the cache and count the lookup as a hit or a miss.
+
+        Parameters
+        ----------------
+        member_id: :class:`int`
+            Id of the member.
+
+        Returns
+        -------
+        Optional[:class:`LevelingMember`]
+            The cached LevelingMember or `None` if it isn't in the cache.
+        """
+        member = self._cache.get(member_id)
+        if member is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # setting the member again resets its ttl, so only idle members expire
+        self._cache[member_id] = member
+        return member
+
+    @property
+    def maxsize(self) -> int:
+        return self._cache.maxsize
+
+    @property
+    def ttl(self) -> int:
+        return self._cache.ttl
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Returns dict of the cache metrics: hits, misses, hit_rate, size, maxsize and ttl."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+class LevelingWriteBuffer:
+    """
+    Collects the leveling_users writes made by :class:`LevelingUser` and the classes attached to it, so that
+    all the changes to a member can be sent to the database as one update, instead of an update_one per attribute assignment.
+
+    Writes are kept per member as a dictionary of field path -> operation and are merged as they come in,
+    setting a field twice only keeps the last value, incrementing a field twice adds the amounts together etc.
+
+    Attributes
+    ---------------
+    pending: :class:`dict`
+        Pending operations keyed by (guild_id, user_id).
+    queued_writes: :class:`int`
+        How many writes have been queued, i.e. how many update_one calls would have been made without the buffer.
+    flushed_writes: :class:`int`
+        How many updates have actually been sent to the database.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.queued_writes = 0
+        self.flushed_writes = 0
+
+    @property
+    def writes_saved(self) -> int:
+        """The number of database writes that have been saved by coalescing."""
+        return self.queued_writes - self.flushed_writes - self.pending_count
+
+    @property
+    def pending_count(self) -> int:
+        """The number of members with pending writes."""
+        return len(self.pending)
+
+    def set(self, leveling_member: LevelingMember, key: str, value):
+        """Queue a $set of `key` to `value` for leveling_member."""
+        self._add(leveling_member, key, ("$set", value))
+
+    def inc(self, leveling_member: LevelingMember, key: str, amount: Union[int, float]):
+        """Queue a $inc of `key` by `amount` for leveling_member."""
+        self._add(leveling_member, key, ("$inc", amount))
+
+    def unset(self, leveling_member: LevelingMember, key: str):
+        """Queue a $unset of `key` for leveling_member."""
+        self._add(leveling_member, key, ("$unset", 1))
+
+    def _add(self, leveling_member: LevelingMember, key: str, operation: tuple):
+        """Merge operation into the pending operations of leveling_member."""
+        self.queued_writes += 1
+        operations = self.pending.setdefault(
+            (leveling_member.guild.id, leveling_member.id), {}
+        )
+        self._merge(operations, key, operation)
+
+    def _merge(self, operations: dict, key: str, operation: tuple):
+        """Merge operation on key into operations, a dictionary of field path -> operation."""
+        # new operation overrides anything queued on the fields inside of key
+        for path in [path for path in operations if path.startswith(f"{key}.")]:
+            del operations[path]
+
+        # if a parent field already has a pending operation, the new operation has to be applied inside of it,
+        # otherwise mongo would reject the update because of conflicting paths
+        parts = key.split(".")
+        for i in range(1, len(parts)):
+            parent = ".".join(parts[:i])
+            if parent not in operations:
+                continue
+
+            parent_op, parent_value = operations[parent]
+            if parent_op == "$set" and isinstance(parent_value, dict):
+                parent_value = copy.deepcopy(parent_value)
+            elif parent_op == "$unset":
+                parent_value = {}
+            else:
+                break
+
+            self._apply_nested(parent_value, parts[i:], operation)
+            operations[parent] = ("$set", parent_value)
+            return
+
+        op, value = operation
+        current_op, current_value = operations.get(key, (None, None))
+        if op == "$inc" and current_op == "$set":
+            operations[key] = ("$set", current_value + value)
+        elif op == "$inc" and current_op == "$inc":
+            operations[key] = ("$inc", current_value + value)
+        elif op == "$inc" and current_op == "$unset":
+            operations[key] = ("$set", value)
+        else:
+            operations[key] = operation
+
+    @staticmethod
+    def _apply_nested(document: dict, parts: List[str], operation: tuple):
+        """Apply operation to the field at parts inside document."""
+        for part in parts[:-1]:
+            document = document.setdefault(part, {})
+
+        op, value = operation
+        if op == "$set":
+            document[parts[-1]] = value
+        elif op == "$inc":
+            document[parts[-1]] = document.get(parts[-1], 0) + value
+        else:
+            document.pop(parts[-1], None)
+
+    async def flush(self, guild_id: int = None, user_id: int = None) -> int:
+        """
+        Send the pending writes to the database in one bulk_write.
+
+        Parameters
+        ----------------
+        guild_id: Optional[:class:`int`]
+            If set together with user_id, only the writes of that member will be flushed.
+        user_id: Optional[:class:`int`]
+            If set together with guild_id, only the writes of that member will be flushed.
+
+        Returns
+        -------
+        :class:`int`
+            The number of updates that were sent.
+        """
+        if guild_id is not None and user_id is not None:
+            pending = {}
+            if (guild_id, user_id) in self.pending:
+                pending[(guild_id, user_id)] = self.pending.pop((guild_id, user_id))
+        else:
+            # swap out the pending dict, so writes made during the flush are kept for the next one
+            pending, self.pending = self.pending, {}
+
+        requests = []
+        for (guild_id, user_id), operations in pending.items():
+            update = {}
+            for key, (op, value) in operations.items():
+                update.setdefault(op, {})[key] = value
+
+            requests.append(
+                UpdateOne({"guild_id": guild_id, "user_id": user_id}, update)
+            )
+
+        if requests:
+            try:
+                await async_db.leveling_users.bulk_write(requests, ordered=False)
+            except Exception:
+                # put the writes back, writes made to the member during the flush are applied on top of them,
+                # so increments are added together and newer sets and unsets win
+                for member_key, operations in pending.items():
+                    for key, operation in self.pending.get(member_key, {}).items():
+                        self._merge(operations, key, operation)
+                    self.pending[member_key] = operations
+                raise
+
+            self.flushed_writes += len(requests)
+
+        return len(requests)
+
+
+write_buffer = LevelingWriteBuffer()
 
 
 class DatabaseList(list):
@@ -126,13 +418,7 @@ class Boost:
 
     def remove(self):
         """Delete boost from the database."""
-        db.leveling_users.update_one(
-            {
-                "guild_id": self.leveling_member.guild.id,
-                "user_id": self.leveling_member.id,
-            },
-            {"$unset": {f"boosts.{self.boost_type}": 1}},
-        )
+        write_buffer.unset(self.leveling_member, f"boosts.{self.boost_type}")
 
     def values(self):
         """Returns info in the form of a dictionary."""
@@ -145,12 +431,8 @@ class Boost:
             and key in self.__dict__
             and self.__dict__[key] != value
         ):
-            db.leveling_users.update_one(
-                {
-                    "guild_id": self.leveling_member.guild.id,
-                    "user_id": self.leveling_member.id,
-                },
-                {"$set": {f"boosts.{self.boost_type}.{key}": value}},
+            write_buffer.set(
+                self.leveling_member, f"boosts.{self.boost_type}.{key}", value
             )
         self.__dict__[key] = value
 
@@ -222,14 +504,7 @@ class LevelingUserBoosts:
             and self.__dict__[key] != value
             and type(value) == Boost
         ):
-            db_value = value.values()
-            db.leveling_users.update_one(
-                {
-                    "guild_id": self.leveling_member.guild.id,
-                    "user_id": self.leveling_member.id,
-                },
-                {"$set": {f"boosts.{key}": db_value}},
-            )
+            write_buffer.set(self.leveling_member, f"boosts.{key}", value.values())
 
         self.__dict__[key] = value
 
@@ -258,24 +533,12 @@ class LevelingUserSettings:
     def toggle_at_me(self):
         """Toggle @me setting."""
         self.at_me = not bool(self.at_me)
-        db.leveling_users.update_one(
-            {
-                "guild_id": self.leveling_member.guild.id,
-                "user_id": self.leveling_member.id,
-            },
-            {"$set": {"settings.@_me": self.at_me}},
-        )
+        write_buffer.set(self.leveling_member, "settings.@_me", self.at_me)
 
     def toggle_rep_at(self):
         """Toggle rep@ setting."""
         self.rep_at = not bool(self.rep_at)
-        db.leveling_users.update_one(
-            {
-                "guild_id": self.leveling_member.guild.id,
-                "user_id": self.leveling_member.id,
-            },
-            {"$set": {"settings.rep@": self.rep_at}},
-        )
+        write_buffer.set(self.leveling_member, "settings.rep@", self.rep_at)
 
 
 class LevelingUserBranch:
@@ -322,13 +585,20 @@ class LevelingUserBranch:
                 "level": f"{self.branch.name[0]}_level",
                 "role": f"{self.branch.name[0]}_role",
             }
-            db.leveling_users.update_one(
-                {
-                    "guild_id": self.leveling_member.guild.id,
-                    "user_id": self.leveling_member.id,
-                },
-                {"$set": {key_switch.get(key): value}},
-            )
+            # points and levels only go up by some amount, so they can be incremented instead of set
+            if key in ["points", "level"]:
+                write_buffer.inc(
+                    self.leveling_member,
+                    key_switch.get(key),
+                    value - self.__dict__[key],
+                )
+            else:
+                write_buffer.set(self.leveling_member, key_switch.get(key), value)
+
+            if key in ["points", "role"]:
+                self.leveling_member.guild.leaderboard.update(
+                    self.leveling_member.id, **{key_switch.get(key): value}
+                )
 
         self.__dict__[key] = value
 
@@ -431,13 +701,13 @@ class LevelingUser:
             and key in self.__dict__
             and self.__dict__[key] != value
         ):
-            db.leveling_users.update_one(
-                {
-                    "guild_id": self.leveling_member.guild.id,
-                    "user_id": self.leveling_member.id,
-                },
-                {"$set": {key: value}},
-            )
+            if key == "rp":
+                write_buffer.inc(self.leveling_member, key, value - self.__dict__[key])
+                self.leveling_member.guild.leaderboard.update(
+                    self.leveling_member.id, rp=value
+                )
+            else:
+                write_buffer.set(self.leveling_member, key, value)
 
         self.__dict__[key] = value
 
@@ -558,9 +828,28 @@ class LevelingRoute:
         Optional[:class:`LevelingRole`]
             The LevelingRole or `None` if it isn't found.
         """
-        for role in self.roles:
-            if role.name.lower() == role_name.lower():
-                return role
+        role_index = self.find_role_index(role_name)
+        if role_index is not None:
+            return self.roles[role_index]
+
+    def find_role_index(self, role_name: str) -> Optional[int]:
+        """
+        Get the index of a role in the LevelingRoute.
+
+        Parameters
+        ----------------
+        role_name: :class:`str`
+            The name of the role that will be searched for.
+
+        Returns
+        -------
+        Optional[:class:`int`]
+            The index of the role or `None` if it isn't found.
+        """
+        role_name = role_name.lower()
+        for i, role in enumerate(self.roles):
+            if role.name.lower() == role_name:
+                return i
 
     def __iter__(self):
         """Iterator magic method to loop over the LevelingRoute's roles."""
@@ -676,6 +965,204 @@ class LevelingData:
         self.__dict__[key] = value
 
 
+class LevelingLeaderboard:
+    """
+    In memory leaderboard of a guild's leveling users, used for ranks, leaderboards and role counts without going to the database.
+
+    For every points key (pp, hp and rp) a list of (-points, user_id) tuples is kept sorted, so positions are found with bisect.
+    Only users with more than 0 points on a key are in that key's list.
+    The leaderboard is updated by :class:`LevelingUserBranch` and :class:`LevelingUser` when points or roles change.
+
+    Attributes
+    ---------------
+    guild_id: :class:`int`
+        The id of the guild.
+    users: Dict[:class:`int`, :class:`dict`]
+        The points and roles of every leveling user in the guild, keyed by user id.
+    order: Dict[:class:`str`, List[Tuple[:class:`int`, :class:`int`]]]
+        The sorted (-points, user_id) lists, keyed by points key.
+    role_counts: Dict[:class:`str`, :class:`collections.Counter`]
+        Number of users with more than 0 points who have a role, keyed by branch letter (p or h).
+    """
+
+    KEYS = ("pp", "hp", "rp")
+    BRANCHES = ("p", "h")
+    PROJECTION = {
+        "_id": 0,
+        "user_id": 1,
+        "pp": 1,
+        "hp": 1,
+        "rp": 1,
+        "p_role": 1,
+        "h_role": 1,
+    }
+
+    def __init__(self, guild_id: int):
+        self.guild_id = guild_id
+        self.users = {}
+        self.order = {key: [] for key in self.KEYS}
+        self.role_counts = {branch: Counter() for branch in self.BRANCHES}
+
+    @staticmethod
+    def _entry(leveling_user: dict) -> dict:
+        return {
+            "pp": leveling_user.get("pp", 0),
+            "hp": leveling_user.get("hp", 0),
+            "rp": leveling_user.get("rp", 0),
+            "p_role": leveling_user.get("p_role", ""),
+            "h_role": leveling_user.get("h_role", ""),
+        }
+
+    def _add(self, user_id: int, entry: dict):
+        for key in self.KEYS:
+            if entry[key] > 0:
+                bisect.insort(self.order[key], (-entry[key], user_id))
+
+        for branch in self.BRANCHES:
+            if entry[f"{branch}p"] > 0:
+                self.role_counts[branch][entry[f"{branch}_role"]] += 1
+
+    def _remove(self, user_id: int, entry: dict):
+        for key in self.KEYS:
+            if entry[key] > 0:
+                order = self.order[key]
+                del order[bisect.bisect_left(order, (-entry[key], user_id))]
+
+        for branch in self.BRANCHES:
+            if entry[f"{branch}p"] > 0:
+                self.role_counts[branch][entry[f"{branch}_role"]] -= 1
+
+    def build(self, leveling_users: List[dict]):
+        """
+        Replace the leaderboard with the given leveling users.
+
+        Parameters
+        ----------------
+        leveling_users: List[:class:`dict`]
+            The leveling_users documents of the guild.
+        """
+        self.users = {u["user_id"]: self._entry(u) for u in leveling_users}
+        for key in self.KEYS:
+            self.order[key] = sorted(
+                (-entry[key], user_id)
+                for user_id, entry in self.users.items()
+                if entry[key] > 0
+            )
+
+        for branch in self.BRANCHES:
+            self.role_counts[branch] = Counter(
+                entry[f"{branch}_role"]
+                for entry in self.users.values()
+                if entry[f"{branch}p"] > 0
+            )
+
+    async def load(self):
+        """Warm the leaderboard from the leveling_users collection."""
+        leveling_users = await async_db.leveling_users.find(
+            {"guild_id": self.guild_id}, self.PROJECTION
+        ).to_list()
+        self.build(leveling_users)
+
+    async def check_consistency(self) -> List[int]:
+        """
+        Compare the leaderboard against the leveling_users collection and repair the users that don't match.
+        Users with writes still in :attr:`write_buffer` are skipped, since the collection doesn't have their data yet.
+
+        Returns
+        -------
+        List[:class:`int`]
+            Ids of the users whose data didn't match the collection.
+        """
+        leveling_users = await async_db.leveling_users.find(
+            {"guild_id": self.guild_id}, self.PROJECTION
+        ).to_list()
+        collection_users = {u["user_id"]: self._entry(u) for u in leveling_users}
+
+        mismatched = [
+            user_id
+            for user_id in collection_users.keys() | self.users.keys()
+            if collection_users.get(user_id) != self.users.get(user_id)
+            and (self.guild_id, user_id) not in write_buffer.pending
+        ]
+        for user_id in mismatched:
+            self.remove(user_id)
+            if user_id in collection_users:
+                self.add_user({"user_id": user_id, **collection_users[user_id]})
+
+        return mismatched
+
+    def update(self, user_id: int, **values):
+        """
+        Update the points or roles of a user.
+
+        Parameters
+        ----------------
+        user_id: :class:`int`
+            The id of the user.
+        values:
+            The new values, keyed by leveling_users field name: pp, hp, rp, p_role or h_role.
+        """
+        entry = self.users.get(user_id)
+        if entry is None:
+            entry = self.users[user_id] = self._entry({})
+
+        self._remove(user_id, entry)
+        entry.update(values)
+        self._add(user_id, entry)
+
+    def add_user(self, leveling_user: dict):
+        """Add or replace user from their leveling_users document, used when their leveling data is restored."""
+        self.remove(leveling_user["user_id"])
+        entry = self.users[leveling_user["user_id"]] = self._entry(leveling_user)
+        self._add(leveling_user["user_id"], entry)
+
+    def remove(self, user_id: int):
+        """Remove user from the leaderboard, used when their leveling data is moved or deleted."""
+        entry = self.users.pop(user_id, None)
+        if entry is not None:
+            self._remove(user_id, entry)
+
+    def rename_role(self, branch: str, old_name: str, new_name: str):
+        """Rename a role of branch (p or h) for all the users who have it."""
+        for entry in self.users.values():
+            if entry[f"{branch}_role"] == old_name:
+                entry[f"{branch}_role"] = new_name
+
+        counts = self.role_counts[branch]
+        counts[new_name] += counts.pop(old_name, 0)
+
+    def count(self, key: str) -> int:
+        """Returns the number of users who have more than 0 points on key."""
+        return len(self.order[key])
+
+    def rank(self, key: str, points: int) -> int:
+        """Returns the rank of points on key, users with the same points share a rank."""
+        return bisect.bisect_left(self.order[key], (-points,)) + 1
+
+    def position(self, key: str, user_id: int) -> Optional[int]:
+        """
+        Get the index of user in the leaderboard of key, ties are ordered by user id.
+
+        Returns
+        -------
+        Optional[:class:`int`]
+            The index or `None` if the user has no points on key.
+        """
+        entry = self.users.get(user_id)
+        if entry is None or entry[key] <= 0:
+            return None
+
+        return bisect.bisect_left(self.order[key], (-entry[key], user_id))
+
+    def page(self, key: str, start: int, stop: int) -> List[int]:
+        """Returns ids of the users between indexes start and stop in the leaderboard of key."""
+        return [user_id for _, user_id in self.order[key][max(start, 0) : stop]]
+
+    def role_count(self, branch: str, role_name: str) -> int:
+        """Returns the number of users with more than 0 points on branch (p or h) who have the role."""
+        return self.role_counts[branch][role_name]
+
+
 class LevelingGuild(LevelingData):
     """Represents a Leveling Guilds.
 
@@ -689,19 +1176,25 @@ class LevelingGuild(LevelingData):
         The discord guild object.
     id: :class:`int`
         The discord id of the guild.
-    members :class:`List[:class:`LevelingMember`]`
-        List of LevelingMembers that belong to this guild.
+    members :class:`LevelingMemberCache`
+        LevelingMembers that belong to this guild, keyed by member id.
+        Idle members are evicted and are loaded again from the database when needed.
+    leaderboard :class:`LevelingLeaderboard`
+        The in memory leaderboard of the guild.
     """
 
     # TODO: remove user function
-    def __init__(self, bot, guild: discord.Guild):
+    def __init__(self, bot, guild: discord.Guild, leveling_data: dict):
         self.bot = bot
         self.guild = guild
         self.id = guild.id
 
-        self.members = []
+        self.members = LevelingMemberCache(
+            maxsize=config.LEVELING_MEMBER_CACHE_SIZE,
+            ttl=config.LEVELING_MEMBER_CACHE_TTL,
+        )
+        self.leaderboard = LevelingLeaderboard(guild.id)
 
-        leveling_data = db.get_leveling_data(guild.id)
         super().__init__(guild, leveling_data)
 
     def get_leveling_role(self, role_name: str) -> LevelingRole:
@@ -753,11 +1246,8 @@ class LevelingGuild(LevelingData):
         Optional[:class:`LevelingRole`]
             The LevelingMember or `None` if member isn't in the guild.
         """
-        # try to get member from list of members
-        member = None
-        for _member in self.members:
-            if _member.id == member_id:
-                member = _member
+        # try to get member from cached members
+        member = self.members.get(member_id)
 
         if member is None:
             # try to get member from cache
@@ -783,10 +1273,15 @@ class LevelingGuild(LevelingData):
         :class:`LevelingMember`
             The LevelingMember.
         """
+        if not leveling_user_data:
+            # member might have been evicted with writes still pending, those need to be in the loaded data
+            await write_buffer.flush(self.id, member.id)
+            leveling_user_data = await async_db.get_leveling_user(self.id, member.id)
+
         leveling_member = LevelingMember(
             self.bot, self, member, leveling_user_data=leveling_user_data
         )
-        self.members.append(leveling_member)
+        self.members[member.id] = leveling_member
         return leveling_member
 
     def get_level_up_channel(self, message: discord.Message) -> discord.TextChannel:
@@ -1016,25 +1511,21 @@ class LevelingMember(LevelingUser):
         """
         branch = user_branch.branch
 
-        user_role = branch.find_role(user_branch.role)
-        if not user_role:
+        role_index = branch.find_role_index(user_branch.role)
+        if role_index is None:
             return 0  # return 0 if user's current role isn't listen in the branch
 
-        all_roles = branch.roles
-        role_index = all_roles.index(user_role)
-
-        # + 1 includes current role
-        up_to_current_role = all_roles[: role_index + 1]
+        role_count = len(branch.roles)
 
         # how many levels to reach current user role
-        current_level_total = 5 * len(up_to_current_role)
+        current_level_total = 5 * (role_index + 1)
 
         # how many levels to reach previous user role
-        previous_level_total = 5 * len(up_to_current_role[:-1])
+        previous_level_total = 5 * role_index
 
         # if user is on last role user level - how many levels it took to reach previous role
         # or if current level total is bigger than user level
-        if len(all_roles) == role_index + 1 or current_level_total > user_branch.level:
+        if role_count == role_index + 1 or current_level_total > user_branch.level:
             return int(user_branch.level - previous_level_total)
 
         # if current level total equals user level return current roles max level
@@ -1042,16 +1533,9 @@ class LevelingMember(LevelingUser):
             return 5
 
         # if current level total is smaller than user level, user needs to rank up
-        if current_level_total < user_branch.level:
-            # calculates how many roles user goes up
-            roles_up = 0
-            # loop through roles above current user role
-            for _ in all_roles[role_index + 1 :]:
-                if current_level_total < user_branch.level:
-                    roles_up += 1
-                    current_level_total += 5
-
-            return -roles_up
+        # every role above current role covers 5 levels, user can't go above the last role
+        roles_up = math.ceil((user_branch.level - current_level_total) / 5)
+        return -min(roles_up, role_count - role_index - 1)
 
     @staticmethod
     def calculate_levels_up(user_branch: LevelingUserBranch) -> int:
@@ -1068,24 +1552,7 @@ class LevelingMember(LevelingUser):
         :class:`int`
             The number of levels LevelingMember needs to go up.
         """
-        user_levels = user_branch.level
-        user_points = user_branch.points
-
-        total_points = 0
-        total_levels_up = 0
-        while total_points <= user_points:
-            next_level = user_levels + total_levels_up + 1
-            # total points needed to gain the next level
-            total_points = round(
-                5
-                / 6
-                * next_level
-                * (2 * next_level * next_level + 27 * next_level + 91)
-            )
-
-            total_levels_up += 1
-
-        return total_levels_up - 1
+        return max(level_from_points(user_branch.points) - user_branch.level, 0)
 
     async def notify_perks(self, role: LevelingRole):
         """
@@ -1132,19 +1599,9 @@ class LevelingMember(LevelingUser):
             The rank of LevelingMember in user branch.
         """
         key = f"{user_branch.branch.name[0]}p"
-        sorted_users = [
-            u
-            for u in db.leveling_users.find(
-                {
-                    "guild_id": self.guild.id,
-                    key: {
-                        "$gt": user_branch.points - 0.1
-                    },  # 0.1 is subtracted so member will be included
-                }
-            ).sort(key, -1)
-        ]
-
-        return len(sorted_users)
+        # reputation branch points aren't kept up to date, rp is
+        points = self.rp if key == "rp" else user_branch.points
+        return self.guild.leaderboard.rank(key, points)
 
     @staticmethod
     def percent_till_next_level(user_branch: LevelingUserBranch) -> float:
@@ -1164,11 +1621,8 @@ class LevelingMember(LevelingUser):
         # points needed to gain next level from beginning of user level
         points_to_level_up = 5 * (user_branch.level**2) + 50 * user_branch.level + 100
 
-        next_level = user_branch.level + 1
         # total points needed to gain next level
-        total_points_to_next_level = round(
-            5 / 6 * next_level * (2 * next_level * next_level + 27 * next_level + 91)
-        )
+        total_points_to_next_level = level_points(user_branch.level + 1)
         points_needed = total_points_to_next_level - int(user_branch.points)
 
         percent = (
@@ -1188,64 +1642,135 @@ class LevelingSystem:
     ---------------
     bot: :class:`TLDR`
         The bot instance.
-    guilds: :class:`List[:class:`LevelingGuild`]`
-        List of the LevelingGuilds attached to the bot.
+    guilds: :class:`Dict[:class:`int`, :class:`LevelingGuild`]`
+        The LevelingGuilds attached to the bot, keyed by guild id.
+    write_buffer: :class:`LevelingWriteBuffer`
+        The buffer leveling_users writes are collected in before they're flushed to the database.
+    message_queue: List[:class:`discord.Message`]
+        Messages waiting to be given points for.
     """
 
     def __init__(self, bot):
         self.bot = bot
-        # list of leveling guilds
-        self.guilds = []
+        # leveling guilds by guild id
+        self.guilds = {}
+        self.write_buffer = write_buffer
+        # messages waiting to be processed by process_messages
+        self.message_queue = []
         self.bot.add_listener(self.on_message, "on_message")
         self.bot.add_listener(self.on_ready, "on_ready")
+        self.flush_writes.start()
+        self.check_leaderboards.start()
+        self.process_messages.start()
         self.bot.logger.info("LevelingSystem module has been initiated")
 
+    @timers.loop(seconds=5)
+    async def flush_writes(self):
+        """Flushes the leveling_users writes collected in :attr:`write_buffer`."""
+        await self.flush()
+
+    async def flush(self):
+        """Flushes :attr:`write_buffer` to the database and logs how many writes have been saved so far."""
+        flushed = await self.write_buffer.flush()
+        if flushed:
+            self.bot.logger.debug(
+                f"Flushed {flushed} leveling user updates. "
+                f"Writes saved so far: {self.write_buffer.writes_saved}/{self.write_buffer.queued_writes}"
+            )
+
+    @timers.loop(hours=1)
+    async def check_leaderboards(self):
+        """Checks the in memory leaderboards against the leveling_users collection."""
+        await self.flush()
+        for leveling_guild in self.guilds.values():
+            mismatched = await leveling_guild.leaderboard.check_consistency()
+            if mismatched:
+                self.bot.logger.warning(
+                    f"Leaderboard of guild [{leveling_guild.id}] didn't match leveling_users for "
+                    f"{len(mismatched)} users, they have been repaired."
+                )
+
     async def on_ready(self):
         await self.initialise_guilds()
         await self.check_left_members()
 
     async def check_left_members(self):
         self.bot.logger.info(f"Checking Guilds for left members.")
+        await self.flush()
         left_member_count = 0
         # check if any users have left while the bot was offline
         for guild in self.bot.guilds:
-            initial_left_members = left_member_count
-            guild_members = [
-                m.id for m in await guild.fetch_members(limit=None).flatten()
+            # guilds are chunked at startup, so the member cache is complete once chunking is done
+            if not guild.chunked:
+                await guild.chunk()
+
+            guild_members = {m.id for m in guild.members}
+            left_users = await async_db.leveling_users.find(
+                {"guild_id": guild.id, "user_id": {"$nin": list(guild_members)}}
+            ).to_list()
+            # user ids stored as strings would always be matched by $nin
+            left_users = [
+                u for u in left_users if int(u["user_id"]) not in guild_members
             ]
-            leveling_users = db.leveling_users.find({"guild_id": guild.id})
 
             self.bot.logger.debug(
-                f"Checking {guild.name} [{guild.id}] for left members. Guild members: {len(guild_members)} Leveling Users: {leveling_users.count()}"
+                f"Checking {guild.name} [{guild.id}] for left members. Guild members: {len(guild_members)}"
             )
 
-            for user in leveling_users:
-                # if true, user has left the server while the bot was offline
-                if int(user["user_id"]) not in guild_members:
-                    left_member_count += 1
-                    self.transfer_leveling_data(user)
+            await self.transfer_leveling_data_many(left_users)
+            left_member_count += len(left_users)
 
-            self.bot.logger.debug(
-                f"{left_member_count - initial_left_members} members left guild."
-            )
+            self.bot.logger.debug(f"{len(left_users)} members left guild.")
 
         self.bot.left_check.set()
         self.bot.logger.info(
             f"Left members have been checked - Total {left_member_count} members left guilds."
         )
 
-    def transfer_leveling_data(self, leveling_user: dict):
-        db.leveling_users.delete_many(leveling_user)
-        db.left_leveling_users.delete_many(leveling_user)
-        db.left_leveling_users.insert_one(leveling_user)
+    async def transfer_leveling_data(self, leveling_user: dict):
+        await self.transfer_leveling_data_many([leveling_user])
+
+    async def transfer_leveling_data_many(self, leveling_users: List[dict]):
+        """
+        Moves leveling users to left_leveling_users and creates timers for their data to expire, with bulk writes.
+
+        Parameters
+        -----------
+        leveling_users: List[:class:`dict`]
+            The leveling_users documents of members who have left.
+        """
+        if not leveling_users:
+            return
+
+        for leveling_user in leveling_users:
+            leveling_guild = self.get_guild(leveling_user["guild_id"])
+            if leveling_guild:
+                leveling_guild.leaderboard.remove(leveling_user["user_id"])
+
+        await async_db.left_leveling_users.bulk_write(
+            [
+                DeleteMany({"guild_id": u["guild_id"], "user_id": u["user_id"]})
+                for u in leveling_users
+            ],
+            ordered=False,
+        )
+        await async_db.left_leveling_users.insert_many(leveling_users, ordered=False)
+        await async_db.leveling_users.delete_many(
+            {"_id": {"$in": [u["_id"] for u in leveling_users]}}
+        )
 
         data_expires = round(time.time()) + 30 * 24 * 60 * 60  # 30 days
 
-        self.bot.timers.create(
-            guild_id=leveling_user["guild_id"],
-            expires=data_expires,
-            event="leveling_data_expires",
-            extras={"user_id": leveling_user["user_id"]},
+        await self.bot.timers.create_many(
+            [
+                {
+                    "guild_id": leveling_user["guild_id"],
+                    "expires": data_expires,
+                    "event": "leveling_data_expires",
+                    "extras": {"user_id": leveling_user["user_id"]},
+                }
+                for leveling_user in leveling_users
+            ]
         )
 
     async def on_message(self, message: discord.Message):
@@ -1264,9 +1789,18 @@ class LevelingSystem:
         ):
             return
 
-        print(f"Message from {message.author.name}: {message.content}")
+        self.message_queue.append(message)
+
+    @timers.loop(seconds=1)
+    async def process_messages(self):
+        """Hands the messages queued since the last call to the leveling cog, so points are given in batches."""
+        if not self.message_queue:
+            return
+
+        messages, self.message_queue = self.message_queue, []
         leveling_cog = self.bot.get_cog("Leveling")
-        await leveling_cog.process_message(message)
+        if leveling_cog:
+            await leveling_cog.process_messages(messages)
 
     async def initialise_guilds(self):
         """Function called in :func:`cogs.events.on_ready` to initialise all the guilds and cache them."""
@@ -1274,7 +1808,8 @@ class LevelingSystem:
             f"Initialising {len(self.bot.guilds)} guilds as LevelingGuilds."
         )
         for guild in self.bot.guilds:
-            self.add_guild(guild)
+            leveling_guild = await self.add_guild(guild)
+            await leveling_guild.leaderboard.load()
 
     async def get_member(self, guild_id: int, member_id: int) -> LevelingMember:
         """
@@ -1310,11 +1845,9 @@ class LevelingSystem:
         :class:`LevelingGuild`
             The LevelingGuild or `None` if the LevelingGuild isn't found.
         """
-        for guild in self.guilds:
-            if guild.id == guild_id:
-                return guild
+        return self.guilds.get(guild_id)
 
-    def add_guild(self, guild: discord.Guild) -> LevelingGuild:
+    async def add_guild(self, guild: discord.Guild) -> LevelingGuild:
         """
         Converts :class:`discord.Guild` to :class:`LevelingGuild` and adds it to :attr:`guilds`.
 
@@ -1331,6 +1864,7 @@ class LevelingSystem:
         self.bot.logger.debug(
             f"Adding guild {guild.name} [{guild.id}] to LevelingSystem."
         )
-        leveling_guild = LevelingGuild(self.bot, guild)
-        self.guilds.append(leveling_guild)
+        leveling_data = await async_db.get_leveling_data(guild.id)
+        leveling_guild = LevelingGuild(self.bot, guild, leveling_data)
+        self.guilds[guild.id] = leveling_guild
         return leveling_guild
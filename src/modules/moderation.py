@@ -1,5 +1,6 @@
 from datetime import datetime
 import json
+import math
 import os
 import random
 import time
@@ -26,15 +27,15 @@ from discord.ext.commands import Bot, bot_has_any_role
 from discord.message import Message
 from discord.threads import Thread
 from pyasn1.type.univ import Null
-from pymongo.collection import Collection
 
 import modules.database as database
 import modules.format_time as format_time
+import modules.timers as timers
 from modules import database, embed_maker
-from discord.ext.tasks import loop
 from modules.utils import SettingsHandler
 
 db = database.get_connection()
+async_db = database.get_async_connection()
 
 
 class Case:
@@ -52,7 +53,7 @@ class Cases:
     def __init__(self, bot):
         self.bot = bot
 
-    def get_cases(
+    async def get_cases(
         self, guild_id: int, *, before: int = 0, after: int = 0, **kwargs
     ) -> list[Case]:
         """
@@ -81,9 +82,10 @@ class Cases:
         if after:
             query["created_at"] = {"$gt": after}
 
-        return [Case(c) for c in db.cases.find(query).sort("created_at", -1)]
+        cases = await async_db.cases.find(query).sort("created_at", -1).to_list()
+        return [Case(c) for c in cases]
 
-    def add_case(
+    async def add_case(
         self,
         guild_id: int,
         case_type: str,
@@ -124,7 +126,7 @@ class Cases:
             "moderator_id": moderator.id,
             "extra": extra,
         }
-        result = db.cases.insert_one(case_data)
+        result = await async_db.cases.insert_one(case_data)
         case_data["_id"] = result.inserted_id
 
         return Case(case_data)
@@ -141,10 +143,10 @@ class ReprimandDataManager:
     """
 
     def __init__(self):
-        self._db = database.get_connection()
-        self._reprimand_collection: Collection = self._db.reprimands
+        self._db = database.get_async_connection()
+        self._reprimand_collection: database.AsyncCollection = self._db.reprimands
 
-    def get_reprimand(self, thread_id: int):
+    async def get_reprimand(self, thread_id: int):
         """
         Fetch a saved reprimand via an associated thread's id (polling or discussion)
 
@@ -153,7 +155,7 @@ class ReprimandDataManager:
         thread_id: :class:`int`
             The id othe thread the reprimand is associated with.
         """
-        return self._reprimand_collection.find_one(
+        return await self._reprimand_collection.find_one(
             {
                 "$or": [
                     {"thread_ids.discussion": thread_id},
@@ -162,14 +164,14 @@ class ReprimandDataManager:
             }
         )
 
-    def get_reprimands(self):
+    async def get_reprimands(self) -> list:
         """
         Fetches all live reprimands from the database.
         """
-        return self._reprimand_collection.find({})
+        return await self._reprimand_collection.find({}).to_list()
 
     async def delete_reprimand(self, thread_id: int):
-        self._reprimand_collection.delete_one(
+        await self._reprimand_collection.delete_one(
             {
                 "$or": [
                     {"thread_ids.discussion": thread_id},
@@ -202,7 +204,7 @@ class ReprimandDataManager:
                 else -1,
             }
 
-        self._reprimand_collection.update_one(
+        await self._reprimand_collection.update_one(
             {"thread_ids.discussion": reprimand.get_discussion_thread().id},
             {
                 "$set": {
@@ -238,7 +240,7 @@ class Poll:
     def get_type(self) -> PollType:
         pass
 
-    async def tick(self, reprimand):
+    async def conclude(self, reprimand):
         pass
 
     def get_seconds_remaining(self) -> int:
@@ -301,6 +303,7 @@ class GCPoll(Poll):
         self._cg_id = cg_id
         self._message_id = 0
         self._countdown: int = 0
+        self._timer: Union[timers.Countdown, None] = None
         self._name = None
         self._singular = False
 
@@ -394,14 +397,9 @@ class GCPoll(Poll):
 
         # Add saving functions here.
 
-    async def tick(self, reprimand):
-        if self._singular:
-            return
-        if self._countdown > 0:
-            self._countdown = self._countdown - 1
-
-            if self._countdown % 60 == 0:
-                await self._reprimand.save()
+    async def conclude(self, reprimand):
+        # GC polls are concluded with the punishment poll.
+        pass
 
     async def get_message(self):
         await self._reprimand.get_polling_thread().fetch_message(self._message_id)
@@ -439,10 +437,13 @@ class GCPoll(Poll):
         return self._singular
 
     def get_seconds_remaining(self) -> int:
-        return self._countdown
+        if self._timer is None:
+            return self._countdown
+
+        return math.ceil(self._timer.remaining)
 
     def _has_countdown_elapsed(self) -> bool:
-        return self._countdown <= 0
+        return self.get_seconds_remaining() <= 0
 
 
 class GCApprovalView(discord.ui.View):
@@ -527,6 +528,7 @@ class PunishmentPoll(Poll):
         self._reprimand: Reprimand = reprimand
         self._accused_member = accused_member
         self._countdown: int = 0
+        self._timer: Union[timers.Countdown, None] = None
         self._settings = reprimand._module.get_settings()
         self._message_id = 0
         self._name = None
@@ -636,12 +638,9 @@ class PunishmentPoll(Poll):
     def get_type(self) -> PollType:
         return PollType.PUNISHMENT_POLL
 
-    # A function called per tick, where a tick is a second elapsed.
-    async def tick(self, reprimand):
-        if self._countdown > 0:
-            self._countdown = self._countdown - 1
-
-        if self._countdown == 0 and reprimand.is_awaiting_approval() is False:
+    # A function called when the countdown of the poll has elapsed.
+    async def conclude(self, reprimand):
+        if reprimand.is_awaiting_approval() is False:
             # Contains code executed for the end of the reprimand, setting up the gc approval process.
             # This assumines that the GCPolls have too been completed, and the PunishmentPoll be the last
             # poll to complete.
@@ -679,6 +678,7 @@ class PunishmentPoll(Poll):
                 )
                 reprimand._gc_awaiting_approval = True
                 await reprimand.save()
+                self._reprimand._manager.start_gc_notifications(reprimand)
             else:
                 await self._reprimand.get_polling_thread().send(
                     messages_settings["quorum_not_met"]
@@ -693,10 +693,13 @@ class PunishmentPoll(Poll):
         return False
 
     def get_seconds_remaining(self) -> int:
-        return self._countdown
+        if self._timer is None:
+            return self._countdown
+
+        return math.ceil(self._timer.remaining)
 
     def _has_countdown_elapsed(self) -> bool:
-        return self._countdown <= 0
+        return self.get_seconds_remaining() <= 0
 
 
 class Reprimand:
@@ -733,7 +736,7 @@ class Reprimand:
         self._cg_ids = cg_ids
         self._gc_awaiting_approval = False
         self._chosen_punishment_id = None
-        self._gc_notification_countdown = 0
+        self._gc_notification_countdown: Union[timers.Countdown, None] = None
 
     async def load(
         self, discussion_thread_id: int = 0, polling_thread_id: int = 0, **kwargs
@@ -1033,6 +1036,17 @@ class Reprimand:
             self._polling_thread.id
         )
 
+    def cancel_countdowns(self):
+        """
+        Cancels the countdowns of the polls and the GC notifications.
+        """
+        for poll in self._polls:
+            if poll._timer is not None:
+                poll._timer.cancel()
+
+        if self._gc_notification_countdown is not None:
+            self._gc_notification_countdown.cancel()
+
     def get_polling_thread(self) -> Thread:
         return self._polling_thread
 
@@ -1074,6 +1088,7 @@ class ReprimandManager:
         reprimand = Reprimand(self, accused, cg_ids)
         await reprimand.load()
         self._reprimands.append(reprimand)
+        self.start_countdowns(reprimand)
         return reprimand
 
     def get_reprimand(self, thread_id: int) -> Union[Reprimand, None]:
@@ -1110,7 +1125,7 @@ class ReprimandManager:
                 reprimand.get_polling_thread().id == thread_id
                 or reprimand.get_discussion_thread().id == thread_id
             ):
-                self._reprimands.pop(i)
+                self._reprimands.pop(i).cancel_countdowns()
                 break
 
     def is_reprimand_thread(self, thread_id: int) -> bool:
@@ -1132,7 +1147,7 @@ class ReprimandManager:
 
     async def load(self):
         """Loads saved reprimands from MongoDB Collections into memory."""
-        collection_reprimands = self._module.get_data_manager().get_reprimands()
+        collection_reprimands = await self._module.get_data_manager().get_reprimands()
 
         for c_reprimand in collection_reprimands:
             accused_member = self._module.get_main_guild().get_member(
@@ -1160,70 +1175,137 @@ class ReprimandManager:
                 chosen_punishment_id=c_reprimand["chosen_punishment_id"],
             )
             self._reprimands.append(reprimand)
+            self.start_countdowns(reprimand)
 
         self._bot.logger.info(
             f"Loaded {len(self._reprimands)} reprimands from MongoDB."
         )
-        self.ticker.start()
 
-    @loop(seconds=1)
-    async def ticker(self):
+    def start_countdowns(self, reprimand: Reprimand):
         """
-        A one second interval loop that executes the function respondibile for reducing
-        the countdown. Aka, a ticker.
+        Starts the countdowns of the polls of a reprimand, and the GC notifications if the reprimand is awaiting approval.
+        The countdowns send the poll notifications, save the reprimand every minute and conclude the polls.
+
+        Parameters
+        ----------
+        reprimand: :class:`Reprimand`
+            The reprimand.
         """
-        for reprimand in self._reprimands:
-            if reprimand.is_awaiting_approval():
-                gc_countdown = reprimand._gc_notification_countdown
-                gc_notification = self._module.get_settings()["gc_notification"]
+        notification_thresholds = [
+            format_time.parse(key, False)
+            for key in self._module.get_settings()["notifications"].keys()
+        ]
 
-                # Regardless of interval, if it's divisable by the current loop count it should trigger the notifications.
-                parsed_interval = format_time.parse(gc_notification["interval"], False)
+        for poll in reprimand.get_polls():
+            # singular GC polls don't have a countdown of their own.
+            if poll.is_singular():
+                continue
 
-                if type(parsed_interval) is not int:
-                    raise Exception(
-                        f"Parsed interval {parsed_interval} is not int type."
-                    )
+            async def poll_countdown(remaining: int, poll: Poll = poll):
+                await self.poll_countdown(reprimand, poll, remaining)
 
-                gc_role = self._module.get_gc_role()
+            seconds = poll.get_seconds_remaining()
+            # minute thresholds are on whole minutes, poll_countdown saves the reprimand when remaining is one
+            minutes = list(range(seconds // 60 * 60, 0, -60))
+            thresholds = notification_thresholds + minutes
+            poll._timer = self._bot.countdowns.start(
+                seconds, poll_countdown, thresholds
+            )
 
-                if gc_role is None:
-                    raise Exception(f"GC Role is none")
+        if reprimand.is_awaiting_approval():
+            self.start_gc_notifications(reprimand)
 
-                if gc_countdown % parsed_interval == 0:
-                    await self._module.get_gc_approval_channel().send(
-                        gc_notification["message"]
-                        .replace(
-                            "{polling_thread_mention}",
-                            reprimand.get_polling_thread().mention,
-                        )
-                        .replace("{gc_role_mention}", gc_role.mention)
+    async def poll_countdown(self, reprimand: Reprimand, poll: Poll, remaining: int):
+        """
+        Called by the countdown of a poll when a notification needs to be sent, every minute and when the countdown has elapsed.
+
+        Parameters
+        ----------
+        reprimand: :class:`Reprimand`
+            The reprimand the poll belongs to.
+        poll: :class:`Poll`
+            The poll.
+        remaining: :class:`int`
+            Seconds remaining on the countdown of the poll.
+        """
+        if remaining % 60 == 0:
+            await reprimand.save()
+
+        poll_notifications = self._module.get_settings()["notifications"]
+
+        for notification_key in poll_notifications.keys():
+            parsed_key = format_time.parse(notification_key, False)
+
+            if remaining == parsed_key:
+                await reprimand.get_polling_thread().send(
+                    poll_notifications[notification_key]
+                    .replace(
+                        "{voting_role_mention}",
+                        self._module.get_voting_role().mention,
                     )
-                reprimand._gc_notification_countdown = gc_countdown + 1
-
-            for poll in reprimand.get_polls():
-                await poll.tick(reprimand)
-
-                poll_countdown = poll.get_seconds_remaining()
-                poll_notifications = self._module.get_settings()["notifications"]
-
-                for notification_key in poll_notifications.keys():
-                    parsed_key = format_time.parse(notification_key, False)
-
-                    if poll_countdown == parsed_key:
-                        await reprimand.get_polling_thread().send(
-                            poll_notifications[notification_key]
-                            .replace(
-                                "{voting_role_mention}",
-                                self._module.get_voting_role().mention,
-                            )
-                            .replace(
-                                "{type}",
-                                "GC Poll"
-                                if poll.get_type() == PollType.GC_POLL
-                                else "Punishment Poll",
-                            )
-                        )
+                    .replace(
+                        "{type}",
+                        "GC Poll"
+                        if poll.get_type() == PollType.GC_POLL
+                        else "Punishment Poll",
+                    )
+                )
+
+        if remaining == 0:
+            await poll.conclude(reprimand)
+
+    def start_gc_notifications(self, reprimand: Reprimand):
+        """
+        Starts notifying the GC of a reprimand awaiting approval, the first notification is sent immediately
+        and the following ones every interval set in the gc_notification setting.
+
+        Parameters
+        ----------
+        reprimand: :class:`Reprimand`
+            The reprimand.
+        """
+        gc_notification = self._module.get_settings()["gc_notification"]
+        parsed_interval = format_time.parse(gc_notification["interval"], False)
+
+        if type(parsed_interval) is not int:
+            raise Exception(f"Parsed interval {parsed_interval} is not int type.")
+
+        async def gc_notification_countdown(remaining: int):
+            reprimand._gc_notification_countdown = self._bot.countdowns.start(
+                parsed_interval, gc_notification_countdown
+            )
+            await self.send_gc_notification(reprimand)
+
+        if reprimand._gc_notification_countdown is not None:
+            reprimand._gc_notification_countdown.cancel()
+
+        reprimand._gc_notification_countdown = self._bot.countdowns.start(
+            0, gc_notification_countdown
+        )
+
+    async def send_gc_notification(self, reprimand: Reprimand):
+        """
+        Sends a notification to the GC approval channel about a reprimand awaiting approval.
+
+        Parameters
+        ----------
+        reprimand: :class:`Reprimand`
+            The reprimand.
+        """
+        gc_notification = self._module.get_settings()["gc_notification"]
+        gc_role = self._module.get_gc_role()
+
+        if gc_role is None:
+            raise Exception(f"GC Role is none")
+
+        await self._module.get_gc_approval_channel().send(
+            gc_notification["message"]
+            .replace(
+                "{polling_thread_mention}",
+                reprimand.get_polling_thread().mention,
+            )
+            .replace("{gc_role_mention}", gc_role.mention)
+        )
 
     def get_reprimand_from_thread_id(self, thread_id: int) -> Union[Thread, None]:
         """
@@ -1452,7 +1534,7 @@ class ReprimandModule:
                 walk(split_path, split_path[0], settings)
 
     async def on_ready(self):
-        # Here, load up reprimands from MongoDB collection and start the ticker.
+        # Here, load up reprimands from MongoDB collection and start their countdowns.
         self._bot.logger.info("Reprimand loaded.")
         await self._reprimand_manager.load()
         self._bot.add_view(GCApprovalView(self))
@@ -11,11 +11,26 @@ from typing import Optional
 from modules import database
 from slack_bolt.app.async_app import AsyncApp
 from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
-from modules.utils import replace_mentions, embed_message_to_text, async_file_downloader, get_member_from_string
+from modules.utils import embed_message_to_text, async_file_downloader, get_member_from_string
 
 db = database.get_connection()
 image_extensions = ['jpg', 'png', 'gif', 'webp', 'tiff', 'bmp', 'jpeg']
 
+# slack -> discord, custom mentions like @hatty and slack mentions like <@U0271HF3ZQV> or <#C01|general>
+SLACK_CUSTOM_MENTION_PATTERN = re.compile(r'(?:^|\s|)@(.+)$')
+SLACK_MENTION_PATTERN = re.compile(r'<([@#])([^|>]+)(?:\|(\w+))?>')
+# discord -> slack, every token that needs translating is matched by a single alternative
+DISCORD_TOKEN_PATTERN = re.compile(
+    r'<(?P<mention_type>@[!&]?|#)(?P<mention_id>\d+)>'
+    r'|(?P<custom_mention>(?<!\S)@)(?=\S)'
+    r'|\[(?P<link_text>[^\]\n]*)]\((?P<url>[^)\s]+)\)'
+    r'|\*\*\*(?P<bold_italic>[^*\s](?:[^*]*[^*\s])?)\*\*\*'
+    r'|\*\*(?P<bold>[^*\s](?:[^*]*[^*\s])?)\*\*'
+    r'|(?<!\*)\*(?P<italic>[^*\s](?:[^*]*[^*\s])?)\*(?!\*)'
+)
+# single word of a custom mention, mentions don't continue onto the next line
+MENTION_WORD_PATTERN = re.compile(r'[^\S\n]*(\S+)')
+
 
 class SlackMessage:
     def __init__(self, data: dict, slack: 'Slack'):
@@ -44,7 +59,7 @@ class SlackMessage:
 
         if self.channel is None:
             self.channel = SlackChannel(self.team, self.channel_id, self.slack)
-            self.team.channels.append(self.channel)
+            self.team.add_channel(self.channel)
 
         self.discord_message_id = event_data['discord_message_id'] if 'discord_message_id' in event_data else None
         self.reactions = {}
@@ -87,8 +102,7 @@ class SlackMessage:
         if not self.channel.discord_channel:
             return string
 
-        mentions = re.findall(r'(?:^|\s|)@(.+)$', string)
-        for mention in mentions:
+        for mention in SLACK_CUSTOM_MENTION_PATTERN.findall(string):
             member, extra_string = await get_member_from_string(None, mention, guild=self.channel.discord_channel.guild)
             if member:
                 string = string.replace(f'@{mention}', f'{member.mention} {extra_string}'.strip())
@@ -96,20 +110,16 @@ class SlackMessage:
         return string
 
     def replace_valid_mentions(self, string: str) -> str:
-        # replace mentions in values with actual names
-        mentions = re.findall(r'(<([@#])([^|>]+)(?:\|(\w+))?>)', string)
-        for mention in mentions:
-            mention_type = mention[1]
-            mention_id = mention[2]
-
+        """Replace slack channel and member mentions with their names."""
+        def replace(match: re.Match) -> str:
+            mention_type, mention_id, label = match.groups()
             if mention_type == '#':
-                string = string.replace(mention[0], f'#{mention[3]}')
-            elif mention_type == '@':
-                slack_member = self.slack.get_user(mention_id)
-                if slack_member:
-                    string = string.replace(mention[0], f'@{slack_member.name}')
+                return f'#{label or mention_id}'
 
-        return string
+            slack_member = self.slack.get_user(mention_id)
+            return f'@{slack_member.name}' if slack_member else match[0]
+
+        return SLACK_MENTION_PATTERN.sub(replace, string)
 
     async def send_to_discord(self, *, edit: bool = False):
         """Function for sending messages from slack to discord via a webhook."""
@@ -123,11 +133,10 @@ class SlackMessage:
             self.member = await self.team.add_user(self.user_id)
 
         file_urls = [file['url'] for file in self.files]
+        files = await async_file_downloader(file_urls, headers={'Authorization': f'Bearer {self.team.token}'})
+        # files that couldn't be downloaded are None, skipped here so the rest keep their names
         download_files = [
-            discord.File(file, filename=self.files[i]['name']) for i, file in
-            enumerate(
-                await async_file_downloader(file_urls, headers={'Authorization': f'Bearer {self.team.token}'})
-            )
+            discord.File(file, filename=file_data['name']) for file_data, file in zip(self.files, files) if file
         ]
 
         text = unescape(self.text)
@@ -205,73 +214,62 @@ class DiscordMessage:
 
             db.slack_messages.delete_one({'team_id': team.team_id, 'discord_message_id': self.id})
 
-    def replace_custom_mentions(self, text: str) -> str:
+    def translate_mention(self, team: Optional['SlackTeam'], mention_type: str, mention_id: int) -> Optional[str]:
+        """Translates a discord mention to a slack mention if the member is aliased, or to the name of the mentioned object."""
+        if mention_type in ('@', '@!'):
+            slack_member = team.get_user(discord_id=mention_id) if team else None
+            if slack_member:
+                return f'<@{slack_member.id}>'
+
+            mention_object = self.guild.get_member(mention_id)
+            if mention_object and team:
+                matches = team.find_members(mention_object.name)
+                if len(matches) == 1:
+                    return f'<@{matches[0][1].id}>'
+        elif mention_type == '@&':
+            mention_object = self.guild.get_role(mention_id)
+        else:
+            mention_object = self.guild.get_channel(mention_id)
+
+        if mention_object:
+            return f'{mention_type[0]}{mention_object.name}'
+
+    def normalize_text(self, text: str) -> str:
         """
-        This whole function is a mess.
-        Replaces things like @hatty in a discord message with slack member mentions [<@U0271HF3ZQV>] before sending it off to slack.
+        Function for normalising discord text to slack standards.
+        The text is translated in a single pass, mentions, hyperlinks and bold and italic formatting are all matched
+        by DISCORD_TOKEN_PATTERN and custom mentions like @hatty are resolved against the member names of the slack team.
         """
         slack_channel = self.slack.get_channel(discord_id=self.channel_id)
-        if not slack_channel:
-            return text
-
-        team = slack_channel.team
-
-        special_chars_map = {i: '\\' + chr(i) for i in b'()[]{}?*+-|^$\\.&~#'}
-        mentions = re.findall(r'(?:^|\s)(@.+)', text)
-
-        def match_member(string: str):
-            safe_text = string.translate(special_chars_map)
-            members = list(
-                filter(
-                    lambda m: re.findall(fr'({safe_text.lower()})', m.name.lower()),
-                    team.members
-                )
-            )
-            if len(members) == 1:
-                return members[0]
-
-            return members
-
-        for mention in mentions:
-            previous_match = None
-            member_name = ""
-            for part in mention[1:].split():
-                member_match = match_member(f'{member_name} {part}'.strip())
-                if not member_match:
-                    if previous_match is None:
-                        break
-                    if type(previous_match) == SlackMember:
-                        text = text.replace(f'@{member_name}', f'<@{previous_match.id}>')
-                        break
+        team = slack_channel.team if slack_channel else None
+
+        chunks = []
+        position = 0
+        while match := DISCORD_TOKEN_PATTERN.search(text, position):
+            chunks.append(text[position:match.start()])
+            position = match.end()
+
+            if match['custom_mention']:
+                member, end = team.match_mention(text, position) if team else (None, position)
+                if member:
+                    chunks.append(f'<@{member.id}>')
+                    position = end
                 else:
-                    # update variables
-                    previous_match = member_match
-                    member_name = f'{member_name} {part}'.strip()
-
-            if len(mention[1:].split()) == 1 and type(previous_match) == SlackMember:
-                text = text.replace(f'@{member_name}', f'<@{previous_match.id}>')
-
-        return text
-
-    @staticmethod
-    def hyperlink_converter(text):
-        """Converts discord hyperlink format to slack format."""
-        special_chars_map = {i: '\\' + chr(i) for i in b'()[]{}?*+-|^$\\.&~#'}
-        matches = re.findall(r'(\[(.*)]\((.*)\))', text)
-        for match in matches:
-            url_text = match[1]
-            url = match[2]
-            text = re.sub(match[0].translate(special_chars_map), f'<{url}|{url_text}>', text)
-
-        return text
-
-    def normalize_text(self, text):
-        """Function for normalising discord text to slack standards."""
-        text = self.replace_custom_mentions(text)
-        text = replace_mentions(self.guild, text)
-        text = self.hyperlink_converter(text)
-        text = self.text_to_slack_formatting(text)
-        return text
+                    chunks.append('@')
+            elif match['mention_type']:
+                mention = self.translate_mention(team, match['mention_type'], int(match['mention_id']))
+                chunks.append(mention or match[0])
+            elif match['url']:
+                chunks.append(f'<{match["url"]}|{match["link_text"]}>')
+            elif match['bold_italic']:
+                chunks.append(f'*_{match["bold_italic"]}_*')
+            elif match['bold']:
+                chunks.append(f'*{match["bold"]}*')
+            else:
+                chunks.append(f'_{match["italic"]}_')
+
+        chunks.append(text[position:])
+        return ''.join(chunks)
 
     def embed_to_blocks(self) -> tuple[list, str]:
         """Converts discord embeds into slack blocks."""
@@ -290,22 +288,6 @@ class DiscordMessage:
         ]
         return blocks, text
 
-    @staticmethod
-    def text_to_slack_formatting(text):
-        """Converts discord's bold and italic formatting to slack standards."""
-        special_chars_map = {i: '\\' + chr(i) for i in b'()[]{}?*+-|^$\\.&~#'}
-        italic = re.findall(r'((?:[^*]|^)\*((?:[^*\s][^*]+[^*\s]?)|(?:[^*\s]?[^*]+[^*\s]))\*(?:[^*]|$))', text)
-        for match in italic:
-            match_text = match[1]
-            text = re.sub(match[0].strip().translate(special_chars_map), f'_{match_text}_', text)
-
-        bold = re.findall(r'(\*\*((?:[^*\s][^*]*[^*\s]?)|(?:[^*\s]?[^*]*[^*\s]))\*\*)', text)
-        for match in bold:
-            match_text = match[1]
-            text = re.sub(match[0].translate(special_chars_map), f'*{match_text}*', text)
-
-        return text
-
     # disabled, waiting for threads, maybe will be enabled in the future
     # async def reply_blocks(self):
     #     if self.reply_is_bot is None:
@@ -356,8 +338,7 @@ class DiscordMessage:
             kwargs['blocks'] = blocks
             kwargs['text'] = text
         elif self.text:
-            text = replace_mentions(self.guild, self.text)
-            text = self.normalize_text(text)
+            text = self.normalize_text(self.text)
             kwargs['text'] = text
             kwargs['blocks'].append({
                 "type": "section",
@@ -414,10 +395,13 @@ class DiscordMessage:
         if self.attachment_urls:
             file_urls = [a for a in self.attachment_urls if a['url'].split('.')[-1] not in image_extensions]
             files = await async_file_downloader([a['url'] for a in file_urls])
-            for i, file in enumerate(files):
+            for attachment, file in zip(file_urls, files):
+                if file is None:
+                    continue
+
                 await team.app.client.files_upload(
                     file=file,
-                    filename=file_urls[i]['filename'],
+                    filename=attachment['filename'],
                     channels=slack_channel.id,
                     initial_comment=f'Uploaded by: {self.author_name}'
                 )
@@ -429,6 +413,9 @@ class SlackMember:
 
         self.team_id = data['team_id']
         self.team = slack.get_team(self.team_id)
+        # team whose members the member was added to, which can be a different team than self.team for members
+        # of other workspaces, the indexes of that team are kept up to date when the member changes
+        self.held_by: Optional[SlackTeam] = None
 
         self.id = data['id']
         # this value should only be used for the slack member info command
@@ -442,6 +429,15 @@ class SlackMember:
 
         self.initialize_data()
 
+    def __setattr__(self, key, value):
+        # keep the discord id index of the team holding the member up to date
+        if key == 'discord_member' and self.__dict__.get('held_by') is not None:
+            self.held_by.index_discord_member(self, self.__dict__.get(key), value)
+        # names used for resolving custom mentions need to be rebuilt when the name changes
+        if key == 'name' and self.__dict__.get('held_by') is not None:
+            self.held_by.clear_member_names()
+        self.__dict__[key] = value
+
     def initialize_data(self):
         """Initialise slack user in the database if needed."""
         data = db.slack_bridge.find_one(
@@ -536,6 +532,12 @@ class SlackChannel:
         self.slack.bot.loop.create_task(self.get_discord_channel())
         self.slack.bot.loop.create_task(self.set_slack_name())
 
+    def __setattr__(self, key, value):
+        # keep the discord id index of the team up to date
+        if key == 'discord_channel' and self.__dict__.get('team') is not None:
+            self.team.index_discord_channel(self, self.__dict__.get(key), value)
+        self.__dict__[key] = value
+
     def initialize_data(self):
         """Initialise data of the channel in the database if needed."""
         data = db.slack_bridge.find_one(
@@ -613,12 +615,14 @@ class SlackTeam:
         self.handler = AsyncSocketModeHandler(self.app, config.SLACK_APP_TOKEN)
         self.bot.loop.create_task(self.handler.start_async())
 
-        self.bot.add_listener(self.on_message, 'on_message')
-        self.bot.add_listener(self.on_raw_message_edit, 'on_raw_message_edit')
-        self.bot.add_listener(self.on_raw_message_delete, 'on_raw_message_delete')
-
-        self.channels: list[SlackChannel] = []
-        self.members: list[SlackMember] = []
+        # channels and members keyed by their slack id
+        self.channels: dict[str, SlackChannel] = {}
+        self.members: dict[str, SlackMember] = {}
+        # bridged channels and aliased members keyed by the id of their discord channel or member
+        self.discord_channels: dict[int, SlackChannel] = {}
+        self.discord_members: dict[int, SlackMember] = {}
+        # lowercase member names paired with the members, built when needed for resolving custom mentions
+        self._member_names: Optional[list[tuple[str, SlackMember]]] = None
 
         self.slack.bot.loop.create_task(self.get_team_info())
 
@@ -667,22 +671,104 @@ class SlackTeam:
         user_data = await self.app.client.users_info(user=user_id)
         slack_member = SlackMember(user_data['user'], self.slack)
         await slack_member.get_discord_member()
-        self.members[slack_member.team_id].append(slack_member)
+        self.add_member(slack_member)
         return slack_member
 
+    def add_member(self, member: SlackMember):
+        """Add SlackMember to the members of the team."""
+        if member.held_by is not None and member.held_by is not self and member.discord_member:
+            member.held_by.index_discord_member(member, member.discord_member, None)
+        member.held_by = self
+
+        self.members[member.id] = member
+        if member.discord_member:
+            self.discord_members[member.discord_member.id] = member
+        self.clear_member_names()
+
+    def add_channel(self, channel: SlackChannel):
+        """Add SlackChannel to the channels of the team."""
+        self.channels[channel.id] = channel
+        if channel.discord_channel:
+            self.discord_channels[channel.discord_channel.id] = channel
+            self.slack.discord_channels[channel.discord_channel.id] = channel
+
+    def remove_channel(self, channel: SlackChannel):
+        """Remove SlackChannel from the channels of the team."""
+        self.channels.pop(channel.id, None)
+        if channel.discord_channel:
+            self.index_discord_channel(channel, channel.discord_channel, None)
+
+    def index_discord_member(self, member: SlackMember, old: Optional[discord.Member], new: Optional[discord.Member]):
+        """Update the discord id index when the discord member of SlackMember changes."""
+        if old and self.discord_members.get(old.id) is member:
+            del self.discord_members[old.id]
+        if new:
+            self.discord_members[new.id] = member
+
+    def index_discord_channel(self, channel: SlackChannel, old: Optional[discord.TextChannel], new: Optional[discord.TextChannel]):
+        """Update the discord id indexes of the team and the bridge when the discord channel of SlackChannel changes."""
+        if old and self.discord_channels.get(old.id) is channel:
+            del self.discord_channels[old.id]
+            self.slack.discord_channels.pop(old.id, None)
+        if new:
+            self.discord_channels[new.id] = channel
+            self.slack.discord_channels[new.id] = channel
+
+    @property
+    def member_names(self) -> list[tuple[str, SlackMember]]:
+        """Lowercase names of the members of the team paired with the members."""
+        if self._member_names is None:
+            self._member_names = [(member.name.lower(), member) for member in self.members.values()]
+        return self._member_names
+
+    def clear_member_names(self):
+        """Clear member names so they're rebuilt on the next lookup."""
+        self._member_names = None
+
+    def find_members(self, name: str, candidates: list[tuple[str, SlackMember]] = None) -> list[tuple[str, SlackMember]]:
+        """Find members whose name contains the given name, from candidates if they're given."""
+        name = name.lower()
+        if candidates is None:
+            candidates = self.member_names
+        return [(member_name, member) for member_name, member in candidates if name in member_name]
+
+    def match_mention(self, text: str, position: int) -> tuple[Optional[SlackMember], int]:
+        """
+        Match the words following a custom mention at position in text to a member.
+        Words are added to the name for as long as some member's name contains it, every added word
+        only narrows down the members matched by the previous words.
+        Returns the member if a single one was matched and the position where the matched name ends.
+        """
+        name = ''
+        candidates = None
+        end = position
+        while word := MENTION_WORD_PATTERN.match(text, end):
+            matches = self.find_members(f'{name} {word[1]}'.strip(), candidates)
+            if not matches:
+                break
+
+            name = f'{name} {word[1]}'.strip()
+            candidates = matches
+            end = word.end()
+
+        if candidates and len(candidates) == 1:
+            return candidates[0][1], end
+
+        return None, position
+
     def get_user(self, slack_id: str = None, *, discord_id: int = None) -> Optional[SlackMember]:
         """Get SlackMember via slack id or discord id."""
-        for member in self.members:
-            if (slack_id is not None and member.id == slack_id) or \
-               (discord_id is not None and member.discord_member and member.discord_member.id == discord_id):
-                return member
+        if slack_id is not None and slack_id in self.members:
+            return self.members[slack_id]
+        if discord_id is not None:
+            return self.discord_members.get(discord_id)
 
     def get_channel(self, slack_id: str = None, *, discord_id: int = None) -> Optional[SlackChannel]:
         """Get SlackChannel via slack id or discord id."""
-        for channel in self.channels:
-            if (slack_id is not None and channel.id == slack_id) or \
-               (discord_id is not None and channel.discord_channel and channel.discord_channel.id == discord_id):
-                return channel
+        if slack_id is not None and slack_id in self.channels:
+            return self.channels[slack_id]
+        if discord_id is not None:
+            return self.discord_channels.get(discord_id)
 
     async def cache_messages(self):
         """Cache messages in the database."""
@@ -716,7 +802,7 @@ class SlackTeam:
                 channel_id=channel_data['id'],
                 slack=self.slack,
             )
-            self.channels.append(channel)
+            self.add_channel(channel)
 
         self.channels_cached.set()
         self.slack.bot.logger.debug(f'{len(channels)} Slack channels cached for team [{self.team_id}]')
@@ -733,7 +819,7 @@ class SlackTeam:
                 slack=self.slack,
             )
             self.slack.bot.loop.create_task(member.get_discord_member())
-            self.members.append(member)
+            self.add_member(member)
 
         self.members_cached.set()
         self.slack.bot.logger.debug(f'{len(members)} Slack member cached for team [{self.team_id}]')
@@ -814,7 +900,7 @@ class SlackTeam:
                 {'team_id': self.team_id},
                 {'$pull': {'bridges': {'slack_channel_id': channel_id}}}
             )
-            self.channels.remove(channel)
+            self.remove_channel(channel)
 
     async def slack_member_joined(self, body: dict):
         event = body['event']
@@ -822,11 +908,11 @@ class SlackTeam:
         user_id = event['user']
         if user_id == self.bot_id:
             channel = SlackChannel(self, channel_id, self.slack)
-            self.channels.append(channel)
+            self.add_channel(channel)
         else:
             user_data = await self.app.client.users_info(user=user_id)
             member = SlackMember(user_data['user'], self.slack)
-            self.members.append(member)
+            self.add_member(member)
 
     async def handle_delete_message(self, body: dict):
         event = body['event']
@@ -889,12 +975,54 @@ class SlackTeam:
             message.send_to_discord()
         )
 
+
+class Slack:
+    def __init__(self, bot):
+        self.bot = bot
+        self.logger = self.bot.logger
+
+        self.teams: list[SlackTeam] = []
+        # bridged channels of all the teams keyed by the id of their discord channel
+        self.discord_channels: dict[int, SlackChannel] = {}
+        self.cache_teams()
+
+        # one set of listeners for all the teams, events are routed to the team of the bridged channel
+        self.bot.add_listener(self.on_message, 'on_message')
+        self.bot.add_listener(self.on_raw_message_edit, 'on_raw_message_edit')
+        self.bot.add_listener(self.on_raw_message_delete, 'on_raw_message_delete')
+
+    def get_team(self, team_id: str) -> Optional[SlackTeam]:
+        return next(filter(lambda team: team.team_id == team_id, self.teams), None)
+
+    def cache_teams(self):
+        teams = db.slack_bridge.find({})
+        for team_data in teams:
+            team = SlackTeam(team_data, self)
+            self.teams.append(team)
+
+    def get_user(self, slack_id: str = None, *, discord_id: int = None) -> Optional[SlackMember]:
+        """Get SlackMember via slack id or discord id."""
+        for team in self.teams:
+            member = team.get_user(slack_id, discord_id=discord_id)
+            if member:
+                return member
+
+    def get_channel(self, slack_id: str = None, *, discord_id: int = None) -> Optional[SlackChannel]:
+        """Get SlackChannel via slack id or discord id."""
+        if discord_id is not None and discord_id in self.discord_channels:
+            return self.discord_channels[discord_id]
+
+        for team in self.teams:
+            channel = team.get_channel(slack_id)
+            if channel:
+                return channel
+
     # Discord events
 
     async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
         channel_id = payload.channel_id
 
-        slack_channel = self.get_channel(discord_id=channel_id)
+        slack_channel = self.discord_channels.get(channel_id)
         if not slack_channel:
             return
 
@@ -919,7 +1047,7 @@ class SlackTeam:
 
         channel_id = payload.channel_id
 
-        slack_channel = self.get_channel(discord_id=channel_id)
+        slack_channel = self.discord_channels.get(channel_id)
         if not slack_channel:
             return
 
@@ -940,47 +1068,12 @@ class SlackTeam:
 
     async def on_message(self, message: discord.Message):
         """Function call on on_message event, used for identifying discord bridge channel and forwarding the messages to slack."""
-        # ignore webhook messages and pms
-        if not message.guild or message.webhook_id:
-            return
-
-        slack_channel = self.get_channel(discord_id=message.channel.id)
-        if not slack_channel:
+        # ignore webhook messages, pms and channels that aren't bridged
+        if message.channel.id not in self.discord_channels or message.webhook_id:
             return
 
-        await self.messages_cached.wait()
+        slack_channel = self.discord_channels[message.channel.id]
+        await slack_channel.team.messages_cached.wait()
 
-        discord_message = DiscordMessage(message, self.slack)
+        discord_message = DiscordMessage(message, self)
         await discord_message.send_to_slack()
-
-
-class Slack:
-    def __init__(self, bot):
-        self.bot = bot
-        self.logger = self.bot.logger
-
-        self.teams: list[SlackTeam] = []
-        self.cache_teams()
-
-    def get_team(self, team_id: str) -> Optional[SlackTeam]:
-        return next(filter(lambda team: team.team_id == team_id, self.teams), None)
-
-    def cache_teams(self):
-        teams = db.slack_bridge.find({})
-        for team_data in teams:
-            team = SlackTeam(team_data, self)
-            self.teams.append(team)
-
-    def get_user(self, slack_id: str = None, *, discord_id: int = None) -> Optional[SlackMember]:
-        """Get SlackMember via slack id or discord id."""
-        for team in self.teams:
-            member = team.get_user(slack_id, discord_id=discord_id)
-            if member:
-                return member
-
-    def get_channel(self, slack_id: str = None, *, discord_id: int = None) -> Optional[SlackChannel]:
-        """Get SlackChannel via slack id or discord id."""
-        for team in self.teams:
-            channel = team.get_channel(slack_id, discord_id=discord_id)
-            if channel:
-                return channel
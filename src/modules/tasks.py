@@ -1,7 +1,7 @@
 import asyncio
 from modules import database, slack_bridge
 
-db = database.get_connection()
+async_db = database.get_async_connection()
 
 
 class Tasks:
@@ -17,7 +17,7 @@ class Tasks:
         self.bot.logger.info('Task module has started listening to tasks.')
         while True:
             await asyncio.sleep(1.0)
-            tasks = db.tasks.find({})
+            tasks = await async_db.tasks.find({}).to_list()
             if not tasks:
                 continue
 
@@ -33,11 +33,11 @@ class Tasks:
                 except Exception as e:
                     self.bot.logger.error(f'Error with task function [{function_name}] {e}')
 
-                db.tasks.delete_one(task)
+                await async_db.tasks.delete_one(task)
 
     async def update_slack_team(self, *, team_id: str):
         slack = self.bot.slack_bridge
-        team_data = db.slack_bridge.find_one({'team_id': team_id})
+        team_data = await async_db.slack_bridge.find_one({'team_id': team_id})
         team = slack.get_team(team_id)
         if not team:
             team = slack_bridge.SlackTeam(team_data, slack)
@@ -12,7 +12,6 @@ from cachetools.ttl import TTLCache
 from discord import ButtonStyle, Interaction, Member, Message, Thread, threads
 from discord.channel import TextChannel
 from discord.ext.commands import Context
-from discord.ext.tasks import loop
 from discord.ui import Button, View, button
 from pymongo.collection import Collection
 
@@ -138,6 +137,7 @@ class RenamePoll(View):
         self._new_title = new_name
         self._settings = module.get_settings()
         self._internal_clock = self._settings["renamepoll"]["poll_duration"]
+        self._countdown = None
         self._voting_threshold = self._settings["renamepoll"]["aye_vote_threshold"]
         self._ctx = ctx
         self._yes_votes = []
@@ -174,10 +174,13 @@ class RenamePoll(View):
             view=self,
             send=True,
         )
-        self.countdown.start()
+        self._countdown = self._module._bot.countdowns.start(
+            self._internal_clock, self.countdown
+        )
+
+    async def countdown(self, remaining: int):
+        """Called by the countdown of the poll when the poll has ended."""
 
-    @loop(seconds=1)
-    async def countdown(self):
         def delete_from_dict():
             del self._module._renamepolls[self._thread.id]
 
@@ -222,21 +225,18 @@ class RenamePoll(View):
             )
             delete_from_dict()
 
-        self._internal_clock -= 1
-        if self._internal_clock <= 0:
-            self.countdown.stop()
-            if len(self._yes_votes) > len(self._no_votes):
-                if len(self._yes_votes) >= self._voting_threshold:
-                    await succeeded()
-                else:
-                    await failed()
+        if len(self._yes_votes) > len(self._no_votes):
+            if len(self._yes_votes) >= self._voting_threshold:
+                await succeeded()
             else:
-                if len(self._yes_votes) > self._voting_threshold and len(
-                    self._yes_votes
-                ) > len(self._no_votes):
-                    await succeeded()
-                else:
-                    await failed()
+                await failed()
+        else:
+            if len(self._yes_votes) > self._voting_threshold and len(
+                self._yes_votes
+            ) > len(self._no_votes):
+                await succeeded()
+            else:
+                await failed()
 
 
 class ThreadPoll(View):
@@ -245,6 +245,7 @@ class ThreadPoll(View):
         self._module = module
         self._settings = module.get_settings()
         self._internal_clock = self._settings["threadpoll"]["poll_duration"]
+        self._countdown = None
         self._voting_threshold = self._settings["threadpoll"]["aye_vote_threshold"]
         self._ctx = ctx
         self._replying_message = replying_message
@@ -253,7 +254,10 @@ class ThreadPoll(View):
         self._no_votes = []
 
     def _get_internal_clock(self):
-        return self._internal_clock
+        if self._countdown is None:
+            return self._internal_clock
+
+        return math.ceil(self._countdown.remaining)
 
     @button(label="Yes", style=ButtonStyle.green)
     async def yes_button_callback(self, button: Button, interaction: Interaction):
@@ -289,10 +293,13 @@ class ThreadPoll(View):
             view=self,
             send=True,
         )
-        self.countdown.start()
+        self._countdown = self._module._bot.countdowns.start(
+            self._internal_clock, self.countdown
+        )
+
+    async def countdown(self, remaining: int):
+        """Called by the countdown of the poll when the poll has ended."""
 
-    @loop(seconds=1)
-    async def countdown(self):
         def delete_from_dict():
             del self._module._threadpolls[self._replying_message.id]
 
@@ -345,22 +352,18 @@ class ThreadPoll(View):
             )
             delete_from_dict()
 
-        self._internal_clock -= 1
-        if self._internal_clock <= 0:
-            self.countdown.stop()
-            poll_embed_messages = self._settings["messages"]["threadpoll"]["poll_embed"]
-            if len(self._yes_votes) > len(self._no_votes):
-                if len(self._yes_votes) >= self._voting_threshold:
-                    await succeeded()
-                else:
-                    await failed()
+        if len(self._yes_votes) > len(self._no_votes):
+            if len(self._yes_votes) >= self._voting_threshold:
+                await succeeded()
             else:
-                if len(self._yes_votes) > self._voting_threshold and len(
-                    self._yes_votes
-                ) > len(self._no_votes):
-                    await succeeded()
-                else:
-                    await failed()
+                await failed()
+        else:
+            if len(self._yes_votes) > self._voting_threshold and len(
+                self._yes_votes
+            ) > len(self._no_votes):
+                await succeeded()
+            else:
+                await failed()
 
 
 class ThreadingModule:
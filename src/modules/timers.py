@@ -1,12 +1,15 @@
 import asyncio
+import heapq
+import itertools
 import time
+from typing import List
 
 from bson import ObjectId
 from discord.ext.commands import Bot
 
 from modules import database
 
-db = database.get_connection()
+async_db = database.get_async_connection()
 
 
 class Loop:
@@ -80,19 +83,57 @@ class Timers:
     Class for implementing functions with timed calls.
     Functions will be called by dispatching bot events by the name `on_{event}_timer_over`.
 
+    Timers are kept in the database and only the timers that expire in the next :attr:`WINDOW` seconds are kept in
+    memory, in a heap ordered by expiry time. A single scheduler task dispatches the timers that are due and
+    pages in the next window of timers from the database when the current window runs out.
+
     Attributes
     ---------------
     bot: :class:`bot.TLDR`
         The discord bot.
+    heap: List[Tuple[:class:`int`, :class:`int`, :class:`dict`]]
+        (expires, counter, timer) tuples of the timers in the current window.
+    scheduled: Set[:class:`str`]
+        Ids of the timers in :attr:`heap`.
+    window_end: :class:`int`
+        Time until which all the timers have been loaded into :attr:`heap`.
+    dispatched: :class:`int`
+        Number of timers that have been dispatched.
+    total_lag: :class:`float`
+        Sum of the seconds between when timers were meant to expire and when they were dispatched.
+    max_lag: :class:`float`
+        The longest time in seconds a timer has been dispatched late.
     """
 
+    # how many seconds of timers are loaded into memory at a time
+    WINDOW = 60 * 60
+    # how many timer events are dispatched before giving other tasks a chance to run
+    DISPATCH_BATCH_SIZE = 50
+    # seconds the scheduler waits before retrying after an error, doubled for every consecutive error
+    RETRY_DELAY = 5
+    MAX_RETRY_DELAY = 5 * 60
+    # seconds after which a claim on timers is stale and the timers can be claimed again
+    CLAIM_TIMEOUT = 60
+
     def __init__(self, bot):
         self.bot = bot
+        self.heap = []
+        self.scheduled = set()
+        self.window_end = 0
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._scheduler_task = None
+        self.dispatched = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
         self.bot.add_listener(self.on_ready, "on_ready")
         self.bot.logger.info("Timers module has been initiated")
 
     async def on_ready(self):
-        await self.run_old()
+        # on_ready is called again on reconnects, the scheduler only needs to be started once
+        if self._scheduler_task is None:
+            await self.bot.left_check.wait()
+            self._scheduler_task = asyncio.create_task(self.run_scheduler())
 
     async def run_loop(self, loop: Loop):
         await loop.started.wait()
@@ -104,33 +145,164 @@ class Timers:
             await asyncio.sleep(loop.time)
             await loop.coro()
 
-    async def run_old(self) -> None:
-        """Runs all the timers that were cut short, that are still in the database."""
-        await self.bot.left_check.wait()
-
-        timers = db.timers.find({})
-        self.bot.logger.info(f"Running {timers.count()} old timers.")
-
-        for timer in timers:
-            asyncio.create_task(self.run(timer))
-
-    async def run(self, timer) -> None:
+    def schedule(self, timer: dict) -> None:
         """
-        Runs a timer, by sleeping until the timer expires.
+        Add timer to :attr:`heap` if it expires in the current window, otherwise it will be paged in later.
 
         Parameters
         ----------------
         timer: :class:`dict`
             Timer dictionary from :func:`create`
         """
-        now = round(time.time())
+        timer_id = str(timer["_id"])
+        if timer["expires"] >= self.window_end or timer_id in self.scheduled:
+            return
 
-        if timer["expires"] > now:
-            await asyncio.sleep(timer["expires"] - now)
+        # if timer expires before the next timer in the heap, the scheduler needs to wake up earlier
+        if not self.heap or timer["expires"] < self.heap[0][0]:
+            self._wakeup.set()
+
+        self.scheduled.add(timer_id)
+        heapq.heappush(self.heap, (timer["expires"], next(self._counter), timer))
+
+    async def page_in(self) -> None:
+        """Load the timers that expire before the end of the next window into :attr:`heap`."""
+        # window is moved before the query, so timers created during the query are scheduled by create
+        previous_window_end = self.window_end
+        self.window_end = round(time.time()) + self.WINDOW
+        try:
+            timers = (
+                await async_db.timers.find({"expires": {"$lt": self.window_end}})
+                .sort("expires", 1)
+                .to_list()
+            )
+        except Exception:
+            # window is moved back, so the page in is retried on the next pass
+            self.window_end = previous_window_end
+            raise
+
+        for timer in timers:
+            self.schedule(timer)
 
-        self.call_event(timer)
+        self.bot.logger.debug(
+            f"Paged in {len(timers)} timers, {len(self.heap)} timers scheduled."
+        )
 
-    def call_event(self, timer) -> None:
+    @property
+    def average_lag(self) -> float:
+        """Average seconds between when timers were meant to expire and when they were dispatched."""
+        return self.total_lag / self.dispatched if self.dispatched else 0.0
+
+    async def run_scheduler(self) -> None:
+        """
+        Dispatches timers as they expire, timers that expired while the bot was offline are dispatched first.
+        Errors are reported and the scheduler retries after a delay that doubles with every consecutive error.
+        """
+        claims_cleared = False
+        retry_delay = self.RETRY_DELAY
+        while True:
+            try:
+                if not claims_cleared:
+                    # claims left behind if the bot stopped between claiming and deleting timers
+                    await async_db.timers.update_many(
+                        {"claimed": {"$exists": True}},
+                        {"$unset": {"claimed": "", "claimed_at": ""}},
+                    )
+                    claims_cleared = True
+
+                await self.scheduler_pass()
+                retry_delay = self.RETRY_DELAY
+            except Exception as e:
+                await self.bot.on_event_error(e, "run_scheduler")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.MAX_RETRY_DELAY)
+
+    async def scheduler_pass(self) -> None:
+        """Dispatch the timers that are due and sleep until the next one expires."""
+        now = time.time()
+        if now >= self.window_end:
+            await self.page_in()
+
+        due_timers = []
+        while self.heap and self.heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self.heap)
+            self.scheduled.discard(str(timer["_id"]))
+            due_timers.append(timer)
+
+        if due_timers:
+            try:
+                await self.call_events(due_timers)
+            except Exception as e:
+                await self.bot.on_event_error(e, "run_scheduler")
+                # retried once their claims, if they were claimed, have gone stale,
+                # timers that were deleted before the error are skipped by the retry
+                retry_at = time.time() + self.CLAIM_TIMEOUT + 1
+                for timer in due_timers:
+                    self.scheduled.add(str(timer["_id"]))
+                    heapq.heappush(self.heap, (retry_at, next(self._counter), timer))
+
+        # sleep until the next timer expires, the window runs out or a timer that expires sooner is created
+        next_wakeup = self.window_end
+        if self.heap:
+            next_wakeup = min(self.heap[0][0], next_wakeup)
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(
+                self._wakeup.wait(), timeout=max(next_wakeup - time.time(), 0)
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    async def call_events(self, timers: List[dict]) -> None:
+        """
+        Call the events of timers that have expired.
+        Events will be dispatched with the name `on_{event}_timer_over`.
+
+        Timers are claimed and deleted from the database in bulk, timers that have been deleted in the meantime
+        or claimed by someone else are skipped. Claims older than :attr:`CLAIM_TIMEOUT` seconds are stale,
+        the claimer failed before deleting the timers, and can be claimed again.
+
+        Parameters
+        ----------------
+        timers: List[:class:`dict`]
+            Timer dictionaries from :func:`create`
+        """
+        claim = ObjectId()
+        claimed_at = time.time()
+        await async_db.timers.update_many(
+            {
+                "_id": {"$in": [ObjectId(timer["_id"]) for timer in timers]},
+                "$or": [
+                    {"claimed": {"$exists": False}},
+                    {"claimed_at": {"$lt": claimed_at - self.CLAIM_TIMEOUT}},
+                ],
+            },
+            {"$set": {"claimed": claim, "claimed_at": claimed_at}},
+        )
+        claimed_timers = await async_db.timers.find({"claimed": claim}).to_list()
+        await async_db.timers.delete_many({"claimed": claim})
+
+        now = time.time()
+        for i, timer in enumerate(claimed_timers):
+            del timer["claimed"]
+            timer.pop("claimed_at", None)
+            lag = max(now - timer["expires"], 0)
+            self.dispatched += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+            self.bot.dispatch(f'{timer["event"]}_timer_over', timer)
+            # let the event handlers run before dispatching more events
+            if (i + 1) % self.DISPATCH_BATCH_SIZE == 0:
+                await asyncio.sleep(0)
+
+        if claimed_timers:
+            self.bot.logger.debug(
+                f"Dispatched {len(claimed_timers)} timers. "
+                f"Scheduling lag - average: {self.average_lag:.3f}s max: {self.max_lag:.3f}s"
+            )
+
+    async def call_event(self, timer) -> None:
         """
         Call timer event.
         Event will be dispatched with the name `on_{event}_timer_over`.
@@ -140,14 +312,9 @@ class Timers:
         timer: :class:`dict`
             Timer dictionary from :func:`create`
         """
-        timer = db.timers.find_one({"_id": ObjectId(timer["_id"])})
-        if not timer:
-            return
-
-        db.timers.delete_one({"_id": ObjectId(timer["_id"])})
-        self.bot.dispatch(f'{timer["event"]}_timer_over', timer)
+        await self.call_events([timer])
 
-    def create(self, *, guild_id: int, expires: int, event: str, extras: dict):
+    async def create(self, *, guild_id: int, expires: int, event: str, extras: dict):
         """
         Create a new timer.
 
@@ -169,6 +336,158 @@ class Timers:
             "extras": extras,
         }
 
-        result = db.timers.insert_one(timer_dict)
+        result = await async_db.timers.insert_one(timer_dict)
         timer_dict["_id"] = str(result.inserted_id)
-        asyncio.create_task(self.run(timer_dict))
+        self.schedule(timer_dict)
+
+    async def create_many(self, timers: List[dict]):
+        """
+        Create multiple timers with one insert.
+
+        Parameters
+        ----------------
+        timers: List[:class:`dict`]
+            Timer dictionaries with the same keys as the arguments of :func:`create`.
+        """
+        if not timers:
+            return
+
+        result = await async_db.timers.insert_many(timers)
+        for timer_dict, inserted_id in zip(timers, result.inserted_ids):
+            timer_dict["_id"] = str(inserted_id)
+            self.schedule(timer_dict)
+
+
+class Countdown:
+    """
+    A countdown started with :func:`Countdowns.start`.
+
+    Attributes
+    ---------------
+    deadline: :class:`float`
+        Time when the countdown ends.
+    callback: Callable[[:class:`int`], Awaitable]
+        Coroutine function called with the seconds remaining at every threshold and with 0 when the countdown ends.
+    thresholds: List[:class:`int`]
+        Seconds remaining at which callback still needs to be called, in descending order.
+    cancelled: :class:`bool`
+        True if the countdown has been cancelled.
+    """
+
+    def __init__(self, deadline: float, callback, thresholds: List[int]):
+        self.deadline = deadline
+        self.callback = callback
+        self.thresholds = thresholds
+        self.cancelled = False
+
+    @property
+    def remaining(self) -> float:
+        """Seconds until the countdown ends."""
+        return max(self.deadline - time.time(), 0)
+
+    def cancel(self):
+        """Cancel the countdown, callback won't be called anymore."""
+        self.cancelled = True
+
+
+class Countdowns:
+    """
+    Scheduler for countdowns that need to do something at certain points before they end,
+    like polls and captcha channels.
+
+    Instead of every countdown ticking once a second, countdowns are kept in a heap ordered by the time
+    of their next threshold and a single task sleeps until the next one is due.
+
+    Attributes
+    ---------------
+    bot: :class:`bot.TLDR`
+        The discord bot.
+    heap: List[Tuple[:class:`float`, :class:`int`, :class:`Countdown`, :class:`int`]]
+        (due, counter, countdown, seconds remaining) tuples of the next threshold of every countdown.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.heap = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._scheduler_task = None
+        # the event loop only keeps weak references to tasks, running callbacks are kept here until they're done
+        self._callback_tasks = set()
+
+    def start(self, seconds: float, callback, thresholds: List[int] = ()) -> Countdown:
+        """
+        Start a countdown.
+
+        Parameters
+        ----------------
+        seconds: :class:`float`
+            Seconds until the countdown ends.
+        callback: Callable[[:class:`int`], Awaitable]
+            Coroutine function that will be called with the seconds remaining at every threshold
+            and with 0 when the countdown ends.
+        thresholds: List[:class:`int`]
+            Seconds remaining at which callback will be called, thresholds that have already passed are skipped.
+
+        Returns
+        -------
+        :class:`Countdown`
+            The countdown, which can be cancelled.
+        """
+        countdown = Countdown(
+            time.time() + seconds,
+            callback,
+            sorted({t for t in thresholds if 0 < t < seconds}, reverse=True),
+        )
+        self.schedule(countdown)
+        return countdown
+
+    def schedule(self, countdown: Countdown) -> None:
+        """Add the next threshold of countdown to :attr:`heap`."""
+        remaining = countdown.thresholds.pop(0) if countdown.thresholds else 0
+        due = countdown.deadline - remaining
+
+        # if the threshold is due before the next one in the heap, the scheduler needs to wake up earlier
+        if not self.heap or due < self.heap[0][0]:
+            self._wakeup.set()
+
+        heapq.heappush(self.heap, (due, next(self._counter), countdown, remaining))
+        if self._scheduler_task is None:
+            self._scheduler_task = asyncio.get_event_loop().create_task(
+                self.run_scheduler()
+            )
+
+    async def call(self, countdown: Countdown, remaining: int) -> None:
+        """Call the callback of countdown and schedule its next threshold."""
+        try:
+            await countdown.callback(remaining)
+        except Exception as e:
+            await self.bot.on_event_error(e, countdown.callback.__name__, loop=True)
+
+        if remaining > 0 and not countdown.cancelled:
+            self.schedule(countdown)
+
+    def close(self) -> None:
+        """Stop the scheduler, countdowns that haven't ended won't be called anymore."""
+        # the cancelled task is kept, so schedule doesn't start a new one during shutdown
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+
+    async def run_scheduler(self) -> None:
+        """Calls the countdown callbacks as their thresholds are reached."""
+        while True:
+            now = time.time()
+            while self.heap and self.heap[0][0] <= now:
+                _, _, countdown, remaining = heapq.heappop(self.heap)
+                if not countdown.cancelled:
+                    # callbacks of different countdowns can run at the same time
+                    task = asyncio.create_task(self.call(countdown, remaining))
+                    self._callback_tasks.add(task)
+                    task.add_done_callback(self._callback_tasks.discard)
+
+            self._wakeup.clear()
+            timeout = max(self.heap[0][0] - time.time(), 0) if self.heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -5,10 +5,11 @@ import re
 import sys
 from io import BytesIO
 from logging import handlers
-from typing import Optional, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
+import aiohttp
+import config
 import discord
-import requests
 from discord.ext.commands import Context, Converter
 
 from modules import commands, database, embed_maker
@@ -221,6 +222,226 @@ class ParseArgs(Converter, dict):
             logger.exception(f"Error in ParseArgs. Argument: {argument} | Error: {e}")
 
 
+class PatternMatcher:
+    """
+    Matches content against a list of items that each have a regex pattern, with precompiled patterns.
+
+    The patterns are combined into a single regex where every alternative looks ahead for its pattern from the start of
+    the content, so the first item that matches anywhere in the content is returned, the same as trying
+    the patterns one by one. Patterns that can't be combined, like ones with backreferences, are tried one by one.
+
+    Attributes
+    ---------------
+    items: List[:class:`dict`]
+        The items with valid patterns.
+    patterns: List[:class:`re.Pattern`]
+        Compiled patterns of :attr:`items`.
+    combined: Optional[:class:`re.Pattern`]
+        All the patterns combined into one, `None` if they can't be combined.
+    """
+
+    # group numbers change when patterns are combined, so patterns with backreferences can't be combined
+    BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+    def __init__(
+        self, items: List[dict], pattern_key: str, *, flags: int = 0, logger=None
+    ):
+        self.items = []
+        self.patterns = []
+        for item in items:
+            try:
+                self.patterns.append(re.compile(item[pattern_key], flags))
+            except re.error:
+                if logger:
+                    logger.warning(f"Invalid pattern: {item[pattern_key]}")
+                continue
+
+            self.items.append(item)
+
+        self.combined = None
+        if self.patterns and not any(
+            self.BACKREFERENCE.search(p.pattern) for p in self.patterns
+        ):
+            try:
+                self.combined = re.compile(
+                    "|".join(
+                        rf"(?=[\s\S]*?(?:{pattern.pattern}))(?P<p{i}>)"
+                        for i, pattern in enumerate(self.patterns)
+                    ),
+                    flags,
+                )
+            except re.error:
+                self.combined = None
+
+    def match(self, content: str) -> Optional[dict]:
+        """
+        Match content against the patterns.
+
+        Parameters
+        ----------------
+        content: :class:`str`
+            The content.
+
+        Returns
+        -------
+        Optional[:class:`dict`]
+            The first item that matches content or `None` if none do.
+        """
+        if self.combined is not None:
+            match = self.combined.match(content)
+            if match is None:
+                return None
+
+            # the empty group after the matching alternative is always the last group to match
+            return self.items[int(match.lastgroup[1:])]
+
+        for item, pattern in zip(self.items, self.patterns):
+            if pattern.search(content) is not None:
+                return item
+
+
+class MemberIndex:
+    """
+    Name index of the members of a guild, used to look up members by their name without scanning all of the members.
+
+    Members are indexed by their lowercase name, display name and name with discriminator for exact matches and by
+    the trigrams of their name with discriminator and display name for substring matches.
+    The index is kept up to date by the member events in :class:`cogs.events.Events`, it's rebuilt if the
+    member count of the guild doesn't match the index, in case members have been chunked or an event has been missed.
+
+    Attributes
+    ---------------
+    guild: :class:`discord.Guild`
+        The guild.
+    names: Dict[:class:`int`, Tuple[:class:`str`, :class:`str`, :class:`str`]]
+        Lowercase name, display name and name with discriminator of the indexed members keyed by their ids.
+    exact: Dict[:class:`str`, Set[:class:`int`]]
+        IDs of members keyed by their lowercase names.
+    trigrams: Dict[:class:`str`, Set[:class:`int`]]
+        IDs of members keyed by the trigrams in their lowercase display name and name with discriminator.
+    """
+
+    def __init__(self, guild: discord.Guild):
+        self.guild = guild
+        self.names = {}
+        self.exact = {}
+        self.trigrams = {}
+        self.build()
+
+    @staticmethod
+    def get_trigrams(string: str) -> set:
+        """Get all the trigrams of a string."""
+        return {string[i : i + 3] for i in range(len(string) - 2)}
+
+    def build(self):
+        """Index all the members of the guild."""
+        self.names = {}
+        self.exact = {}
+        self.trigrams = {}
+        for member in self.guild.members:
+            self.add(member)
+
+    def add(self, member: discord.Member):
+        """Add a member to the index, replacing their old names if they're already indexed."""
+        if member.id in self.names:
+            self.remove(member.id)
+
+        names = (member.name.lower(), member.display_name.lower(), str(member).lower())
+        self.names[member.id] = names
+        for name in set(names):
+            self.exact.setdefault(name, set()).add(member.id)
+
+        for trigram in self.get_trigrams(names[1]) | self.get_trigrams(names[2]):
+            self.trigrams.setdefault(trigram, set()).add(member.id)
+
+    def remove(self, member_id: int):
+        """Remove a member from the index."""
+        names = self.names.pop(member_id, None)
+        if names is None:
+            return
+
+        for name in set(names):
+            self._discard(self.exact, name, member_id)
+
+        for trigram in self.get_trigrams(names[1]) | self.get_trigrams(names[2]):
+            self._discard(self.trigrams, trigram, member_id)
+
+    @staticmethod
+    def _discard(index: dict, key: str, member_id: int):
+        member_ids = index.get(key)
+        if member_ids is None:
+            return
+
+        member_ids.discard(member_id)
+        if not member_ids:
+            del index[key]
+
+    def _members(self, member_ids) -> List[discord.Member]:
+        members = [self.guild.get_member(member_id) for member_id in member_ids]
+        return sorted(filter(None, members), key=lambda m: m.id)
+
+    def find(self, source: str) -> List[discord.Member]:
+        """
+        Find members by name.
+
+        Parameters
+        ----------------
+        source: :class:`str`
+            Name, display name or name with discriminator of the member, needs to be at least 3 characters long.
+
+        Returns
+        -------
+        List[:class:`discord.Member`]
+            Members whose name, display name or name with discriminator matches source exactly,
+            if there are none, members whose display name or name with discriminator contains source.
+        """
+        source = source.lower()
+        if source in self.exact:
+            return self._members(self.exact[source])
+
+        trigrams = self.get_trigrams(source)
+        if not trigrams:
+            return []
+
+        # intersect the smallest sets first, candidates still need to be checked as trigrams can be in any order
+        member_id_sets = sorted(
+            (self.trigrams.get(trigram, set()) for trigram in trigrams), key=len
+        )
+        candidates = set.intersection(*member_id_sets)
+        return self._members(
+            member_id
+            for member_id in candidates
+            if source in self.names[member_id][1] or source in self.names[member_id][2]
+        )
+
+
+member_indexes = {}
+
+
+def get_member_index(guild: discord.Guild) -> MemberIndex:
+    """
+    Get the name index of a guild, building it if needed.
+
+    Parameters
+    ----------------
+    guild: :class:`discord.Guild`
+        The guild.
+
+    Returns
+    -------
+    :class:`MemberIndex`
+        The member index of the guild.
+    """
+    member_index = member_indexes.get(guild.id)
+    if member_index is None:
+        member_index = member_indexes[guild.id] = MemberIndex(guild)
+    elif len(member_index.names) != len(guild.members):
+        member_index.guild = guild
+        member_index.build()
+
+    return member_index
+
+
 def id_match(identifier: str, extra: str) -> re.Match:
     """
     Matches identifier to discord ID regex and matches given extra regex to identifier
@@ -474,37 +695,10 @@ async def get_guild_member(
     if len(source) < 3:
         return
 
-    # checks first for a direct name match
-    members = list(
-        filter(
-            lambda m: m.name.lower() == source.lower()
-            or m.display_name.lower() == source.lower()  # username match
-            or str(  # nickname match (if user doesnt have a nickname, it'll match the name again)
-                m
-            ).lower()
-            == source.lower(),  # name and discriminator match
-            guild.members,
-        )
-    )
-
-    # if can't find direct name match, check for a match with regex
+    # checks first for a direct name match, then for a name that contains source
+    members = get_member_index(guild).find(source)
     if not members:
-        # checks for regex match
-        special_chars_map = {i: "\\" + chr(i) for i in b"()[]{}?*+-|^$\\.&~#"}
-        safe_source = source.translate(special_chars_map)
-
-        members = list(
-            filter(
-                lambda m: re.findall(fr"({safe_source.lower()})", str(m).lower())
-                or re.findall(  # regex match name and discriminator
-                    fr"({safe_source.lower()})", m.display_name.lower()
-                ),  # regex match nickname
-                guild.members,
-            )
-        )
-
-        if not members:
-            return
+        return
 
     # only one match, return member
     if len(members) == 1:
@@ -595,42 +789,15 @@ async def get_member(
             else None
         )
 
-    # checks first for a direct name match
-    members = list(
-        filter(
-            lambda m: m.name.lower() == source.lower()
-            or m.display_name.lower() == source.lower()  # username match
-            or str(  # nickname match (if user doesnt have a nickname, it'll match the name again)
-                m
-            ).lower()
-            == source.lower(),  # name and discriminator match
-            ctx.guild.members,
-        )
-    )
-
-    # if can't find direct name match, check for a match with regex
+    # checks first for a direct name match, then for a name that contains source
+    members = get_member_index(ctx.guild).find(source)
     if not members:
-        # checks for regex match
-        special_chars_map = {i: "\\" + chr(i) for i in b"()[]{}?*+-|^$\\.&~#"}
-        safe_source = source.translate(special_chars_map)
-
-        members = list(
-            filter(
-                lambda m: re.findall(fr"({safe_source.lower()})", str(m).lower())
-                or re.findall(  # regex match name and discriminator
-                    fr"({safe_source.lower()})", m.display_name.lower()
-                ),  # regex match nickname
-                ctx.guild.members,
-            )
+        return (
+            await embed_maker.error(ctx, f"No members found by the name `{source}`")
+            if return_message
+            else None
         )
 
-        if not members:
-            return (
-                await embed_maker.error(ctx, f"No members found by the name `{source}`")
-                if return_message
-                else None
-            )
-
     # too many matches
     if len(members) > 10 and multi:
         return (
@@ -789,20 +956,110 @@ def embed_message_to_text(embed):
     return text
 
 
-async def async_file_downloader(urls: list[str], headers: dict = None) -> list[BytesIO]:
-    async def fetch_file(index: int, files: list, url: str):
-        response = requests.get(url, headers=headers)
-        file = BytesIO(response.content)
-        file.seek(0)
-        files[index] = file
+# shared session and concurrency limit of async_file_downloader, created when the first file is downloaded
+download_session = None
+download_semaphore = None
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def get_download_session() -> aiohttp.ClientSession:
+    """Get the session used by :func:`async_file_downloader`, creating it if needed."""
+    global download_session, download_semaphore
+
+    if download_session is None or download_session.closed:
+        download_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=config.DOWNLOAD_CONCURRENCY),
+            timeout=aiohttp.ClientTimeout(total=60, sock_connect=10),
+        )
+        download_semaphore = asyncio.Semaphore(config.DOWNLOAD_CONCURRENCY)
+
+    return download_session
+
+
+async def close_download_session():
+    """Close the session used by :func:`async_file_downloader`."""
+    if download_session is not None and not download_session.closed:
+        await download_session.close()
 
-    futures = []
-    files = [None] * len(urls)
-    for i, url in enumerate(urls):
-        future = asyncio.create_task(fetch_file(i, files, url))
-        futures.append(future)
 
-    if futures:
-        await asyncio.gather(*futures)
+async def download_file(
+    url: str, headers: dict = None, max_size: int = None
+) -> Optional[BytesIO]:
+    """
+    Download a file into memory, retrying on connection errors, timeouts and server errors.
+
+    Parameters
+    ----------------
+    url: :class:`str`
+        Url of the file.
+    headers: :class:`dict`
+        Headers sent with the request.
+    max_size: :class:`int`
+        Max size of the file in bytes, defaults to `config.DOWNLOAD_MAX_SIZE`.
+
+    Returns
+    -------
+    Optional[:class:`io.BytesIO`]
+        The file or `None` if it couldn't be downloaded or was bigger than max_size.
+    """
+    if max_size is None:
+        max_size = config.DOWNLOAD_MAX_SIZE
+
+    logger = get_logger()
+    session = get_download_session()
+    for attempt in range(DOWNLOAD_RETRIES):
+        if attempt:
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+        try:
+            async with download_semaphore:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 429 or response.status >= 500:
+                        continue
+
+                    if response.status >= 400:
+                        logger.warning(f"Failed to download {url}: {response.status}")
+                        return
+
+                    if response.content_length and response.content_length > max_size:
+                        logger.warning(f"{url} is bigger than {max_size} bytes")
+                        return
 
-    return [file for file in files if file]
+                    file = BytesIO()
+                    async for chunk in response.content.iter_chunked(
+                        DOWNLOAD_CHUNK_SIZE
+                    ):
+                        if file.tell() + len(chunk) > max_size:
+                            logger.warning(f"{url} is bigger than {max_size} bytes")
+                            return
+
+                        file.write(chunk)
+
+                    file.seek(0)
+                    return file
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            continue
+
+    logger.warning(f"Failed to download {url} after {DOWNLOAD_RETRIES} attempts")
+
+
+async def async_file_downloader(
+    urls: list[str], headers: dict = None
+) -> list[Optional[BytesIO]]:
+    """
+    Download files concurrently, at most `config.DOWNLOAD_CONCURRENCY` at a time.
+
+    Parameters
+    ----------------
+    urls: List[:class:`str`]
+        Urls of the files.
+    headers: :class:`dict`
+        Headers sent with every request.
+
+    Returns
+    -------
+    List[Optional[:class:`io.BytesIO`]]
+        The files in the order of urls, `None` for the files that couldn't be downloaded.
+    """
+    return await asyncio.gather(*[download_file(url, headers) for url in urls])
@@ -1,17 +1,20 @@
 import datetime
 import re
+from collections import Counter
 from typing import Optional
 
 import config
 import discord
 from bson import json_util
 from discord.enums import ChannelType
+from pymongo import UpdateOne
 
-from modules import database
+from modules import database, timers
 from modules.custom_commands import Role
-from modules.utils import SettingsHandler
+from modules.utils import PatternMatcher, SettingsHandler
 
 db = database.get_connection()
+async_db = database.get_async_connection()
 
 
 class Watchlist:
@@ -26,6 +29,13 @@ class Watchlist:
 
         self.members = {}
         self.watchlist_data = {}
+        # compiled filters of watchlist members keyed by (guild_id, user_id), generic filters have the user_id 0
+        self.filter_matchers = {}
+        # filter matches that haven't been written to the database yet, keyed by (guild_id, user_id, regex)
+        self.pending_matches = Counter()
+        # filter matches and checked messages since the bot started, used for the filter hit rates
+        self.session_matches = Counter()
+        self.checked_messages = Counter()
         self.bot.add_listener(self.on_message, "on_message")
         self.bot.add_listener(self.on_ready, "on_ready")
         self._default_settings = {"roles": []}
@@ -43,6 +53,7 @@ class Watchlist:
             )
 
         self._settings = settings["modules"]["watchlist"]
+        self.flush_match_counts.start()
 
     def add_role(self, role: discord.Role = None):
         if role is None:
@@ -66,6 +77,125 @@ class Watchlist:
     def get_settings(self):
         return self._settings
 
+    def get_filter_matcher(self, guild_id: int, user_id: int) -> PatternMatcher:
+        """
+        Get the compiled filters of a watchlist member, compiling them if needed.
+
+        Parameters
+        ----------------
+        guild_id: :class:`int`
+            ID of the guild.
+        user_id: :class:`int`
+            ID of the watched user or 0 for the generic filters.
+
+        Returns
+        -------
+        :class:`modules.utils.PatternMatcher`
+            The matcher of the member's filters.
+        """
+        matcher = self.filter_matchers.get((guild_id, user_id))
+        if matcher is None:
+            watchlist_member = self.watchlist_data.get(guild_id, {}).get(user_id, {})
+            matcher = PatternMatcher(
+                watchlist_member.get("filters", []),
+                "regex",
+                flags=re.IGNORECASE,
+                logger=self.bot.logger,
+            )
+            self.filter_matchers[(guild_id, user_id)] = matcher
+
+        return matcher
+
+    def invalidate_filters(self, guild_id: int, user_id: int):
+        """Drop the compiled filters of a watchlist member, needs to be called when their filters change."""
+        self.filter_matchers.pop((guild_id, user_id), None)
+
+    def count_match(self, guild_id: int, user_id: int, matched_filter: dict):
+        """
+        Count a filter match in memory, the count will be written to the database by :meth:`flush_matches`.
+
+        Parameters
+        ----------------
+        guild_id: :class:`int`
+            ID of the guild.
+        user_id: :class:`int`
+            ID of the watched user or 0 for the generic filters.
+        matched_filter: :class:`dict`
+            The filter that was matched.
+        """
+        key = (guild_id, user_id, matched_filter["regex"])
+        self.pending_matches[key] += 1
+        self.session_matches[key] += 1
+        matched_filter["matches"] = matched_filter.get("matches", 0) + 1
+
+    def filter_stats(self, guild_id: int, user_id: int) -> list[dict]:
+        """
+        Get the match counts and hit rates of the filters of a watchlist member.
+
+        Parameters
+        ----------------
+        guild_id: :class:`int`
+            ID of the guild.
+        user_id: :class:`int`
+            ID of the watched user or 0 for the generic filters.
+
+        Returns
+        -------
+        :class:`list`
+            A dict for every filter with the keys regex, matches, session_matches and hit_rate.
+            hit_rate is the share of the messages checked since the bot started that matched the filter.
+        """
+        watchlist_member = self.watchlist_data.get(guild_id, {}).get(user_id, {})
+        checked = self.checked_messages[(guild_id, user_id)]
+        stats = []
+        for watchlist_filter in watchlist_member.get("filters", []):
+            regex = watchlist_filter["regex"]
+            session_matches = self.session_matches[(guild_id, user_id, regex)]
+            stats.append(
+                {
+                    "regex": regex,
+                    "matches": watchlist_filter.get("matches", 0),
+                    "session_matches": session_matches,
+                    "hit_rate": session_matches / checked if checked else 0,
+                }
+            )
+
+        return stats
+
+    @timers.loop(seconds=30)
+    async def flush_match_counts(self):
+        """Writes the filter matches counted by :meth:`count_match` to the database."""
+        await self.flush_matches()
+
+    async def flush_matches(self) -> int:
+        """
+        Write the pending filter match counts to the database in one bulk_write.
+
+        Returns
+        -------
+        :class:`int`
+            The amount of filters that were updated.
+        """
+        if not self.pending_matches:
+            return 0
+
+        pending, self.pending_matches = self.pending_matches, Counter()
+        requests = [
+            UpdateOne(
+                {"guild_id": guild_id, "user_id": user_id, "filters.regex": regex},
+                {"$inc": {"filters.$.matches": matches}},
+            )
+            for (guild_id, user_id, regex), matches in pending.items()
+        ]
+        try:
+            await async_db.watchlist.bulk_write(requests, ordered=False)
+        except Exception:
+            # keep the counts so they'll be written on the next flush
+            self.pending_matches.update(pending)
+            raise
+
+        return len(requests)
+
     async def on_ready(self):
         await self.bot.watchlist.initialize()
 
@@ -232,6 +362,7 @@ class Watchlist:
 
         db.watchlist.insert_one(watchlist_doc)
         self.watchlist_data[guild.id][member.id if member else 0] = watchlist_doc
+        self.invalidate_filters(guild.id, member.id if member else 0)
         return watchlist_doc
 
     async def remove_member(
@@ -248,6 +379,8 @@ class Watchlist:
         db.watchlist.delete_one(
             {"guild_id": guild.id, "user_id": member.id if member else 0}
         )
+        self.watchlist_data[guild.id].pop(member.id if member else 0, None)
+        self.invalidate_filters(guild.id, member.id if member else 0)
 
     async def add_filters(
         self,
@@ -271,6 +404,7 @@ class Watchlist:
         self.watchlist_data[guild.id][member.id if member else 0][
             "filters"
         ] = filters_dict
+        self.invalidate_filters(guild.id, member.id if member else 0)
 
     async def remove_filters(
         self,
@@ -292,6 +426,7 @@ class Watchlist:
         self.watchlist_data[guild.id][member.id if member else 0][
             "filters"
         ] = new_filters
+        self.invalidate_filters(guild.id, member.id if member else 0)
 
     async def send_message(
         self,
@@ -312,13 +447,8 @@ class Watchlist:
             channel = thread.parent
 
         if matched_filter:
-            db.watchlist.update_one(
-                {
-                    "guild_id": message.guild.id,
-                    "filters": {"$elemMatch": {"regex": matched_filter["regex"]}},
-                },
-                {"$inc": {"filters.$.matches": 1}},
-            )
+            user_id = 0 if generic else message.author.id
+            self.count_match(message.guild.id, user_id, matched_filter)
 
         embeds = [
             discord.Embed(
@@ -367,6 +497,25 @@ class Watchlist:
         if message.guild.id != config.MAIN_SERVER:
             return
 
+        if message.author.bot:
+            return
+
+        guild_watchlist_data = self.watchlist_data.get(message.guild.id)
+        if not guild_watchlist_data:
+            return
+
+        # unwatched users are only checked against the generic filters, before any context parsing
+        user_watchlist_data = guild_watchlist_data.get(message.author.id)
+        generic_filter = None
+        if 0 in guild_watchlist_data:
+            self.checked_messages[(message.guild.id, 0)] += 1
+            generic_filter = self.get_filter_matcher(message.guild.id, 0).match(
+                message.content
+            )
+
+        if user_watchlist_data is None and generic_filter is None:
+            return
+
         ctx = await self.bot.get_context(message)
         if ctx.command and (
             ctx.command.name == "watchlist"
@@ -374,44 +523,24 @@ class Watchlist:
         ):
             return
 
-        if message.author.bot:
-            return
-
-        if not message.guild:
-            return
-
-        guild_watchlist_data = self.watchlist_data[message.guild.id]
-        user_watchlist_data = guild_watchlist_data.get(message.author.id, {})
-        generic_watchlist_data = guild_watchlist_data.get(0, {})
         watchlist_category = await self.get_watchlist_category(message.guild)
         if not watchlist_category:
             return
 
-        user_filters = user_watchlist_data.get("filters", [])
-        generic_filters = generic_watchlist_data.get("filters", [])
-
-        if generic_filters:
-            category = self.get_watchlist_category(
-                self.bot.get_guild(config.MAIN_SERVER)
+        if generic_filter:
+            channel = await self.get_generic_channel(watchlist_category)
+            return await self.send_message(
+                message, generic_filter, True, channel=channel
             )
-            channel = await self.get_generic_channel(category)
-            for filter in generic_filters:
-                if re.findall(filter["regex"], message.content, re.IGNORECASE):
-                    return await self.send_message(
-                        message, filter, True, channel=channel
-                    )
 
         thread_id = user_watchlist_data.get("thread_id", "0")
-        category = await self.get_watchlist_category(message.guild)
-        watchlist_channel = await self.get_thread_channel(category)
+        watchlist_channel = await self.get_thread_channel(watchlist_category)
         thread = watchlist_channel.get_thread(thread_id)
         if thread:
-            matched_filter = None
-            if user_filters:
-                for filter in user_filters:
-                    if re.findall(filter["regex"], message.content, re.IGNORECASE):
-                        matched_filter = filter
-                        break
+            self.checked_messages[(message.guild.id, message.author.id)] += 1
+            matched_filter = self.get_filter_matcher(
+                message.guild.id, message.author.id
+            ).match(message.content)
             await self.send_message(
                 message, matched_filter, channel=watchlist_channel, thread=thread
             )
@@ -420,3 +549,5 @@ class Watchlist:
             db.watchlist.delete_one(
                 {"guild_id": message.guild.id, "user_id": message.author.id}
             )
+            guild_watchlist_data.pop(message.author.id, None)
+            self.invalidate_filters(message.guild.id, message.author.id)
@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from modules import leveling
+
+
+class FailingCollection:
+    """leveling_users stand in whose bulk_write fails after running `during_write`."""
+
+    def __init__(self, during_write):
+        self.during_write = during_write
+
+    async def bulk_write(self, requests, ordered=True):
+        self.during_write()
+        raise RuntimeError("bulk_write failed")
+
+
+def make_member(guild_id: int = 1, user_id: int = 2):
+    return SimpleNamespace(id=user_id, guild=SimpleNamespace(id=guild_id))
+
+
+def test_failed_flush_merges_writes_made_during_the_flush(monkeypatch):
+    buffer = leveling.LevelingWriteBuffer()
+    member = make_member()
+
+    buffer.inc(member, "points", 10)
+    buffer.inc(member, "rp", 1)
+    buffer.set(member, "level", 3)
+    buffer.set(member, "last_message", 100)
+
+    def concurrent_writes():
+        buffer.inc(member, "points", 5)
+        buffer.set(member, "level", 4)
+        buffer.unset(member, "last_message")
+
+    collection = FailingCollection(concurrent_writes)
+    monkeypatch.setattr(leveling, "async_db", SimpleNamespace(leveling_users=collection))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(buffer.flush())
+
+    assert buffer.pending == {
+        (1, 2): {
+            "points": ("$inc", 15),
+            "rp": ("$inc", 1),
+            "level": ("$set", 4),
+            "last_message": ("$unset", 1),
+        }
+    }
+    assert buffer.flushed_writes == 0